@@ -0,0 +1,207 @@
+"""Compact set of acceptor read identifiers to exclude from template FastQs.
+
+Acceptor reads overlapping variant contexts are removed from the template
+FastQ files while the validation FastQ files are written. Storing all of
+these read identifiers as Python strings costs hundreds of MB when a million
+or more reads are excluded. The AcceptorSkipSet instead stores a sorted array
+of 64-bit hashes of the read identifiers, with a small bitmap in front of it
+to quickly reject the vast majority of template reads.
+"""
+
+import hashlib
+from array import array
+
+import numpy as np
+
+
+class AcceptorSkipSet:
+    """Hashed, read-only set of acceptor read identifiers.
+
+    Membership tests accept read identifiers as str or bytes. Hash collisions
+    between a template read and a skipped read are very unlikely with 64-bit
+    hashes, but can be ruled out entirely by keeping the exact read
+    identifiers as a fallback.
+
+    Attributes
+    ----------
+    hashes : numpy.ndarray of numpy.uint64
+        Sorted, unique hashes of the read identifiers
+    names : numpy.ndarray of bytes or None
+        Read identifiers in the same order as `hashes`, only kept for exact
+        confirmation
+    bitmap : bytes
+        Prefilter bitmap with one bit set for each hash
+    """
+
+    def __init__(self, read_ids=(), exact=False):
+        """Hash and save the provided read identifiers.
+
+        Parameters
+        ----------
+        read_ids : iterable of str or bytes
+            Acceptor read identifiers to skip
+        exact : bool
+            Keep the read identifiers to confirm hash matches (Default: False)
+        """
+        hashes = array("Q")
+        names = [] if exact else None
+        for read_id in read_ids:
+            if read_id is None:
+                continue
+            if isinstance(read_id, str):
+                read_id = read_id.encode("utf-8")
+            hashes.append(self.hash_read_id(read_id))
+            if exact:
+                names.append(read_id)
+        self.hashes, self.names = self.sort_hashes(hashes, names)
+        self.bitmask, self.bitmap = self.build_bitmap(self.hashes)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def __contains__(self, read_id):
+        """Return whether a read identifier is in the skip set.
+
+        Parameters
+        ----------
+        read_id : str or bytes
+            Read identifier to check
+
+        Returns
+        -------
+        bool
+            True if the read should be skipped, False if not
+        """
+        if isinstance(read_id, str):
+            read_id = read_id.encode("utf-8")
+        read_hash = self.hash_read_id(read_id)
+        bitpos = read_hash & self.bitmask
+        if not self.bitmap[bitpos >> 3] & (1 << (bitpos & 7)):
+            return False
+        read_hash = np.uint64(read_hash)
+        hash_index = int(np.searchsorted(self.hashes, read_hash))
+        if hash_index >= len(self.hashes) or self.hashes[hash_index] != read_hash:
+            return False
+        if self.names is None:
+            return True
+        # Check every saved identifier sharing this hash.
+        while hash_index < len(self.hashes) and self.hashes[hash_index] == read_hash:
+            if self.names[hash_index] == read_id:
+                return True
+            hash_index += 1
+        return False
+
+    @classmethod
+    def from_varcon_file(cls, varconfileloc, exact=False):
+        """Build a skip set by streaming the acceptor read IDs from a variant context file.
+
+        The variant context file is read line by line so that the full set
+        of variant contexts does not need to be held in memory.
+
+        Parameters
+        ----------
+        varconfileloc : str
+            Path to the variant context file
+        exact : bool
+            Keep the read identifiers to confirm hash matches (Default: False)
+
+        Returns
+        -------
+        AcceptorSkipSet
+            Skip set with all acceptor read IDs in the variant context file
+        """
+        return cls(cls.read_varcon_acceptor_ids(varconfileloc), exact)
+
+    @staticmethod
+    def read_varcon_acceptor_ids(varconfileloc):
+        """Yield the acceptor read IDs from a variant context file.
+
+        Parameters
+        ----------
+        varconfileloc : str
+            Path to the variant context file
+
+        Yields
+        ------
+        str
+            Acceptor read identifier
+        """
+        with open(varconfileloc, "r") as varconfile:
+            for fileline in varconfile:
+                if fileline.startswith("#"):
+                    continue
+                filelinedata = fileline.rstrip("\n").split("\t")
+                if len(filelinedata) < 12:
+                    continue
+                yield from filelinedata[11].split(";")
+
+    @staticmethod
+    def hash_read_id(read_id):
+        """Return the 64-bit hash of a read identifier.
+
+        Parameters
+        ----------
+        read_id : bytes
+            Read identifier to hash
+
+        Returns
+        -------
+        int
+            Unsigned 64-bit hash
+        """
+        return int.from_bytes(hashlib.blake2b(read_id, digest_size=8).digest(), "little")
+
+    @staticmethod
+    def sort_hashes(hashes, names=None):
+        """Sort and deduplicate hashes, keeping identifiers aligned if provided.
+
+        Parameters
+        ----------
+        hashes : array.array
+            Unsigned 64-bit hashes
+        names : list of bytes or None
+            Read identifiers belonging to the hashes
+
+        Returns
+        -------
+        tuple of numpy.ndarray
+            Sorted hashes and the aligned identifiers (or None)
+        """
+        hash_arr = np.frombuffer(hashes, dtype=np.uint64) if hashes else np.empty(0, np.uint64)
+        if names is None:
+            return np.unique(hash_arr), None
+        name_arr = np.array(names, dtype=bytes) if names else np.empty(0, dtype="S1")
+        order = np.lexsort((name_arr, hash_arr))
+        hash_arr = hash_arr[order]
+        name_arr = name_arr[order]
+        # Drop duplicated identifiers, keeping distinct identifiers sharing a hash.
+        keep = np.ones(len(hash_arr), dtype=bool)
+        keep[1:] = (hash_arr[1:] != hash_arr[:-1]) | (name_arr[1:] != name_arr[:-1])
+        return hash_arr[keep], name_arr[keep]
+
+    @staticmethod
+    def build_bitmap(hashes):
+        """Build the prefilter bitmap for a set of hashes.
+
+        The bitmap has at least 16 bits per hash, so roughly one in sixteen
+        template reads passes the prefilter and needs a binary search.
+
+        Parameters
+        ----------
+        hashes : numpy.ndarray of numpy.uint64
+            Hashes to set in the bitmap
+
+        Returns
+        -------
+        tuple of int and bytes
+            Bit mask to apply to hashes and the bitmap
+        """
+        num_bytes = 64
+        while num_bytes * 8 < len(hashes) * 16:
+            num_bytes *= 2
+        bitmask = num_bytes * 8 - 1
+        bitmap = np.zeros(num_bytes, dtype=np.uint8)
+        bitpos = hashes & np.uint64(bitmask)
+        bitvalues = np.left_shift(1, (bitpos & np.uint64(7)).astype(np.uint8)).astype(np.uint8)
+        np.bitwise_or.at(bitmap, (bitpos >> np.uint64(3)).astype(np.int64), bitvalues)
+        return bitmask, bitmap.tobytes()
@@ -65,7 +65,8 @@ class VaSeParser(argparse.ArgumentParser):
         subparsers = self.add_subparsers(
             title="Subcommands",
             dest="runmode",  # required=True, <-- This only works for Py3.7+
-            metavar="{BuildSpikeIns | AssembleValidationSet | BuildValidationSet}"
+            metavar=("{BuildSpikeIns | AssembleValidationSet | BuildValidationSet | "
+                     "IndexTemplate | QueryInsertPositions}")
             )
 
         self.add_argument("-V", "--version", action="version", version="VaSe v.0.1")
@@ -87,6 +88,9 @@ class VaSeParser(argparse.ArgumentParser):
                                 help="Log output file name")
         universals.add_argument("--debug", action="store_true",
                                 help="Log with maximum verbosity")
+        universals.add_argument("-t", "--threads", default=1,
+                                type=self.is_positive_int, metavar="<int>",
+                                help="Number of worker processes to use. (Default=1)")
 
         # ===Parent parser for context building modes.=========================
         context_parent = subparsers.add_parser(
@@ -169,10 +173,12 @@ class VaSeParser(argparse.ArgumentParser):
                   "contexts only, or build spike-ins from pre-made contexts.")
             )
         parser_spike.add_argument("-m", "--output-mode", required=True,
-                                  choices=["A", "D", "P", "V"],
+                                  choices=["A", "D", "L", "P", "V"],
                                   help=("How to produce outputs. A: one VCF and one BAM file for "
-                                        "all variant contexts; D: one VCF and BAM file per sample. "
-                                        "(FUTURE); P: one VCF and BAM file per variant context; V: "
+                                        "all variant contexts; D: one VCF and BAM file per sample; "
+                                        "L: one spike-in library BAM and VCF file with "
+                                        "the variant context per record, and a context index; P: "
+                                        "one VCF and BAM file per variant context; V: "
                                         "Output variant context file only."))
         # Make varcons using acceptor BAM or use existing varcon file(s).
         template_arg = parser_spike.add_mutually_exclusive_group(required=True)
@@ -194,9 +200,23 @@ class VaSeParser(argparse.ArgumentParser):
         # output_type.add_argument("--varcon-only", action="store_true",
         #                          help=("Suppress BAM and VCF output and only output variant "
         #                                "context file(s)."))
+        parser_spike.add_argument("--bgzip-vcf", action="store_true", dest="compress_vcf",
+                                  help=("Write spike-in VCF files BGZF compressed (.vcf.gz) and "
+                                        "indexed, ready for AssembleValidationSet -kv."))
+        parser_spike.add_argument("--cache-dir", metavar="<dir>",
+                                  help=("Reuse variant contexts and P-mode spike-ins cached in "
+                                        "<dir> by earlier runs for the same donor, acceptor and "
+                                        "reference files and variants, and cache the newly "
+                                        "built ones."))
+        parser_spike.add_argument("--cache-size", type=self.is_positive_int, default=10240,
+                                  metavar="<MB>",
+                                  help=("Remove the least recently used spike-ins from the cache "
+                                        "directory when it grows beyond <MB> MB. Default=10240"))
         parser_spike.add_argument("-O", "--output-type", choices=["B", "U", "F"], default="B",
-                                  help=("Output <B>am, <U>bam, or <F>astQ spike-ins. Default=B "
-                                        "(FUTURE)"))
+                                  help=("Output <B>am, <U>ncompressed BAM, or gzipped R1/R2 "
+                                        "<F>astQ spike-ins, listed in <prefix>_fastqs.txt for "
+                                        "AssembleValidationSet -kfq. Not used in L-mode. "
+                                        "Default=B"))
 
         # ===Parent parser for the two variant set building parsers=================================
         validation_parent = subparsers.add_parser(
@@ -206,19 +226,26 @@ class VaSeParser(argparse.ArgumentParser):
             )
         # Acceptor FastQ args.
         fq1_arg = validation_parent.add_mutually_exclusive_group(required=True)
+        # Repeated per acceptor when BuildValidationSet is given several acceptor BAMs.
         fq1_arg.add_argument("-1", "--acceptor-fq-r1", nargs="+", dest="acceptor_fq_1s",
+                             action="append",
                              type=self.is_existing_file, metavar=("<fastqR1>", "<fastqR1_2>"),
-                             help="Acceptor FastQ R1 file(s)")
+                             help="Acceptor FastQ R1 file(s). Repeat once per acceptor BAM.")
         fq1_arg.add_argument("-1L", "--acceptor-fq-r1-list", dest="acceptor_fq_1s",
+                             action="append",
                              type=self.are_existing_files, metavar="<file>",
-                             help="Acceptor FastQ R1 files listed per line in <file>.")
+                             help=("Acceptor FastQ R1 files listed per line in <file>. Repeat "
+                                   "once per acceptor BAM."))
         fq2_arg = validation_parent.add_mutually_exclusive_group(required=True)
         fq2_arg.add_argument("-2", "--acceptor-fq-r2", nargs="+", dest="acceptor_fq_2s",
+                             action="append",
                              type=self.is_existing_file, metavar=("<fastqR2>", "<fastqR2_2>"),
-                             help="Acceptor FastQ R2 file(s)")
+                             help="Acceptor FastQ R2 file(s). Repeat once per acceptor BAM.")
         fq2_arg.add_argument("-2L", "--acceptor-fq-r2-list", dest="acceptor_fq_2s",
+                             action="append",
                              type=self.are_existing_files, metavar="<file>",
-                             help="Acceptor FastQ R2 files listed per line in <file>.")
+                             help=("Acceptor FastQ R2 files listed per line in <file>. Repeat "
+                                   "once per acceptor BAM."))
         # Optionals.
         validation_parent.add_argument("--fastq-out", metavar="<prefix>",
                                        default="VaSe_" + str(datetime.date.today()),
@@ -228,6 +255,38 @@ class VaSeParser(argparse.ArgumentParser):
                                        type=int, metavar="<int>",
                                        help=("Random seed used to randomly distribute spike-in "
                                              "reads. (Default='VaSe_<date>'"))
+        validation_parent.add_argument("--exact-skip-check", dest="exact_skip",
+                                       action="store_true",
+                                       help=("Confirm hashed acceptor read exclusions against the "
+                                             "full read IDs. Uses more memory."))
+        validation_parent.add_argument("--split-templates", action="store_true",
+                                       help=("Split BGZF compressed acceptor FastQ files into "
+                                             "chunks that are written in parallel. Requires "
+                                             "-t/--threads > 1."))
+        validation_parent.add_argument("--output-format", default="fastq",
+                                       choices=["fastq", "ubam"],
+                                       help=("Write the validation set as FastQ files or as "
+                                             "unaligned BAM files with read group tags. "
+                                             "Unaligned BAM files are always interleaved. "
+                                             "(Default=fastq)"))
+        validation_parent.add_argument("--interleaved", action="store_true",
+                                       help=("Write the R1 and R2 reads of each lane to a single "
+                                             "interleaved FastQ file."))
+        shard_group = validation_parent.add_mutually_exclusive_group()
+        shard_group.add_argument("--shards", dest="num_of_shards", type=self.is_positive_int,
+                                 metavar="<int>",
+                                 help=("Split each output FastQ file into <int> shards, "
+                                       "written round-robin."))
+        shard_group.add_argument("--shard-size", type=self.is_positive_int, metavar="<int>",
+                                 help=("Split each output FastQ file into shards of <int> reads, "
+                                       "or read pairs if interleaved."))
+        validation_parent.add_argument("--downsample", dest="downsample_fractions", nargs="+",
+                                       type=self.is_fraction, metavar="<fraction>",
+                                       help=("Keep only this fraction of the acceptor reads, "
+                                             "selected by a hash of the read name seeded with "
+                                             "--seed. Spike-in reads are always kept. Several "
+                                             "fractions write a validation set each, in one "
+                                             "pass."))
         validation_parent.add_argument("-av", "--acceptor-vcf",
                                        type=self.is_variant_file, metavar="<vcf>",
                                        help=("Acceptor VCF file, used to make hybrid validation "
@@ -240,6 +299,12 @@ class VaSeParser(argparse.ArgumentParser):
             parents=[univ_parent, validation_parent],
             help="Make validation set using acceptor FastQs and outputs from BuildSpikeIns."
             )
+        parser_assemble.add_argument("--max-donor-memory", type=self.is_positive_int,
+                                     metavar="<MB>",
+                                     help=("Keep spike-in reads in a temporary on-disk store next "
+                                           "to the output FastQ files, using at most <MB> MB of "
+                                           "cache, instead of in memory. Used with spike-in BAM "
+                                           "files and libraries."))
         # Varcons xor varcon list.
         vacon_arg = parser_assemble.add_mutually_exclusive_group(required=True)
         vacon_arg.add_argument("-c", "--varcon", dest="varcons_in",
@@ -260,10 +325,22 @@ class VaSeParser(argparse.ArgumentParser):
         spike_read_args.add_argument("-kbL", "--spike-in-bam-list", dest="spike_in_bams",
                                      type=self.are_alignment_files, metavar="<file>",
                                      help="Pre-built spike-in BAM files listed per line in <file>.")
+        spike_read_args.add_argument("-kl", "--spike-in-library", dest="spike_in_library",
+                                     type=self.is_alignment_file, metavar="<bam>",
+                                     help=("Spike-in library BAM file made with BuildSpikeIns "
+                                           "L-mode."))
         spike_read_args.add_argument("-kfq", "--spike-in-fastq-list", dest="spike_in_fastqs",
                                      type=self.are_existing_file_pairs, metavar="<file>",
                                      help=("Pre-built spike-in FastQ files with pairs "
                                            "listed tab-separated per line in <file>."))
+        # Spike-in library context selection (optional).
+        parser_assemble.add_argument("--library-contexts", nargs="+", metavar="<contextid>",
+                                     help=("Variant contexts to take from the spike-in library. "
+                                           "Default: all contexts in the variant context file."))
+        parser_assemble.add_argument("--library-regions", nargs="+",
+                                     metavar="<chrom>[:<start>-<end>]",
+                                     help=("Take the spike-in library variant contexts overlapping "
+                                           "these regions, in addition to --library-contexts."))
         # Spike-in VCF files (optional).
         spike_vcf_args = parser_assemble.add_mutually_exclusive_group()
         spike_vcf_args.add_argument("-kv", "--spike-in-vcf", nargs="+", dest="spike_in_vcfs",
@@ -282,9 +359,60 @@ class VaSeParser(argparse.ArgumentParser):
                   "BuildSpikeIns + AssembleValidationSet, "
                   "without intermediary, reusable spike-in files.")
             )
-        parser_full.add_argument("-a", "--acceptor-bam", required=True,
+        parser_full.add_argument("-a", "--acceptor-bam", required=True, nargs="+",
                                  type=self.is_alignment_file, metavar="<bam>",
-                                 help="Acceptor BAM or CRAM file.")
+                                 help=("Acceptor BAM or CRAM file(s). Several acceptors share "
+                                       "the donor contexts, each with its own -1 and -2 FastQ "
+                                       "files, in the same order. Their contexts are established "
+                                       "one after another and all kept in memory; only their "
+                                       "output files are written in parallel."))
+
+        # ===Template fastq index sidecars========================================================
+        parser_index = subparsers.add_parser(
+            name="IndexTemplate",
+            formatter_class=CustomHelp,
+            help=("Write a .vfqi index next to acceptor FastQ files, used to count and split "
+                  "them without decompressing them first.")
+            )
+        parser_index.add_argument("fastqs", nargs="+", type=self.is_existing_file,
+                                  metavar="<fastq>",
+                                  help="Gzipped or bgzipped acceptor FastQ file(s) to index.")
+        parser_index.add_argument("--interval", default=100000,
+                                  type=self.is_positive_int, metavar="<int>",
+                                  help="Save the offsets of every <int>th read. (Default=100000)")
+        parser_index.add_argument("--verify", action="store_true",
+                                  help=("Check existing indexes against the checksum or sampled "
+                                        "reads of their FastQ file, and only rebuild missing or "
+                                        "mismatching indexes."))
+        parser_index.add_argument("-l", "--log", metavar="<str>",
+                                  help="Log output file name")
+        parser_index.add_argument("--debug", action="store_true",
+                                  help="Log with maximum verbosity")
+        parser_index.add_argument("-t", "--threads", default=1,
+                                  type=self.is_positive_int, metavar="<int>",
+                                  help="Number of worker processes to use. (Default=1)")
+
+        # ===Donor read insert position log queries===============================================
+        parser_query = subparsers.add_parser(
+            name="QueryInsertPositions",
+            formatter_class=CustomHelp,
+            help=("Write the insert positions of selected spike-in reads from a "
+                  "donor_read_insert_positions.npz log.")
+            )
+        parser_query.add_argument("insert_log", type=self.is_existing_file, metavar="<npz>",
+                                  help="Donor read insert position log (.npz).")
+        parser_query.add_argument("-q", "--query-out", required=True, metavar="<file>",
+                                  help="Output file to write the selected insert positions to.")
+        parser_query.add_argument("-r", "--read-ids", nargs="+", metavar="<str>",
+                                  help="Spike-in read identifiers to select. (Default=all)")
+        parser_query.add_argument("--fastqs", nargs="+", metavar="<fastq>",
+                                  help=("Validation FastQ files to select, as named in the log. "
+                                        "(Default=all)"))
+        parser_query.add_argument("-l", "--log", metavar="<str>",
+                                  help="Log output file name")
+        parser_query.add_argument("--debug", action="store_true",
+                                  help="Log with maximum verbosity")
+        parser_query.set_defaults(threads=1)
 
     @classmethod
     def is_alignment_file(cls, file):
@@ -378,6 +506,29 @@ class VaSeParser(argparse.ArgumentParser):
             cls.is_existing_file(fq2)
         return file_pairs
 
+    @staticmethod
+    def is_positive_int(value):
+        """Check if argument is an integer of at least 1."""
+        try:
+            int_value = int(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid integer value: '{value}'")
+        if int_value < 1:
+            raise argparse.ArgumentTypeError(f"Value must be at least 1: '{value}'")
+        return int_value
+
+    @staticmethod
+    def is_fraction(value):
+        """Check if argument is a number larger than 0 and at most 1."""
+        try:
+            float_value = float(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid fraction value: '{value}'")
+        if not 0 < float_value <= 1:
+            raise argparse.ArgumentTypeError(f"Fraction must be larger than 0 and at most 1: "
+                                             f"'{value}'")
+        return float_value
+
     @staticmethod
     def is_valid_directory(directory):
         """Check if dir exists and has write permission."""
@@ -0,0 +1,167 @@
+"""BgzfTemplate object class.
+
+Template fastq files compressed with BGZF (bgzip) consist of independently
+compressed blocks and can be read from any record using virtual offsets. The
+BgzfTemplate saves the virtual offset of every Nth record of such a template,
+which is used to split a single large template into record-aligned chunks
+that can be rewritten in parallel.
+"""
+
+import pysam
+
+
+class BgzfTemplate:
+    """Record checkpoints of a BGZF compressed template fastq file.
+
+    Attributes
+    ----------
+    template_fq : str
+        Path to the BGZF compressed template fastq file
+    checkpoint_interval : int
+        Number of records between two saved virtual offsets
+    num_of_records : int
+        Number of records in the template fastq file
+    checkpoints : list of int
+        Virtual offsets of record 0, N, 2N, ...
+    """
+
+    BGZF_MAGIC = b"\x1f\x8b\x08\x04"
+
+    def __init__(self, template_fq, checkpoint_interval=100000):
+        """Save the template fastq file and checkpoint interval.
+
+        Parameters
+        ----------
+        template_fq : str
+            Path to the BGZF compressed template fastq file
+        checkpoint_interval : int
+            Number of records between two saved virtual offsets
+        """
+        self.template_fq = template_fq
+        self.checkpoint_interval = checkpoint_interval
+        self.num_of_records = 0
+        self.checkpoints = []
+
+    @classmethod
+    def from_template_index(cls, template_index):
+        """Return a BgzfTemplate with the checkpoints of a template index.
+
+        Parameters
+        ----------
+        template_index : TemplateIndex
+            Fresh index of a BGZF compressed template fastq file
+
+        Returns
+        -------
+        BgzfTemplate
+            Template with the record count and checkpoints of the index
+        """
+        bgzf_template = cls(template_index.template_fq, template_index.checkpoint_interval)
+        bgzf_template.num_of_records = template_index.num_of_records
+        bgzf_template.checkpoints = list(template_index.virtual_offsets)
+        return bgzf_template
+
+    @classmethod
+    def is_bgzf(cls, template_fq):
+        """Return whether a file is BGZF compressed.
+
+        Parameters
+        ----------
+        template_fq : str
+            Path to the file to check
+
+        Returns
+        -------
+        bool
+            True if the file starts with a BGZF block header, False if not
+        """
+        try:
+            with open(template_fq, "rb") as templatefile:
+                block_header = templatefile.read(16)
+        except IOError:
+            return False
+        return (block_header[:4] == cls.BGZF_MAGIC
+                and block_header[12:14] == b"BC")
+
+    def scan_checkpoints(self):
+        """Count the template records and save the checkpoint virtual offsets.
+
+        Returns
+        -------
+        num_of_records : int
+            Number of records in the template fastq file
+        """
+        self.num_of_records = 0
+        self.checkpoints = []
+        with pysam.BGZFile(self.template_fq, "rb") as templatefile:
+            while True:
+                record_offset = templatefile.tell()
+                if not templatefile.readline():
+                    break
+                templatefile.readline()
+                templatefile.readline()
+                templatefile.readline()
+                if self.num_of_records % self.checkpoint_interval == 0:
+                    self.checkpoints.append(record_offset)
+                self.num_of_records += 1
+        return self.num_of_records
+
+    def plan_chunks(self, num_of_chunks):
+        """Split the template into record-aligned chunks at checkpoints.
+
+        Chunk boundaries only depend on the number of records and the
+        checkpoint interval, so R1 and R2 templates of the same lane are
+        split at the same records.
+
+        Parameters
+        ----------
+        num_of_chunks : int
+            Maximum number of chunks to split the template into
+
+        Returns
+        -------
+        template_chunks : list of tuple
+            First record, number of records and virtual offset per chunk
+        """
+        if not self.checkpoints:
+            self.scan_checkpoints()
+        if not self.checkpoints:
+            return []
+        num_of_chunks = max(1, min(num_of_chunks, len(self.checkpoints)))
+        chunk_checkpoints = sorted({round(x * len(self.checkpoints) / num_of_chunks)
+                                    for x in range(num_of_chunks)})
+        template_chunks = []
+        for chunk_index, checkpoint_index in enumerate(chunk_checkpoints):
+            first_record = checkpoint_index * self.checkpoint_interval
+            if chunk_index + 1 < len(chunk_checkpoints):
+                end_record = chunk_checkpoints[chunk_index + 1] * self.checkpoint_interval
+            else:
+                end_record = self.num_of_records
+            template_chunks.append((first_record, end_record - first_record,
+                                    self.checkpoints[checkpoint_index]))
+        return template_chunks
+
+    def read_records(self, virtual_offset, num_of_records):
+        """Yield template records starting at a virtual offset.
+
+        Parameters
+        ----------
+        virtual_offset : int
+            Virtual offset of the first record to read
+        num_of_records : int
+            Number of records to read
+
+        Yields
+        ------
+        tuple of bytes
+            Header line and the remaining three lines of a record
+        """
+        with pysam.BGZFile(self.template_fq, "rb") as templatefile:
+            templatefile.seek(virtual_offset)
+            for _ in range(num_of_records):
+                record_header = templatefile.readline()
+                if not record_header:
+                    break
+                yield (record_header + b"\n",
+                       b"\n".join((templatefile.readline(), templatefile.readline(),
+                                   templatefile.readline(), b"")))
@@ -0,0 +1,191 @@
+"""DiskDonorStore object class.
+
+The DiskDonorStore keeps donor reads in an SQLite database on disk instead
+of in memory, for assembling validation sets with millions of donor reads.
+The donor reads and the positions they are inserted at in each acceptor
+lane are saved in two tables. Fastq writers read the donor reads of a lane
+back sequentially, sorted by insert position. The memory used by SQLite is
+limited to the configured page cache size.
+"""
+
+import sqlite3
+from itertools import count
+
+
+class DiskDonorStore:
+    """SQLite backed donor reads with their insert slots per acceptor lane.
+
+    Attributes
+    ----------
+    db_path : str
+        Path to the SQLite database file
+    max_memory : int
+        Maximum page cache size in MB
+    read_order : int
+        Number of donor reads added so far, used to keep the reads of a read
+        identifier in the order they were added
+    """
+
+    def __init__(self, db_path, max_memory=256):
+        """Create the donor read and insert slot tables.
+
+        Parameters
+        ----------
+        db_path : str
+            Path to the SQLite database file to create
+        max_memory : int
+            Maximum page cache size in MB
+        """
+        self.db_path = db_path
+        self.max_memory = max_memory
+        self.read_order = 0
+        self.connection = self.connect(db_path, max_memory)
+        self.connection.executescript(
+            "CREATE TABLE IF NOT EXISTS donor_reads "
+            "(read_id TEXT, pair TEXT, seq TEXT, qual TEXT, read_order INTEGER);"
+            "CREATE TABLE IF NOT EXISTS insert_slots "
+            "(lane INTEGER, position INTEGER, slot INTEGER, read_id TEXT);"
+            )
+
+    @staticmethod
+    def connect(db_path, max_memory, read_only=False):
+        """Open and return a connection to a donor store database.
+
+        Parameters
+        ----------
+        db_path : str
+            Path to the SQLite database file
+        max_memory : int
+            Maximum page cache size in MB
+        read_only : bool
+            Open the database read only, for fastq writers
+
+        Returns
+        -------
+        sqlite3.Connection
+            Connection to the database
+        """
+        if read_only:
+            connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        else:
+            connection = sqlite3.connect(db_path)
+            connection.execute("PRAGMA journal_mode = OFF")
+            connection.execute("PRAGMA synchronous = OFF")
+        # A negative cache size sets the page cache size in KiB.
+        connection.execute(f"PRAGMA cache_size = {-1024 * max(1, int(max_memory))}")
+        connection.execute("PRAGMA temp_store = FILE")
+        return connection
+
+    def add_donor_reads(self, donor_reads):
+        """Add donor read tuples to the store.
+
+        The reads are inserted while they are iterated, so a generator of
+        reads is not held in memory.
+
+        Parameters
+        ----------
+        donor_reads : iterable of tuple
+            Donor reads as (read ID, pair number, sequence, qualities)
+        """
+        read_orders = count(self.read_order)
+        self.connection.executemany(
+            "INSERT INTO donor_reads VALUES (?, ?, ?, ?, ?)",
+            (x + (next(read_orders),) for x in donor_reads)
+            )
+        self.read_order = next(read_orders)
+
+    def index_donor_reads(self):
+        """Index the donor reads by read identifier, after all reads are added."""
+        self.connection.execute("CREATE INDEX IF NOT EXISTS donor_reads_id "
+                                "ON donor_reads (read_id, pair, read_order)")
+        self.connection.commit()
+
+    def remove_incorrect_read_pairs(self):
+        """Remove donor reads without exactly one R1 and one R2 read.
+
+        Returns
+        -------
+        int
+            Number of removed read pairs
+        """
+        incorrect_read_ids = self.connection.execute(
+            "SELECT read_id FROM donor_reads GROUP BY read_id "
+            "HAVING SUM(pair = '1') != 1 OR SUM(pair = '2') != 1"
+            ).fetchall()
+        self.connection.executemany("DELETE FROM donor_reads WHERE read_id = ?",
+                                    incorrect_read_ids)
+        self.connection.commit()
+        return len(incorrect_read_ids)
+
+    def get_read_ids(self):
+        """Return the sorted identifiers of all saved donor reads.
+
+        Returns
+        -------
+        list of str
+            Sorted unique donor read identifiers
+        """
+        return [x[0] for x in self.connection.execute(
+            "SELECT DISTINCT read_id FROM donor_reads ORDER BY read_id")]
+
+    def add_insert_slots(self, lane, donor_addpos, donor_read_ids):
+        """Save the insert positions of the donor reads of an acceptor lane.
+
+        Parameters
+        ----------
+        lane : int
+            Acceptor lane index
+        donor_addpos : list of int or numpy.ndarray
+            Template read positions to add donor reads after
+        donor_read_ids : list of str
+            Donor read identifiers to add, one per insert position
+        """
+        self.connection.executemany(
+            "INSERT INTO insert_slots VALUES (?, ?, ?, ?)",
+            [(lane, int(x), y, z) for y, (x, z) in enumerate(zip(donor_addpos, donor_read_ids))]
+            )
+
+    def index_insert_slots(self):
+        """Index the insert slots by lane and position, after all slots are added."""
+        self.connection.execute("CREATE INDEX IF NOT EXISTS insert_slots_lane "
+                                "ON insert_slots (lane, position, slot)")
+        self.connection.commit()
+
+    def close(self):
+        """Close the connection to the database."""
+        self.connection.close()
+
+    @classmethod
+    def read_lane_inserts(cls, db_path, lane, forward_reverse, max_memory=256):
+        """Yield the donor reads of an acceptor lane sorted by insert position.
+
+        Parameters
+        ----------
+        db_path : str
+            Path to the SQLite database file
+        lane : int
+            Acceptor lane index
+        forward_reverse : str
+            Yield R1 ('1') or R2 ('2') donor reads
+        max_memory : int
+            Maximum page cache size in MB
+
+        Yields
+        ------
+        tuple
+            Insert position and donor read as (read ID, pair number,
+            sequence, qualities)
+        """
+        connection = cls.connect(db_path, max_memory, read_only=True)
+        try:
+            lane_inserts = connection.execute(
+                "SELECT s.position, r.read_id, r.pair, r.seq, r.qual "
+                "FROM insert_slots s JOIN donor_reads r "
+                "ON r.read_id = s.read_id AND r.pair = ? "
+                "WHERE s.lane = ? ORDER BY s.position, s.slot, r.read_order",
+                (forward_reverse, lane)
+                )
+            for lane_insert in lane_inserts:
+                yield lane_insert[0], lane_insert[1:]
+        finally:
+            connection.close()
@@ -0,0 +1,138 @@
+"""DonorHeaderCache object class.
+
+Spike-in BAM files get a header reduced from the donor BAM file headers,
+with only the HD, SQ and RG lines and the sample fields replaced by the
+(hashed) sample ID. The DonorHeaderCache reads the header of each donor
+BAM file once, keeps its reduced form, and merges the headers of several
+samples in a single pass. As donor reads keep the reference sequence
+indices of their own donor BAM file, headers can only be merged if all
+donor BAM files have the same SQ lines, which can be checked before any
+reads are fetched.
+"""
+
+from collections import OrderedDict
+
+import pysam
+
+
+class DonorHeaderCache:
+    """Reduced header per donor BAM file.
+
+    Attributes
+    ----------
+    headers : dict
+        Reduced header per donor BAM file path
+    """
+
+    HEADER_FIELDS = ("HD", "SQ", "RG")
+
+    def __init__(self):
+        self.headers = {}
+
+    def __len__(self):
+        """Return the number of cached headers."""
+        return len(self.headers)
+
+    def read_header(self, bam_path):
+        """Return the reduced header of a donor BAM file, reading it only once.
+
+        Parameters
+        ----------
+        bam_path : str
+            Path to the donor BAM file
+
+        Returns
+        -------
+        OrderedDict
+            HD, SQ and RG lines of the donor BAM file header
+        """
+        if bam_path not in self.headers:
+            with pysam.AlignmentFile(bam_path) as bamfile:
+                bam_header = bamfile.header.to_dict()
+            self.headers[bam_path] = OrderedDict((x, y) for x, y in bam_header.items()
+                                                 if x in self.HEADER_FIELDS)
+        return self.headers[bam_path]
+
+    def get_sample_header(self, sample):
+        """Return the reduced header of a sample with its sample ID in the RG lines.
+
+        Parameters
+        ----------
+        sample : sample_mapper.Sample
+            Sample to return the donor BAM file header of
+
+        Returns
+        -------
+        OrderedDict
+            Copy of the reduced header with the sample and library fields of
+            the RG lines replaced by the (hashed) sample ID
+        """
+        sample_header = OrderedDict(
+            (x, [dict(z) for z in y] if isinstance(y, list) else dict(y))
+            for x, y in self.read_header(sample.bam).items()
+            )
+        for rg_entry in sample_header.get("RG", []):
+            rg_entry["SM"] = sample.hash_id
+            rg_entry["LB"] = sample.hash_id
+        return sample_header
+
+    @staticmethod
+    def get_sq_key(bam_header):
+        """Return the reference sequence names and lengths of a header.
+
+        Parameters
+        ----------
+        bam_header : OrderedDict
+            Header to return the SQ lines of
+
+        Returns
+        -------
+        tuple of tuple
+            Name and length per reference sequence, in header order
+        """
+        return tuple((x["SN"], x["LN"]) for x in bam_header.get("SQ", []))
+
+    def get_incompatible_bams(self, bam_paths):
+        """Return the donor BAM files with other SQ lines than the first.
+
+        Parameters
+        ----------
+        bam_paths : list of str
+            Paths to the donor BAM files to check
+
+        Returns
+        -------
+        list of str
+            Paths to the donor BAM files whose reference sequences differ
+            from those of the first donor BAM file
+        """
+        if not bam_paths:
+            return []
+        sq_key = self.get_sq_key(self.read_header(bam_paths[0]))
+        return [x for x in bam_paths[1:] if self.get_sq_key(self.read_header(x)) != sq_key]
+
+    @staticmethod
+    def merge_headers(headers):
+        """Merge reduced headers into one header.
+
+        The HD and SQ lines are taken from the first header, RG lines are
+        added from all headers with each read group ID kept once.
+
+        Parameters
+        ----------
+        headers : list of OrderedDict
+            Reduced headers to merge
+
+        Returns
+        -------
+        merged_header : OrderedDict
+        """
+        merged_header = OrderedDict((x, list(y) if isinstance(y, list) else y)
+                                    for x, y in headers[0].items())
+        read_group_ids = {x["ID"] for x in merged_header.get("RG", [])}
+        for header in headers[1:]:
+            for rg_entry in header.get("RG", []):
+                if rg_entry["ID"] not in read_group_ids:
+                    read_group_ids.add(rg_entry["ID"])
+                    merged_header.setdefault("RG", []).append(rg_entry)
+        return merged_header
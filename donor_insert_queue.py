@@ -0,0 +1,104 @@
+"""DonorInsertQueue object class.
+
+The DonorInsertQueue saves the template read positions after which donor
+reads are inserted into a validation fastq file. Positions are kept as a
+sorted numpy array with the donor read identifiers in the same order, so a
+fastq writer only has to compare the current template read against the next
+pending insert position instead of looking up every template read in a dict.
+"""
+
+import sys
+
+import numpy as np
+
+
+class DonorInsertQueue:
+    """Donor read identifiers ordered by their insert position.
+
+    Attributes
+    ----------
+    positions : numpy.ndarray of numpy.int64
+        Sorted template read positions to insert donor reads after
+    donor_read_ids : list of str
+        Donor read identifiers in the same order as `positions`
+    next_position : int
+        Next pending insert position, sys.maxsize if the queue is empty
+    """
+
+    def __init__(self, donor_addpos=(), donor_read_ids=()):
+        """Sort the insert positions and donor read identifiers.
+
+        Donor read identifiers sharing an insert position keep their
+        provided order.
+
+        Parameters
+        ----------
+        donor_addpos : list of int
+            Template read positions to add donor reads after
+        donor_read_ids : list of str
+            Donor read identifiers to add, one per insert position
+        """
+        donor_read_ids = list(donor_read_ids)
+        num_of_inserts = min(len(donor_addpos), len(donor_read_ids))
+        positions = np.asarray(donor_addpos, dtype=np.int64)[:num_of_inserts]
+        insert_order = np.argsort(positions, kind="stable")
+        self.positions = positions[insert_order]
+        self.donor_read_ids = [donor_read_ids[x] for x in insert_order]
+        self.queue_index = 0
+        self.next_position = sys.maxsize
+        self.reset()
+
+    def __len__(self):
+        return len(self.donor_read_ids) - self.queue_index
+
+    def subqueue(self, first_position, end_position):
+        """Return a new queue with the insert positions of a range of template reads.
+
+        Parameters
+        ----------
+        first_position : int
+            First template read position of the range
+        end_position : int
+            Template read position after the range
+
+        Returns
+        -------
+        DonorInsertQueue
+            Insert positions and donor read identifiers within the range
+        """
+        first_index, end_index = np.searchsorted(self.positions, [first_position, end_position])
+        return DonorInsertQueue(self.positions[first_index:end_index],
+                                self.donor_read_ids[first_index:end_index])
+
+    def reset(self):
+        """Restart the queue at the first insert position."""
+        self.queue_index = 0
+        self.set_next_position()
+
+    def set_next_position(self):
+        """Set the next pending insert position."""
+        if self.queue_index < len(self.positions):
+            self.next_position = int(self.positions[self.queue_index])
+        else:
+            self.next_position = sys.maxsize
+
+    def pop_position(self, read_position):
+        """Return and remove the donor read identifiers up to a template read position.
+
+        Parameters
+        ----------
+        read_position : int
+            Current template read position
+
+        Returns
+        -------
+        list of str
+            Donor read identifiers to insert, in insertion order
+        """
+        if read_position < self.next_position:
+            return []
+        end_index = int(np.searchsorted(self.positions, read_position, side="right"))
+        insert_read_ids = self.donor_read_ids[self.queue_index:end_index]
+        self.queue_index = end_index
+        self.set_next_position()
+        return insert_read_ids
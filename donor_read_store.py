@@ -0,0 +1,155 @@
+"""DonorReadStore object class.
+
+The DonorReadStore saves donor reads as string tuples (read ID, pair number,
+sequence, qualities), indexed by read identifier and split into R1 and R2
+reads. It replaces scanning a list of donor read tuples for every donor read
+identifier when linking donor reads to their insert positions.
+"""
+
+
+class DonorReadStore:
+    """Donor read tuples indexed by read identifier.
+
+    Attributes
+    ----------
+    r1_reads : dict of str: list of tuple
+        R1 donor reads per read identifier
+    r2_reads : dict of str: list of tuple
+        R2 donor reads per read identifier
+    """
+
+    def __init__(self, donor_reads=None):
+        """Save the provided donor reads.
+
+        Parameters
+        ----------
+        donor_reads : iterable of tuple
+            Donor reads as (read ID, pair number, sequence, qualities)
+        """
+        self.r1_reads = {}
+        self.r2_reads = {}
+        if donor_reads is not None:
+            self.add_donor_reads(donor_reads)
+
+    def __len__(self):
+        return len(self.r1_reads.keys() | self.r2_reads.keys())
+
+    def __contains__(self, read_id):
+        return read_id in self.r1_reads or read_id in self.r2_reads
+
+    @classmethod
+    def from_read_data(cls, donor_read_data):
+        """Return donor read data as a DonorReadStore.
+
+        Parameters
+        ----------
+        donor_read_data : DonorReadStore, dict or iterable of tuple
+            Donor reads as a store, as lists of read tuples per read
+            identifier, or as read tuples
+
+        Returns
+        -------
+        DonorReadStore
+            Donor reads indexed by read identifier
+        """
+        if isinstance(donor_read_data, DonorReadStore):
+            return donor_read_data
+        donor_store = cls()
+        if isinstance(donor_read_data, dict):
+            for read_tuples in donor_read_data.values():
+                donor_store.add_donor_reads(read_tuples)
+        else:
+            donor_store.add_donor_reads(donor_read_data)
+        return donor_store
+
+    def add_donor_read(self, donor_read):
+        """Add a single donor read tuple.
+
+        Parameters
+        ----------
+        donor_read : tuple
+            Donor read as (read ID, pair number, sequence, qualities)
+        """
+        if donor_read[1] == "1":
+            pair_reads = self.r1_reads
+        else:
+            pair_reads = self.r2_reads
+        if donor_read[0] not in pair_reads:
+            pair_reads[donor_read[0]] = []
+        pair_reads[donor_read[0]].append(donor_read)
+
+    def add_donor_reads(self, donor_reads):
+        """Add multiple donor read tuples.
+
+        Parameters
+        ----------
+        donor_reads : iterable of tuple
+            Donor reads as (read ID, pair number, sequence, qualities)
+        """
+        for donor_read in donor_reads:
+            self.add_donor_read(donor_read)
+
+    def get_read_ids(self):
+        """Return the sorted identifiers of all saved donor reads.
+
+        Returns
+        -------
+        list of str
+            Sorted unique donor read identifiers
+        """
+        return sorted(self.r1_reads.keys() | self.r2_reads.keys())
+
+    def get_reads(self, read_id):
+        """Return the R1 and R2 reads of a donor read identifier.
+
+        Parameters
+        ----------
+        read_id : str
+            Donor read identifier
+
+        Returns
+        -------
+        list of tuple
+            R1 reads followed by R2 reads, empty if the identifier is unknown
+        """
+        return self.r1_reads.get(read_id, []) + self.r2_reads.get(read_id, [])
+
+    def get_pair_reads(self, read_id, forward_reverse):
+        """Return the R1 or R2 reads of a donor read identifier.
+
+        Parameters
+        ----------
+        read_id : str
+            Donor read identifier
+        forward_reverse : str
+            Return R1 ('1') or R2 ('2') reads
+
+        Returns
+        -------
+        list of tuple
+            Donor reads of the requested pair number
+        """
+        if forward_reverse == "1":
+            return self.r1_reads.get(read_id, [])
+        return self.r2_reads.get(read_id, [])
+
+    def subset(self, read_ids):
+        """Return a new store with only the reads of the provided read identifiers.
+
+        Parameters
+        ----------
+        read_ids : iterable of str
+            Donor read identifiers to keep
+
+        Returns
+        -------
+        DonorReadStore
+            Donor reads of the selected read identifiers
+        """
+        donor_subset = DonorReadStore()
+        for read_id in read_ids:
+            if read_id in self.r1_reads:
+                donor_subset.r1_reads[read_id] = self.r1_reads[read_id]
+            if read_id in self.r2_reads:
+                donor_subset.r2_reads[read_id] = self.r2_reads[read_id]
+        return donor_subset
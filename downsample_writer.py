@@ -0,0 +1,161 @@
+"""DownsampleWriter object class.
+
+Validation sets at several acceptor coverage levels used to require
+separate downsampling passes over the written validation fastq files. The
+DownsampleWriter instead writes a downsampled output set per fraction while
+the template is rewritten. Template reads are kept in a set if a seeded hash
+of the read name, without the /1 or /2 suffix, falls below the fraction of
+the set, so both reads of a pair are kept or dropped together and a read in
+a smaller set is in every larger set as well. Donor reads are written to
+every set.
+"""
+
+import hashlib
+import os
+
+
+class DownsampleWriter:
+    """Writer of validation fastq records to a set per downsample fraction.
+
+    Attributes
+    ----------
+    outpath : str
+        Path of the validation fastq file without downsampling
+    fractions : list of float
+        Fraction of template reads to keep per output set
+    seed : int
+        Seed of the read name hash
+    set_paths : list of str
+        Path of the validation fastq file per output set
+    record_counts : list of int
+        Number of records written per output set
+    """
+
+    def __init__(self, outpath, open_output, fractions, seed=2):
+        """Open a validation fastq file per downsample fraction.
+
+        Parameters
+        ----------
+        outpath : str
+            Path of the validation fastq file without downsampling
+        open_output : callable
+            Opens and returns a writer for an output set path
+        fractions : list of float
+            Fraction of template reads to keep per output set
+        seed : int
+            Seed of the read name hash
+        """
+        self.outpath = outpath
+        self.fractions = fractions
+        self.seed = seed
+        self.set_paths = [self.get_set_path(outpath, x) for x in fractions]
+        self.set_writers = [open_output(x) for x in self.set_paths]
+        self.record_counts = [0] * len(fractions)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def get_set_suffix(fraction):
+        """Return the name suffix of the output set of a downsample fraction.
+
+        The decimal point is written as 'p', so 0.25 becomes '_DS0p25'.
+
+        Parameters
+        ----------
+        fraction : float
+            Fraction of template reads to keep
+
+        Returns
+        -------
+        str
+            Name suffix of the output set
+        """
+        return "_DS" + f"{fraction:.6f}".rstrip("0").rstrip(".").replace(".", "p")
+
+    @classmethod
+    def get_set_path(cls, outpath, fraction):
+        """Return the path of the output set of a downsample fraction.
+
+        The set suffix is placed before the read number, if any, so
+        '..._L1_R1.fastq' becomes '..._L1_DS0p25_R1.fastq'.
+
+        Parameters
+        ----------
+        outpath : str
+            Path of the validation fastq file without downsampling
+        fraction : float
+            Fraction of template reads to keep
+
+        Returns
+        -------
+        str
+            Path of the validation fastq file of the output set
+        """
+        outroot, extension = os.path.splitext(outpath)
+        read_suffix = outroot[-3:] if outroot[-3:] in ("_R1", "_R2") else ""
+        return (f"{outroot[:len(outroot) - len(read_suffix)]}{cls.get_set_suffix(fraction)}"
+                f"{read_suffix}{extension}")
+
+    @staticmethod
+    def get_read_value(read_name, seed=2):
+        """Return the seeded hash value of a read name between 0 and 1.
+
+        Parameters
+        ----------
+        read_name : bytes
+            Read name, with or without the /1 or /2 suffix
+        seed : int
+            Seed of the read name hash
+
+        Returns
+        -------
+        float
+            Hash value of the read name
+        """
+        if read_name[-2:] in (b"/1", b"/2"):
+            read_name = read_name[:-2]
+        read_hash = hashlib.blake2b(read_name, digest_size=8,
+                                    key=str(seed).encode()).digest()
+        return int.from_bytes(read_hash, "little") / 2**64
+
+    def write_template(self, header_line, record_lines):
+        """Write a template read to the output sets that keep it.
+
+        Parameters
+        ----------
+        header_line : bytes
+            Read header line, starting with '@'
+        record_lines : bytes
+            Remaining three lines of the record
+        """
+        read_value = self.get_read_value(header_line.split()[0][1:], self.seed)
+        for set_index, fraction in enumerate(self.fractions):
+            if read_value < fraction:
+                self.set_writers[set_index].write_template(header_line, record_lines)
+                self.record_counts[set_index] += 1
+
+    def write_donor_read(self, donorread):
+        """Write a donor read to every output set.
+
+        Parameters
+        ----------
+        donorread : tuple of str
+            Read identifier, pair number, sequence and qualities
+        """
+        for set_index, set_writer in enumerate(self.set_writers):
+            set_writer.write_donor_read(donorread)
+            self.record_counts[set_index] += 1
+
+    def flush(self):
+        """Flush the output set writers."""
+        for set_writer in self.set_writers:
+            set_writer.flush()
+
+    def close(self):
+        """Close the output set writers."""
+        for set_writer in self.set_writers:
+            set_writer.close()
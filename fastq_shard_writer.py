@@ -0,0 +1,188 @@
+"""FastqShardWriter object class.
+
+Validation fastq files can be split into shards for aligners that work best
+on evenly sized inputs, instead of re-splitting the written files. The
+FastqShardWriter takes the template and donor read records of a single
+validation fastq file and passes them on to a separate writer per shard, either
+round-robin over a fixed number of shards or filling up shards of a fixed
+number of records one after another. Records of interleaved fastq files are
+kept together per read pair.
+"""
+
+import os
+
+
+class FastqShardWriter:
+    """Writer of validation fastq records to a set of shard files.
+
+    Attributes
+    ----------
+    outpath : str
+        Path of the unsharded validation fastq file
+    num_of_shards : int
+        Number of shards to write round-robin, None if shards have a fixed size
+    shard_size : int
+        Number of read units per shard, None if the number of shards is fixed
+    records_per_unit : int
+        Number of FastQ records that are kept together in a shard, 2 for
+        interleaved read pairs
+    shard_paths : list of str
+        Paths of the opened shard files
+    """
+
+    def __init__(self, outpath, open_shard, num_of_shards=None, shard_size=None,
+                 records_per_unit=1):
+        """Save the shard settings and open the first shards.
+
+        Parameters
+        ----------
+        outpath : str
+            Path of the unsharded validation fastq file
+        open_shard : callable
+            Opens and returns a writer for a shard path
+        num_of_shards : int
+            Number of shards to write round-robin
+        shard_size : int
+            Number of read units per shard, used if num_of_shards is None
+        records_per_unit : int
+            Number of FastQ records to keep together in a shard
+        """
+        self.outpath = outpath
+        self.open_shard = open_shard
+        self.num_of_shards = num_of_shards
+        self.shard_size = shard_size
+        self.records_per_unit = records_per_unit
+        self.shard_paths = []
+        self.shard_writers = []
+        self.num_of_records = 0
+        for _ in range(num_of_shards if num_of_shards is not None else 1):
+            self.open_next_shard()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def get_shard_path(outpath, shard_index):
+        """Return the path of a shard of a validation fastq file.
+
+        The shard number is placed before the read number, if any, so
+        '..._L1_R1.fastq' becomes '..._L1_S001_R1.fastq'.
+
+        Parameters
+        ----------
+        outpath : str
+            Path of the unsharded validation fastq file
+        shard_index : int
+            Zero based shard index
+
+        Returns
+        -------
+        str
+            Path of the shard
+        """
+        outroot, extension = os.path.splitext(outpath)
+        read_suffix = outroot[-3:] if outroot[-3:] in ("_R1", "_R2") else ""
+        return (f"{outroot[:len(outroot) - len(read_suffix)]}_S{shard_index + 1:03d}"
+                f"{read_suffix}{extension}")
+
+    @staticmethod
+    def get_shard_position(record_index, num_of_shards=None, shard_size=None,
+                           records_per_unit=1):
+        """Return the shard and position within the shard of a record.
+
+        Parameters
+        ----------
+        record_index : int
+            Zero based position of the record in the unsharded fastq file
+        num_of_shards : int
+            Number of shards written round-robin
+        shard_size : int
+            Number of read units per shard, used if num_of_shards is None
+        records_per_unit : int
+            Number of FastQ records kept together in a shard
+
+        Returns
+        -------
+        shard_index : int
+            Zero based shard index
+        shard_record_index : int
+            Zero based position of the record in the shard
+        """
+        unit_index, unit_offset = divmod(record_index, records_per_unit)
+        if num_of_shards is not None:
+            shard_index, shard_unit_index = unit_index % num_of_shards, unit_index // num_of_shards
+        else:
+            shard_index, shard_unit_index = divmod(unit_index, shard_size)
+        return shard_index, shard_unit_index * records_per_unit + unit_offset
+
+    def open_next_shard(self):
+        """Open the writer of the next shard."""
+        shard_path = self.get_shard_path(self.outpath, len(self.shard_paths))
+        self.shard_paths.append(shard_path)
+        self.shard_writers.append(self.open_shard(shard_path))
+
+    def get_record_writer(self):
+        """Return the shard writer of the next record.
+
+        Shards of a fixed size are closed when full and the next shard is
+        opened.
+
+        Returns
+        -------
+        FastqWriter or UbamWriter
+            Writer of the shard to write the next record to
+        """
+        shard_index, _ = self.get_shard_position(self.num_of_records, self.num_of_shards,
+                                                 self.shard_size, self.records_per_unit)
+        while shard_index >= len(self.shard_writers):
+            self.shard_writers[-1].close()
+            self.open_next_shard()
+        self.num_of_records += 1
+        return self.shard_writers[shard_index]
+
+    def write_template(self, header_line, record_lines):
+        """Write a template read to its shard.
+
+        Parameters
+        ----------
+        header_line : bytes
+            Read header line, starting with '@'
+        record_lines : bytes
+            Remaining three lines of the record
+        """
+        self.get_record_writer().write_template(header_line, record_lines)
+
+    def write_donor_read(self, donorread):
+        """Write a donor read to its shard.
+
+        Parameters
+        ----------
+        donorread : tuple of str
+            Read identifier, pair number, sequence and qualities
+        """
+        self.get_record_writer().write_donor_read(donorread)
+
+    def get_open_writers(self):
+        """Return the shard writers that have not been closed yet.
+
+        Returns
+        -------
+        list
+            All shard writers for round-robin shards, otherwise only the last
+        """
+        if self.num_of_shards is not None:
+            return self.shard_writers
+        return self.shard_writers[-1:]
+
+    def flush(self):
+        """Flush the open shard writers."""
+        for shard_writer in self.get_open_writers():
+            shard_writer.flush()
+
+    def close(self):
+        """Close the open shard writers."""
+        for shard_writer in self.get_open_writers():
+            shard_writer.close()
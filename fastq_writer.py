@@ -0,0 +1,48 @@
+"""FastqWriter object class.
+
+Validation files are written record by record: template reads as the header
+line and remaining lines read from the template fastq, and donor reads as
+their (read identifier, pair number, sequence, qualities) tuple. The
+FastqWriter writes both as FastQ lines. The UbamWriter takes the same
+records, so unaligned BAM output is built from the read data directly
+instead of from written FastQ lines.
+"""
+
+import io
+
+
+class FastqWriter(io.BufferedWriter):
+    """Buffered writer of template and donor reads to a validation fastq file."""
+
+    def __init__(self, outpath):
+        """Open the validation fastq file.
+
+        Parameters
+        ----------
+        outpath : str
+            Path to write the validation fastq file to
+        """
+        super().__init__(io.FileIO(outpath, "wb"))
+
+    def write_template(self, header_line, record_lines):
+        """Write a template read.
+
+        Parameters
+        ----------
+        header_line : bytes
+            Read header line, starting with '@'
+        record_lines : bytes
+            Remaining three lines of the record
+        """
+        self.write(header_line)
+        self.write(record_lines)
+
+    def write_donor_read(self, donorread):
+        """Write a donor read.
+
+        Parameters
+        ----------
+        donorread : tuple of str
+            Read identifier, pair number, sequence and qualities
+        """
+        self.write(f"@{donorread[0]}\n{donorread[2]}\n+\n{donorread[3]}\n".encode())
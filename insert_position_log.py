@@ -0,0 +1,316 @@
+"""InsertPositionLog object class.
+
+The InsertPositionLog records at which position each donor read is inserted
+into the R1 and R2 validation fastq files. Instead of a tuple per read that
+is extended for every insert, each insert is appended as a raw row (read
+identifier, fastq set index, R1 and R2 position) to growable columns.
+Keeping only the first R1 and R2 position of each read per validation fastq
+set is left to a single vectorised pass, done when the log is read from,
+written or queried. That pass leaves one row per donor read and validation
+fastq set, sorted by fastq set and read identifier, with the read
+identifiers and fastq set prefixes saved once and referred to by index.
+
+The columns can be written to, and read back from, a compressed NumPy (.npz)
+file, which is queried with the QueryInsertPositions runmode.
+"""
+
+from array import array
+
+import numpy as np
+
+
+class InsertPositionLog:
+    """Columnar donor read insert positions per validation fastq set.
+
+    Attributes
+    ----------
+    fastq_prefixes : list of str
+        Validation fastq set prefixes, in the order they were added
+    read_ids : list of str
+        Sorted donor read identifiers of the compacted rows
+    num_of_rows : int
+        Number of compacted rows
+    read_column : numpy.ndarray of numpy.int64
+        Index of the donor read identifier per compacted row
+    r1_column : numpy.ndarray of numpy.int64
+        R1 insert position per compacted row, -1 if not inserted
+    r2_column : numpy.ndarray of numpy.int64
+        R2 insert position per compacted row, -1 if not inserted
+    fastq_column : numpy.ndarray of numpy.int64
+        Index of the validation fastq set prefix per compacted row
+    """
+
+    NA_POSITION = -1
+
+    def __init__(self):
+        self.fastq_prefixes = []
+        self.fastq_indices = {}
+        self.read_ids = []
+        self.num_of_rows = 0
+        self.read_column = np.empty(0, dtype=np.int64)
+        self.r1_column = np.empty(0, dtype=np.int64)
+        self.r2_column = np.empty(0, dtype=np.int64)
+        self.fastq_column = np.empty(0, dtype=np.int64)
+        self.pending_blocks = []
+        self.insert_read_ids = []
+        self.insert_fastqs = array("q")
+        self.insert_r1s = array("q")
+        self.insert_r2s = array("q")
+
+    def __len__(self):
+        """Return the number of logged donor reads."""
+        self.compact()
+        return self.num_of_rows
+
+    def __contains__(self, fastq_prefix):
+        """Return whether a validation fastq set has been added."""
+        return fastq_prefix in self.fastq_indices
+
+    def add_fastq(self, fastq_prefix):
+        """Add a validation fastq set to record insert positions for.
+
+        Parameters
+        ----------
+        fastq_prefix : str
+            Prefix shared by the R1 and R2 validation fastq file
+
+        Returns
+        -------
+        int
+            Index of the validation fastq set
+        """
+        if fastq_prefix not in self.fastq_indices:
+            self.fastq_indices[fastq_prefix] = len(self.fastq_prefixes)
+            self.fastq_prefixes.append(fastq_prefix)
+        return self.fastq_indices[fastq_prefix]
+
+    def add_insert(self, fastq_prefix, read_id, forward_reverse, insert_position):
+        """Record the insert position of an R1 or R2 donor read.
+
+        Inserts into validation fastq sets that have not been added are
+        ignored. Only the first insert position of each R1 and R2 read is
+        kept.
+
+        Parameters
+        ----------
+        fastq_prefix : str
+            Prefix of the validation fastq set
+        read_id : str
+            Donor read identifier
+        forward_reverse : str
+            Whether the read is R1 ('1') or R2 ('2')
+        insert_position : int
+            Position the donor read was inserted at in the validation fastq
+        """
+        fastq_index = self.fastq_indices.get(fastq_prefix)
+        if fastq_index is None:
+            return
+        self.insert_read_ids.append(read_id)
+        self.insert_fastqs.append(fastq_index)
+        if forward_reverse == "1":
+            self.insert_r1s.append(insert_position)
+            self.insert_r2s.append(self.NA_POSITION)
+        else:
+            self.insert_r1s.append(self.NA_POSITION)
+            self.insert_r2s.append(insert_position)
+
+    def seal_inserts(self):
+        """Move the raw inserts added so far into a pending block."""
+        if not self.insert_read_ids:
+            return
+        self.pending_blocks.append((self.insert_read_ids,
+                                    np.arange(len(self.insert_read_ids), dtype=np.int64),
+                                    np.frombuffer(self.insert_fastqs, dtype=np.int64),
+                                    np.frombuffer(self.insert_r1s, dtype=np.int64),
+                                    np.frombuffer(self.insert_r2s, dtype=np.int64)))
+        self.insert_read_ids = []
+        self.insert_fastqs = array("q")
+        self.insert_r1s = array("q")
+        self.insert_r2s = array("q")
+
+    def merge(self, other_log):
+        """Add the validation fastq sets and insert positions of another log.
+
+        Parameters
+        ----------
+        other_log : InsertPositionLog
+            Insert positions recorded separately, for example by another process
+        """
+        other_log.compact()
+        fastq_index_map = np.array([self.add_fastq(x) for x in other_log.fastq_prefixes],
+                                   dtype=np.int64)
+        if not other_log.num_of_rows:
+            return
+        self.seal_inserts()
+        self.pending_blocks.append((other_log.read_ids, other_log.read_column,
+                                    fastq_index_map[other_log.fastq_column],
+                                    other_log.r1_column, other_log.r2_column))
+
+    def compact(self):
+        """Fold the pending inserts into one sorted row per read and fastq set.
+
+        The distinct read identifiers of all blocks are sorted at once, and
+        the read indices of each block are remapped to their rank with an
+        array lookup. A single stable sort on fastq set and read then groups
+        the inserts of each row in insert order, of which the first R1 and
+        R2 position is kept.
+        """
+        self.seal_inserts()
+        if not self.pending_blocks:
+            return
+        blocks = [(self.read_ids, self.read_column, self.fastq_column, self.r1_column,
+                   self.r2_column)] + self.pending_blocks
+        self.pending_blocks = []
+
+        # Sort only the distinct read identifiers, then map each block to their ranks
+        read_ids = sorted(dict.fromkeys(x for block in blocks for x in block[0]))
+        read_ranks = {x: y for y, x in enumerate(read_ids)}
+        read_column = np.concatenate([
+            np.fromiter(map(read_ranks.__getitem__, block[0]), dtype=np.int64,
+                        count=len(block[0]))[block[1]]
+            for block in blocks])
+        fastq_column = np.concatenate([x[2] for x in blocks])
+        r1_column = np.concatenate([x[3] for x in blocks])
+        r2_column = np.concatenate([x[4] for x in blocks])
+
+        # Rows sort by fastq set first and read identifier second, and keep their
+        # insert order within each row key
+        row_keys = fastq_column * max(1, len(read_ids)) + read_column
+        row_order = np.argsort(row_keys, kind="stable")
+        row_keys = row_keys[row_order]
+        is_row_start = np.empty(len(row_keys), dtype=bool)
+        is_row_start[:1] = True
+        np.not_equal(row_keys[1:], row_keys[:-1], out=is_row_start[1:])
+        row_numbers = np.cumsum(is_row_start) - 1
+        unique_keys = row_keys[is_row_start]
+        self.r1_column = self.get_first_positions(len(unique_keys), row_numbers,
+                                                  r1_column[row_order])
+        self.r2_column = self.get_first_positions(len(unique_keys), row_numbers,
+                                                  r2_column[row_order])
+        self.fastq_column, self.read_column = np.divmod(unique_keys, max(1, len(read_ids)))
+        self.read_ids = read_ids
+        self.num_of_rows = len(unique_keys)
+
+    @classmethod
+    def get_first_positions(cls, num_of_rows, row_numbers, position_column):
+        """Return the first logged position per row.
+
+        Parameters
+        ----------
+        num_of_rows : int
+            Number of rows
+        row_numbers : numpy.ndarray of numpy.int64
+            Row number per logged insert, sorted with inserts in insert order
+            within each row
+        position_column : numpy.ndarray of numpy.int64
+            Insert position per logged insert, -1 if not inserted
+
+        Returns
+        -------
+        numpy.ndarray of numpy.int64
+            First insert position per row, -1 if not inserted
+        """
+        first_positions = np.full(num_of_rows, cls.NA_POSITION, dtype=np.int64)
+        inserted = np.flatnonzero(position_column != cls.NA_POSITION)
+        inserted_rows = row_numbers[inserted]
+        is_first = np.empty(len(inserted_rows), dtype=bool)
+        is_first[:1] = True
+        np.not_equal(inserted_rows[1:], inserted_rows[:-1], out=is_first[1:])
+        first_positions[inserted_rows[is_first]] = position_column[inserted[is_first]]
+        return first_positions
+
+    def get_rows(self, row_mask=None):
+        """Yield the logged insert positions sorted by fastq set and read identifier.
+
+        Parameters
+        ----------
+        row_mask : numpy.ndarray of bool
+            Rows to return, all rows if None
+
+        Yields
+        ------
+        tuple
+            Fastq set prefix, read identifier, and R1 and R2 insert position
+            (None if not inserted)
+        """
+        self.compact()
+        row_indices = np.arange(self.num_of_rows)
+        if row_mask is not None:
+            row_indices = row_indices[row_mask]
+        for fastq_index, read_index, r1_position, r2_position in zip(
+                self.fastq_column[row_indices].tolist(), self.read_column[row_indices].tolist(),
+                self.r1_column[row_indices].tolist(), self.r2_column[row_indices].tolist()):
+            yield (self.fastq_prefixes[fastq_index], self.read_ids[read_index],
+                   None if r1_position == self.NA_POSITION else r1_position,
+                   None if r2_position == self.NA_POSITION else r2_position)
+
+    def query(self, read_ids=None, fastq_prefixes=None):
+        """Yield the logged insert positions of selected reads and fastq sets.
+
+        Parameters
+        ----------
+        read_ids : list of str
+            Donor read identifiers to select, all reads if None
+        fastq_prefixes : list of str
+            Validation fastq set prefixes to select, all sets if None
+
+        Yields
+        ------
+        tuple
+            Fastq set prefix, read identifier, and R1 and R2 insert position
+            (None if not inserted)
+        """
+        self.compact()
+        row_mask = np.ones(self.num_of_rows, dtype=bool)
+        if read_ids is not None:
+            selected_reads = np.flatnonzero(np.isin(np.array(self.read_ids, dtype=str),
+                                                    np.array(read_ids, dtype=str)))
+            row_mask &= np.isin(self.read_column, selected_reads)
+        if fastq_prefixes is not None:
+            selected_fastqs = [self.fastq_indices[x] for x in fastq_prefixes
+                               if x in self.fastq_indices]
+            row_mask &= np.isin(self.fastq_column, selected_fastqs)
+        yield from self.get_rows(row_mask)
+
+    def write_columns(self, outpath):
+        """Write the log columns to a compressed NumPy file.
+
+        Parameters
+        ----------
+        outpath : str
+            Path and name to write the .npz file to
+        """
+        self.compact()
+        with open(outpath, "wb") as columnfile:
+            np.savez_compressed(columnfile,
+                                read_column=self.read_column,
+                                r1_column=self.r1_column,
+                                r2_column=self.r2_column,
+                                fastq_column=self.fastq_column,
+                                read_ids=np.array(self.read_ids, dtype=str),
+                                fastq_prefixes=np.array(self.fastq_prefixes, dtype=str))
+
+    @classmethod
+    def read_columns(cls, inpath):
+        """Read and return a log written with write_columns.
+
+        Parameters
+        ----------
+        inpath : str
+            Path to the .npz file
+
+        Returns
+        -------
+        InsertPositionLog
+            Log with the read columns
+        """
+        insert_log = cls()
+        with np.load(inpath) as columndata:
+            for fastq_prefix in columndata["fastq_prefixes"].tolist():
+                insert_log.add_fastq(fastq_prefix)
+            insert_log.pending_blocks.append((columndata["read_ids"].tolist(),
+                                              columndata["read_column"],
+                                              columndata["fastq_column"],
+                                              columndata["r1_column"],
+                                              columndata["r2_column"]))
+        return insert_log
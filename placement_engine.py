@@ -0,0 +1,120 @@
+"""PlacementEngine object class.
+
+The positions at which donor reads are inserted into a validation fastq file
+used to be drawn from the global random module, which was reseeded with the
+same seed for every file. The PlacementEngine instead draws them from an
+independent NumPy random generator per output lane, derived from the random
+seed, the output name and the lane number. The placement of each lane
+therefore does not depend on which other lanes were placed before it, or in
+which process, and the R1 and R2 files of a lane get the same placement.
+"""
+
+import hashlib
+import os
+import re
+
+import numpy as np
+
+
+class PlacementEngine:
+    """Per-lane random donor read placement.
+
+    Attributes
+    ----------
+    seed : int
+        Random seed to derive the lane generators from
+    """
+
+    # <output name>_<date>_L<lane>[_DS<fraction>][_S<shard>][_R<1|2>].<fastq|bam>, as
+    # set by set_fastq_out_path, for downsampled, sharded and interleaved files as well
+    FASTQ_OUT_PATTERN = re.compile(
+        r"^(.*)_\d{4}-\d{2}-\d{2}_L(\d+)(?:_DS[\dp]+)?(?:_S\d+)?(?:_R[12])?\.(fastq|bam)")
+
+    def __init__(self, seed=2):
+        """Save the random seed.
+
+        Parameters
+        ----------
+        seed : int
+            Random seed to derive the lane generators from
+        """
+        self.seed = seed
+
+    @classmethod
+    def get_output_lane(cls, fastq_outpath):
+        """Return the output name and lane number of a validation fastq file.
+
+        The date and read number are left out, so the R1 and R2 files of a
+        lane share the same placement, on any day.
+
+        Parameters
+        ----------
+        fastq_outpath : str
+            Path to the validation fastq file
+
+        Returns
+        -------
+        output_name : str
+            Output name of the validation set
+        lane : int
+            Lane number of the validation fastq file, 0 if unknown
+        """
+        fastq_name = os.path.basename(fastq_outpath)
+        fastq_name_match = cls.FASTQ_OUT_PATTERN.match(fastq_name)
+        if fastq_name_match is None:
+            return fastq_name.split(".")[0], 0
+        return fastq_name_match.group(1), int(fastq_name_match.group(2))
+
+    def get_generator(self, output_name, lane):
+        """Return the random generator of an output lane.
+
+        Parameters
+        ----------
+        output_name : str
+            Output name of the validation set
+        lane : int
+            Lane number
+
+        Returns
+        -------
+        numpy.random.Generator
+            Independent random generator for the lane
+        """
+        name_hash = int.from_bytes(hashlib.blake2b(output_name.encode(), digest_size=8).digest(),
+                                   "little")
+        # SeedSequence only takes non-negative integers, so negative seeds are used as unsigned.
+        return np.random.Generator(np.random.PCG64(
+            np.random.SeedSequence([self.seed & (2**64 - 1), name_hash, lane])))
+
+    def get_add_positions(self, num_of_template_reads, num_of_donor_reads, output_name, lane):
+        """Return random template positions to add the donor reads of a lane after.
+
+        Each template position is used at most once, unless there are more
+        donor reads than template reads. In that case every template position
+        is used once per full round of template reads.
+
+        Parameters
+        ----------
+        num_of_template_reads : int
+            Number of reads in the template fastq file
+        num_of_donor_reads : int
+            Number of donor reads to add
+        output_name : str
+            Output name of the validation set
+        lane : int
+            Lane number
+
+        Returns
+        -------
+        numpy.ndarray of numpy.int64
+            Template read positions, one per donor read
+        """
+        if num_of_template_reads <= 0 or num_of_donor_reads <= 0:
+            return np.empty(0, dtype=np.int64)
+        lane_generator = self.get_generator(output_name, lane)
+        num_of_rounds, num_of_remaining = divmod(num_of_donor_reads, num_of_template_reads)
+        add_positions = [lane_generator.permutation(num_of_template_reads)
+                         for _ in range(num_of_rounds)]
+        add_positions.append(lane_generator.choice(num_of_template_reads, num_of_remaining,
+                                                   replace=False))
+        return np.concatenate(add_positions).astype(np.int64)
@@ -0,0 +1,196 @@
+"""SpikeInCache object class.
+
+The same donor variants are often turned into spike-ins again in later
+BuildSpikeIns runs. The SpikeInCache keeps the established contexts of
+variants and the output files of spike-ins in a persistent directory, in an
+entry per hash of everything they depend on, so later runs read the contexts
+and copy the files instead of fetching the reads and variants and writing
+them again. Entries are stored under a temporary name
+and renamed when complete, so concurrent runs can share a cache directory.
+The least recently used entries are removed when the cache grows beyond its
+maximum size.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+
+class SpikeInCache:
+    """Persistent, content-addressed store of spike-in output files.
+
+    Attributes
+    ----------
+    cache_dir : str
+        Path to the cache directory
+    max_size : int
+        Maximum size of the cache in bytes, None for no maximum
+    """
+
+    # Changes to how contexts are established, or to the cached contexts and written spike-in
+    # files, should bump this version to miss older entries.
+    CACHE_VERSION = "2"
+
+    def __init__(self, cache_dir, max_size=None):
+        """Open or create the cache directory.
+
+        Parameters
+        ----------
+        cache_dir : str
+            Path to the cache directory
+        max_size : int
+            Maximum size of the cache in bytes, None for no maximum
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def get_file_identity(filepath):
+        """Return the identity of a file, changing when the file is replaced or modified.
+
+        Parameters
+        ----------
+        filepath : str
+            Path to the file
+
+        Returns
+        -------
+        tuple
+            Absolute path, size and modification time in nanoseconds
+        """
+        file_stat = os.stat(filepath)
+        return os.path.abspath(filepath), file_stat.st_size, file_stat.st_mtime_ns
+
+    def get_key(self, *key_parts):
+        """Return the cache key of the parts a spike-in depends on.
+
+        Parameters
+        ----------
+        *key_parts
+            Values with a stable string representation
+
+        Returns
+        -------
+        str
+            Hexadecimal SHA-256 hash of the cache version and key parts
+        """
+        return hashlib.sha256(repr((self.CACHE_VERSION,) + key_parts).encode()).hexdigest()
+
+    def get_entry_dir(self, key):
+        """Return the directory of a cache entry.
+
+        Parameters
+        ----------
+        key : str
+            Cache key
+
+        Returns
+        -------
+        str
+            Path to the entry directory
+        """
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def has_entry(self, key):
+        """Return whether a cache entry is stored.
+
+        Parameters
+        ----------
+        key : str
+            Cache key
+
+        Returns
+        -------
+        bool
+            True if the entry is stored, False otherwise
+        """
+        return os.path.isdir(self.get_entry_dir(key))
+
+    def fetch(self, key, file_prefix):
+        """Copy the files of a cache entry to the output location.
+
+        Parameters
+        ----------
+        key : str
+            Cache key
+        file_prefix : str
+            Path and name prefix to append the cached file suffixes to
+
+        Returns
+        -------
+        bool
+            True if the entry was cached and copied, False otherwise
+        """
+        entry_dir = self.get_entry_dir(key)
+        try:
+            for file_suffix in os.listdir(entry_dir):
+                shutil.copyfile(os.path.join(entry_dir, file_suffix), f"{file_prefix}{file_suffix}")
+            os.utime(entry_dir)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def store(self, key, file_prefix, filepaths):
+        """Store output files in a cache entry.
+
+        Parameters
+        ----------
+        key : str
+            Cache key
+        file_prefix : str
+            Path and name prefix of the files, their remaining suffix is
+            their name in the entry
+        filepaths : list of str
+            Paths to the files to store
+        """
+        entry_dir = self.get_entry_dir(key)
+        os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+        temp_dir = tempfile.mkdtemp(prefix=".tmp_", dir=os.path.dirname(entry_dir))
+        for filepath in filepaths:
+            shutil.copyfile(filepath, os.path.join(temp_dir, filepath[len(file_prefix):]))
+        try:
+            os.rename(temp_dir, entry_dir)
+        except OSError:
+            # Another run stored the entry first.
+            shutil.rmtree(temp_dir)
+
+    def get_entries(self):
+        """Return the cache entries with their last use and size.
+
+        Returns
+        -------
+        list of tuple
+            Last use time, size in bytes and directory per entry
+        """
+        cache_entries = []
+        for key_group in os.scandir(self.cache_dir):
+            if not key_group.is_dir():
+                continue
+            for entry in os.scandir(key_group.path):
+                if entry.is_dir() and not entry.name.startswith(".tmp_"):
+                    entry_size = sum(x.stat().st_size for x in os.scandir(entry.path))
+                    cache_entries.append((entry.stat().st_mtime_ns, entry_size, entry.path))
+        return cache_entries
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits its maximum size.
+
+        Returns
+        -------
+        int
+            Number of removed entries
+        """
+        if self.max_size is None:
+            return 0
+        cache_entries = sorted(self.get_entries())
+        cache_size = sum(x[1] for x in cache_entries)
+        num_of_removed = 0
+        for _, entry_size, entry_dir in cache_entries:
+            if cache_size <= self.max_size:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            cache_size -= entry_size
+            num_of_removed += 1
+        return num_of_removed
@@ -0,0 +1,181 @@
+"""SpikeInLibraryIndex object class.
+
+P-mode writes a BAM, BAI and VCF file per variant context, which puts a lot
+of pressure on filesystems with many small files. The L-mode spike-in
+library instead holds all spike-ins in a single coordinate sorted BAM file,
+with each read tagged with its variant context. The SpikeInLibraryIndex
+lists per variant context its window and the virtual offsets of the BGZF
+byte range holding its reads, so the reads of any subset of contexts can be
+read with a few seeks instead of opening a file per context.
+"""
+
+import os
+
+
+class SpikeInLibraryIndex:
+    """Window and BAM byte range per variant context of a spike-in library.
+
+    Attributes
+    ----------
+    contexts : dict
+        Chromosome, start, end, first and end virtual offset, and number of
+        reads per variant context identifier, in library order
+    """
+
+    HEADER = "#ContextId\tChrom\tStart\tEnd\tBamStart\tBamEnd\tReads\n"
+
+    def __init__(self):
+        self.contexts = {}
+
+    def __len__(self):
+        """Return the number of indexed variant contexts."""
+        return len(self.contexts)
+
+    def __contains__(self, context_id):
+        """Return whether a variant context is indexed."""
+        return context_id in self.contexts
+
+    @staticmethod
+    def get_index_path(library_bam):
+        """Return the path of the context index of a spike-in library BAM file.
+
+        Parameters
+        ----------
+        library_bam : str
+            Path to the spike-in library BAM file
+
+        Returns
+        -------
+        str
+            Path to the context index file
+        """
+        return f"{os.path.splitext(library_bam)[0]}_contexts.txt"
+
+    def add_context(self, context_id, chrom, start, end, bam_start, bam_end, num_of_reads):
+        """Add a variant context to the index.
+
+        Parameters
+        ----------
+        context_id : str
+            Variant context identifier
+        chrom : str
+            Chromosome name of the context
+        start : int
+            Leftmost genomic position of the context window
+        end : int
+            Rightmost genomic position of the context window
+        bam_start : int
+            Virtual offset of the first read of the context
+        bam_end : int
+            Virtual offset after the last read of the context
+        num_of_reads : int
+            Number of reads of the context
+        """
+        self.contexts[context_id] = (chrom, int(start), int(end), int(bam_start), int(bam_end),
+                                     int(num_of_reads))
+
+    def write(self, outpath):
+        """Write the index to a tab separated file.
+
+        Parameters
+        ----------
+        outpath : str
+            Path to write the index file to
+        """
+        with open(outpath, "w") as indexfile:
+            indexfile.write(self.HEADER)
+            for context_id, context_fields in self.contexts.items():
+                indexfile.write("\t".join(map(str, (context_id,) + context_fields)) + "\n")
+
+    @classmethod
+    def read(cls, inpath):
+        """Read an index from a tab separated file.
+
+        Parameters
+        ----------
+        inpath : str
+            Path to the index file
+
+        Returns
+        -------
+        SpikeInLibraryIndex
+            Index read from the file
+        """
+        library_index = cls()
+        with open(inpath, "r") as indexfile:
+            for fileline in indexfile:
+                if not fileline.startswith("#"):
+                    library_index.add_context(*fileline.rstrip("\n").split("\t"))
+        return library_index
+
+    @staticmethod
+    def parse_region(region):
+        """Return the chromosome and window of a samtools style region.
+
+        Parameters
+        ----------
+        region : str
+            Region as 'chrom', 'chrom:start' or 'chrom:start-end', 1-based
+            and inclusive
+
+        Returns
+        -------
+        tuple of str, int and int
+            Chromosome, and zero based start and end position, None if open
+        """
+        chrom, _, window = region.partition(":")
+        if not window:
+            return chrom, None, None
+        start, _, end = window.replace(",", "").partition("-")
+        return chrom, int(start) - 1, int(end) if end else None
+
+    def select_contexts(self, context_ids=None, regions=None):
+        """Return the indexed variant contexts with a selected ID or overlapping a region.
+
+        Parameters
+        ----------
+        context_ids : list of str
+            Variant context identifiers to select
+        regions : list of str
+            Regions to select the overlapping variant contexts of
+
+        Returns
+        -------
+        list of str
+            Selected variant context identifiers in library order, all if
+            no identifiers or regions are provided
+        """
+        if not context_ids and not regions:
+            return list(self.contexts)
+        context_ids = set(context_ids or [])
+        regions = [self.parse_region(x) for x in regions or []]
+        selected_ids = []
+        for context_id, (chrom, start, end, *_) in self.contexts.items():
+            if context_id in context_ids or any(
+                    chrom == x and (y is None or end >= y) and (z is None or start < z)
+                    for x, y, z in regions):
+                selected_ids.append(context_id)
+        return selected_ids
+
+    def get_byte_ranges(self, context_ids):
+        """Return the merged BAM byte ranges holding the reads of variant contexts.
+
+        Parameters
+        ----------
+        context_ids : list of str
+            Variant context identifiers
+
+        Returns
+        -------
+        list of tuple of int
+            Non-overlapping start and end virtual offsets, in file order
+        """
+        byte_ranges = sorted(self.contexts[x][3:5] for x in context_ids
+                             if self.contexts[x][5] > 0)
+        merged_ranges = []
+        for bam_start, bam_end in byte_ranges:
+            if merged_ranges and bam_start <= merged_ranges[-1][1]:
+                merged_ranges[-1] = (merged_ranges[-1][0], max(merged_ranges[-1][1], bam_end))
+            else:
+                merged_ranges.append((bam_start, bam_end))
+        return merged_ranges
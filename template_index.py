@@ -0,0 +1,447 @@
+"""TemplateIndex object class.
+
+A template index is a sidecar file (<template>.vfqi) next to a gzipped
+template fastq file. It saves the number of records in the template, the
+size, modification time and checksum of the template, and the offsets of
+every Nth record. Validation fastq writers use a fresh index to count the
+template reads without decompressing the template, and to split BGZF
+templates into chunks without scanning them first. An index is used while
+the size and modification time of its template are unchanged. When an index
+is loaded, sampled records of a BGZF template are also read through the
+saved offsets, and the index is rebuilt if the template no longer matches
+it. The checksum of a regular gzip template is only compared when indexes
+are verified explicitly, as it takes reading the whole template.
+
+The sidecar is a tab-separated text file with '#' header lines, followed by
+one line per checkpoint with the record number, the BGZF virtual offset (-1
+for regular gzip) and the uncompressed offset of that record.
+"""
+
+import gzip
+import hashlib
+import io
+import logging
+import os
+
+import pysam
+
+from bgzf_template import BgzfTemplate
+
+
+class TemplateIndex:
+    """Record count and checkpoint offsets of a template fastq file.
+
+    Attributes
+    ----------
+    template_fq : str
+        Path to the indexed template fastq file
+    checkpoint_interval : int
+        Number of records between two checkpoints
+    num_of_records : int
+        Number of records in the template
+    file_size : int
+        Size of the template in bytes when it was indexed
+    file_mtime : int
+        Modification time of the template in nanoseconds when it was indexed
+    checksum : str
+        BLAKE2b checksum of a compressed regular gzip template, empty for BGZF
+    is_bgzf : bool
+        Whether the template is BGZF compressed
+    virtual_offsets : list of int
+        BGZF virtual offsets of the checkpoint records, -1 for regular gzip
+    uncompressed_offsets : list of int
+        Uncompressed offsets of the checkpoint records
+    """
+
+    INDEX_VERSION = "1"
+    INDEX_SUFFIX = ".vfqi"
+
+    def __init__(self, template_fq, checkpoint_interval=100000):
+        """Save the template fastq file and checkpoint interval.
+
+        Parameters
+        ----------
+        template_fq : str
+            Path to the template fastq file
+        checkpoint_interval : int
+            Number of records between two checkpoints
+        """
+        self.template_fq = template_fq
+        self.checkpoint_interval = checkpoint_interval
+        self.num_of_records = 0
+        self.file_size = 0
+        self.file_mtime = 0
+        self.checksum = ""
+        self.is_bgzf = False
+        self.virtual_offsets = []
+        self.uncompressed_offsets = []
+
+    @classmethod
+    def get_index_path(cls, template_fq):
+        """Return the sidecar path of a template fastq file.
+
+        Parameters
+        ----------
+        template_fq : str
+            Path to the template fastq file
+
+        Returns
+        -------
+        str
+            Path to the template index sidecar
+        """
+        return template_fq + cls.INDEX_SUFFIX
+
+    @classmethod
+    def build(cls, template_fq, checkpoint_interval=100000):
+        """Scan a template fastq file and return its index.
+
+        Parameters
+        ----------
+        template_fq : str
+            Path to the template fastq file
+        checkpoint_interval : int
+            Number of records between two checkpoints
+
+        Returns
+        -------
+        TemplateIndex
+            Index of the template
+        """
+        template_index = cls(template_fq, checkpoint_interval)
+        template_stat = os.stat(template_fq)
+        template_index.file_size = template_stat.st_size
+        template_index.file_mtime = template_stat.st_mtime_ns
+        template_index.is_bgzf = BgzfTemplate.is_bgzf(template_fq)
+        if template_index.is_bgzf:
+            template_index.scan_bgzf_template()
+        else:
+            template_index.scan_gzip_template()
+        return template_index
+
+    def scan_bgzf_template(self):
+        """Count the records and save the checkpoint offsets of a BGZF template."""
+        uncompressed_offset = 0
+        with pysam.BGZFile(self.template_fq, "rb") as templatefile:
+            while True:
+                record_offset = templatefile.tell()
+                record_lines = [templatefile.readline() for _ in range(4)]
+                if not record_lines[0]:
+                    break
+                self.add_checkpoint(record_offset, uncompressed_offset)
+                # BGZFile.readline() strips the newline of each line.
+                uncompressed_offset += sum(len(x) for x in record_lines) + 4
+                self.num_of_records += 1
+
+    def scan_gzip_template(self):
+        """Count the records and save the uncompressed checkpoint offsets of a gzip template.
+
+        The checksum of the compressed template is calculated from the same
+        read of the template.
+        """
+        uncompressed_offset = 0
+        checksum = hashlib.blake2b(digest_size=16)
+        with open(self.template_fq, "rb") as rawfile:
+            checksum_reader = ChecksumReader(rawfile, checksum)
+            with io.BufferedReader(gzip.GzipFile(fileobj=checksum_reader,
+                                                 mode="rb")) as templatefile:
+                for fileline in templatefile:
+                    record_length = (len(fileline) + len(next(templatefile))
+                                     + len(next(templatefile)) + len(next(templatefile)))
+                    self.add_checkpoint(-1, uncompressed_offset)
+                    uncompressed_offset += record_length
+                    self.num_of_records += 1
+            # Add any bytes the decompression did not need to the checksum.
+            for _ in iter(lambda: checksum_reader.read(1 << 20), b""):
+                pass
+        self.checksum = checksum.hexdigest()
+
+    def add_checkpoint(self, virtual_offset, uncompressed_offset):
+        """Save the offsets of the current record if it is a checkpoint.
+
+        Parameters
+        ----------
+        virtual_offset : int
+            BGZF virtual offset of the record, -1 for regular gzip
+        uncompressed_offset : int
+            Uncompressed offset of the record
+        """
+        if self.num_of_records % self.checkpoint_interval == 0:
+            self.virtual_offsets.append(virtual_offset)
+            self.uncompressed_offsets.append(uncompressed_offset)
+
+    @staticmethod
+    def calculate_checksum(template_fq):
+        """Return the BLAKE2b checksum of a file.
+
+        Parameters
+        ----------
+        template_fq : str
+            Path to the file
+
+        Returns
+        -------
+        str
+            Hexadecimal checksum
+        """
+        checksum = hashlib.blake2b(digest_size=16)
+        with open(template_fq, "rb") as templatefile:
+            for file_block in iter(lambda: templatefile.read(1 << 20), b""):
+                checksum.update(file_block)
+        return checksum.hexdigest()
+
+    def is_fresh(self):
+        """Return whether the template is unchanged since it was indexed.
+
+        The size and modification time of the template are compared with
+        the saved values.
+
+        Returns
+        -------
+        bool
+            True if the index can be used for the template, False if not
+        """
+        try:
+            template_stat = os.stat(self.template_fq)
+        except OSError:
+            return False
+        return (template_stat.st_size == self.file_size
+                and template_stat.st_mtime_ns == self.file_mtime)
+
+    def verify(self, num_of_samples=8, full=False):
+        """Return whether the template content still matches the index.
+
+        For BGZF templates, the records at evenly spaced checkpoints and all
+        records after the last checkpoint are read through the saved virtual
+        offsets. Regular gzip templates cannot be read at an offset, so only
+        with full=True their checksum is compared, which reads the whole
+        template. Otherwise an unchanged size and modification time are
+        relied upon.
+
+        Parameters
+        ----------
+        num_of_samples : int
+            Maximum number of checkpoint records to read
+        full : bool
+            Whether to compare the checksum of a regular gzip template
+
+        Returns
+        -------
+        bool
+            True if the template matches the index, False if not
+        """
+        if not self.is_bgzf:
+            return not full or self.verify_checksum()
+        if not self.virtual_offsets:
+            return self.num_of_records == 0
+        num_of_checkpoints = len(self.virtual_offsets)
+        sample_step = max(1, num_of_checkpoints // num_of_samples)
+        for checkpoint_index in range(0, num_of_checkpoints, sample_step):
+            if not self.is_record(self.read_record(checkpoint_index * self.checkpoint_interval)):
+                return False
+        num_of_tail_records = (self.num_of_records
+                               - (num_of_checkpoints - 1) * self.checkpoint_interval)
+        tail_records = list(BgzfTemplate(self.template_fq).read_records(
+            self.virtual_offsets[-1], self.checkpoint_interval + 1
+            ))
+        return (len(tail_records) == num_of_tail_records
+                and all(self.is_record(b"".join(x)) for x in tail_records))
+
+    @staticmethod
+    def is_record(record_lines):
+        """Return whether record lines form a single fastq record.
+
+        Parameters
+        ----------
+        record_lines : bytes or None
+            Lines of the record
+
+        Returns
+        -------
+        bool
+            True if the lines are a fastq record, False if not
+        """
+        if not record_lines:
+            return False
+        record_lines = record_lines.split(b"\n")
+        return (len(record_lines) == 5 and record_lines[0].startswith(b"@")
+                and record_lines[2].startswith(b"+") and not record_lines[4])
+
+    def verify_checksum(self):
+        """Return whether the checksum of the template matches the saved checksum.
+
+        Returns
+        -------
+        bool
+            True if the checksums match, False if not
+        """
+        return self.calculate_checksum(self.template_fq) == self.checksum
+
+    def write_index(self, index_path=None):
+        """Write the index to its sidecar file.
+
+        Parameters
+        ----------
+        index_path : str
+            Path to write the index to (Default: <template>.vfqi)
+        """
+        if index_path is None:
+            index_path = self.get_index_path(self.template_fq)
+        with open(index_path, "w") as indexfile:
+            indexfile.write(f"#VFQI\t{self.INDEX_VERSION}\n"
+                            f"#Records\t{self.num_of_records}\n"
+                            f"#Size\t{self.file_size}\n"
+                            f"#Mtime\t{self.file_mtime}\n"
+                            f"#Checksum\t{self.checksum}\n"
+                            f"#Bgzf\t{int(self.is_bgzf)}\n"
+                            f"#Interval\t{self.checkpoint_interval}\n"
+                            "#Record\tVirtualOffset\tUncompressedOffset\n")
+            for checkpoint_index, (virtual_offset, uncompressed_offset) in enumerate(
+                    zip(self.virtual_offsets, self.uncompressed_offsets)):
+                indexfile.write(f"{checkpoint_index * self.checkpoint_interval}\t"
+                                f"{virtual_offset}\t{uncompressed_offset}\n")
+
+    @classmethod
+    def read_index(cls, template_fq, index_path=None):
+        """Read and return the index of a template fastq file.
+
+        Parameters
+        ----------
+        template_fq : str
+            Path to the template fastq file
+        index_path : str
+            Path to the index sidecar (Default: <template>.vfqi)
+
+        Returns
+        -------
+        TemplateIndex
+            Index of the template
+        """
+        if index_path is None:
+            index_path = cls.get_index_path(template_fq)
+        template_index = cls(template_fq)
+        index_header = {}
+        with open(index_path, "r") as indexfile:
+            for fileline in indexfile:
+                filelinedata = fileline.rstrip("\n").split("\t")
+                if fileline.startswith("#"):
+                    index_header[filelinedata[0][1:]] = filelinedata[1:]
+                    continue
+                template_index.virtual_offsets.append(int(filelinedata[1]))
+                template_index.uncompressed_offsets.append(int(filelinedata[2]))
+        if index_header.get("VFQI") != [cls.INDEX_VERSION]:
+            raise ValueError(f"{index_path} is not a version {cls.INDEX_VERSION} template index")
+        template_index.num_of_records = int(index_header["Records"][0])
+        template_index.file_size = int(index_header["Size"][0])
+        template_index.file_mtime = int(index_header["Mtime"][0])
+        template_index.checksum = index_header["Checksum"][0]
+        template_index.is_bgzf = index_header["Bgzf"][0] == "1"
+        template_index.checkpoint_interval = int(index_header["Interval"][0])
+        return template_index
+
+    @classmethod
+    def read_fresh_index(cls, template_fq, full=False):
+        """Return the index of a template fastq file if it exists and is fresh.
+
+        An index of a template with the saved size and modification time
+        whose content no longer matches is rebuilt, and rewritten if possible.
+
+        Parameters
+        ----------
+        template_fq : str
+            Path to the template fastq file
+        full : bool
+            Whether to compare the checksum of a regular gzip template
+
+        Returns
+        -------
+        TemplateIndex or None
+            Index of the template, None if there is no usable index
+        """
+        if not os.path.isfile(cls.get_index_path(template_fq)):
+            return None
+        try:
+            template_index = cls.read_index(template_fq)
+        except (IOError, ValueError, KeyError, IndexError):
+            return None
+        if not template_index.is_fresh():
+            return None
+        if not template_index.verify(full=full):
+            vaselogger = logging.getLogger("VaSe_Logger")
+            vaselogger.warning(f"Template index of {template_fq} does not match the template ; "
+                               "Rebuilding it")
+            template_index = cls.build(template_fq, template_index.checkpoint_interval)
+            try:
+                template_index.write_index()
+            except IOError:
+                vaselogger.warning("Could not rewrite template index "
+                                   f"{cls.get_index_path(template_fq)}")
+        return template_index
+
+    def read_record(self, record_index):
+        """Return a single record of a BGZF template using the nearest checkpoint.
+
+        Parameters
+        ----------
+        record_index : int
+            Zero-based index of the record to read
+
+        Returns
+        -------
+        bytes or None
+            Record lines, None if the record does not exist or the template
+            is not BGZF compressed
+        """
+        if not self.is_bgzf or not 0 <= record_index < self.num_of_records:
+            return None
+        checkpoint_index = record_index // self.checkpoint_interval
+        template_records = BgzfTemplate(self.template_fq).read_records(
+            self.virtual_offsets[checkpoint_index],
+            record_index - checkpoint_index * self.checkpoint_interval + 1
+            )
+        record_lines = None
+        for template_record in template_records:
+            record_lines = b"".join(template_record)
+        return record_lines
+
+
+class ChecksumReader:
+    """Reader of a binary file that adds all read bytes to a checksum.
+
+    Attributes
+    ----------
+    rawfile : file object
+        Opened binary file to read from
+    checksum : hashlib hash object
+        Checksum to update with the read bytes
+    """
+
+    def __init__(self, rawfile, checksum):
+        """Save the file to read and the checksum to update.
+
+        Parameters
+        ----------
+        rawfile : file object
+            Opened binary file to read from
+        checksum : hashlib hash object
+            Checksum to update with the read bytes
+        """
+        self.rawfile = rawfile
+        self.checksum = checksum
+
+    def read(self, size=-1):
+        """Read, add to the checksum and return bytes of the file.
+
+        Parameters
+        ----------
+        size : int
+            Maximum number of bytes to read, all if negative
+
+        Returns
+        -------
+        bytes
+            Read bytes
+        """
+        file_bytes = self.rawfile.read(size)
+        self.checksum.update(file_bytes)
+        return file_bytes
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+from acceptor_skip_set import AcceptorSkipSet
+
+
+class TestAcceptorSkipSet(unittest.TestCase):
+    def setUp(self):
+        self.skip_ids_answer = [f"SEQ{x:05d}" for x in range(0, 2000, 2)]
+        self.skip_set = AcceptorSkipSet(self.skip_ids_answer)
+        self.exact_skip_set = AcceptorSkipSet(self.skip_ids_answer, exact=True)
+
+    # Tests that all skipped read identifiers are found, both as str and bytes
+    def test_contains_skipped(self):
+        for read_id in self.skip_ids_answer:
+            self.assertIn(read_id, self.skip_set, f"{read_id} should have been in the skip set")
+            self.assertIn(read_id.encode(), self.exact_skip_set, f"{read_id} should have been in "
+                          "the exact skip set")
+
+    # Tests that read identifiers not in the skip set are not found
+    def test_not_contains_other(self):
+        for read_id in [f"SEQ{x:05d}" for x in range(1, 2000, 2)]:
+            self.assertNotIn(read_id, self.skip_set, f"{read_id} should not have been in the "
+                             "skip set")
+            self.assertNotIn(read_id, self.exact_skip_set, f"{read_id} should not have been in "
+                             "the exact skip set")
+
+    # Tests that duplicated and None read identifiers are ignored
+    def test_len_deduplicates(self):
+        skip_set = AcceptorSkipSet(["SEQ1", "SEQ1", None, "SEQ2"], exact=True)
+        self.assertEqual(len(skip_set), 2, "The skip set should have contained 2 read identifiers")
+
+    # Tests that an empty skip set contains nothing
+    def test_empty(self):
+        self.assertNotIn("SEQ1", AcceptorSkipSet(), "An empty skip set should contain nothing")
+
+    # Tests that acceptor read identifiers are streamed from a variant context file
+    def test_from_varcon_file(self):
+        varcon_lines = ["#VBUUID: aap\n",
+                        "#ContextId\tDonorSample\tChrom\tOrigin\tStart\tEnd\t"
+                        "AcceptorContextLength\tDonorContextLength\tAcceptorReads\tDonorReads\t"
+                        "ADratio\tAcceptorReadsIds\tDonorReadIds\tDonorVariants\n",
+                        "21_100\tS1\t21\t100\t50\t150\t100\t100\t2\t2\t1.0\tSEQ1;SEQ2\tDON1;DON2\t"
+                        "21_100_A_T\n",
+                        "21_500\tS1\t21\t500\t450\t550\t100\t100\t1\t1\t1.0\tSEQ3\tDON3\t"
+                        "21_500_A_T\n"]
+        with tempfile.NamedTemporaryFile("w", suffix=".varcon", delete=False) as varconfile:
+            varconfile.writelines(varcon_lines)
+        try:
+            skip_set = AcceptorSkipSet.from_varcon_file(varconfile.name)
+        finally:
+            os.remove(varconfile.name)
+        self.assertEqual(len(skip_set), 3, "The skip set should have contained 3 read identifiers")
+        self.assertIn("SEQ3", skip_set, "SEQ3 should have been in the skip set")
+        self.assertNotIn("DON1", skip_set, "Donor read DON1 should not have been in the skip set")
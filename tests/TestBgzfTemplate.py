@@ -0,0 +1,98 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+import pysam
+
+from acceptor_skip_set import AcceptorSkipSet
+from bgzf_template import BgzfTemplate
+from insert_position_log import InsertPositionLog
+from template_index import TemplateIndex
+from vasebuilder import VaSeBuilder
+
+
+class TestBgzfTemplate(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.template_records = [f"@aRead{x}\nACGT\n+\n{'@' if x % 7 == 0 else 'I'}III\n"
+                                 for x in range(25)]
+        self.bgzf_fq = os.path.join(self.tmpdir.name, "template_R1.fq.gz")
+        with pysam.BGZFile(self.bgzf_fq, "wb") as bgzffile:
+            bgzffile.write("".join(self.template_records).encode())
+        self.gzip_fq = os.path.join(self.tmpdir.name, "template_gzip_R1.fq.gz")
+        with gzip.open(self.gzip_fq, "wb") as gzipfile:
+            gzipfile.write("".join(self.template_records).encode())
+        self.bgzf_template = BgzfTemplate(self.bgzf_fq, checkpoint_interval=4)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    # Tests that BGZF and regular gzip files are recognized
+    def test_is_bgzf(self):
+        self.assertTrue(BgzfTemplate.is_bgzf(self.bgzf_fq), "The template should be BGZF")
+        self.assertFalse(BgzfTemplate.is_bgzf(self.gzip_fq), "The template should not be BGZF")
+
+    # Tests that the records are counted and a checkpoint is saved every 4 records
+    def test_scan_checkpoints(self):
+        self.assertEqual(self.bgzf_template.scan_checkpoints(), 25,
+                         "The template should have had 25 records")
+        self.assertEqual(len(self.bgzf_template.checkpoints), 7,
+                         "The template should have had 7 checkpoints")
+
+    # Tests that the chunks cover all records in order
+    def test_plan_chunks(self):
+        template_chunks = self.bgzf_template.plan_chunks(3)
+        self.assertListEqual([x[:2] for x in template_chunks], [(0, 8), (8, 12), (20, 5)],
+                             "The template should have been split in three chunks")
+
+    # Tests that records are read from the virtual offset of a chunk
+    def test_read_records(self):
+        first_record, num_of_records, virtual_offset = self.bgzf_template.plan_chunks(3)[1]
+        chunk_records = [b"".join(x).decode() for x in
+                         self.bgzf_template.read_records(virtual_offset, num_of_records)]
+        self.assertListEqual(chunk_records, self.template_records[8:20],
+                             "Records 8 to 20 should have been read")
+
+    # Tests that writing the templates in chunks gives the same output as a serial writer
+    def test_write_template_chunks(self):
+        bgzf_r2 = os.path.join(self.tmpdir.name, "template_R2.fq.gz")
+        with pysam.BGZFile(bgzf_r2, "wb") as bgzffile:
+            bgzffile.write("".join(self.template_records).replace("ACGT", "TGCA").encode())
+        for template_fq in [self.bgzf_fq, bgzf_r2]:
+            TemplateIndex.build(template_fq, checkpoint_interval=4).write_index()
+        skip_set = AcceptorSkipSet(["aRead3", "aRead14"])
+        donor_read_ids = [f"dRead{x}" for x in range(6)]
+        r1_donor_reads = {x: (x, "1", "TTTT", "IIII") for x in donor_read_ids}
+        r2_donor_reads = {x: (x, "2", "AAAA", "IIII") for x in donor_read_ids}
+
+        def get_out_path(out_dir, read_pair):
+            return os.path.join(self.tmpdir.name, out_dir, f"VaSe_2020-01-01_L1_{read_pair}.fastq")
+
+        def get_lane_jobs(out_dir):
+            os.mkdir(os.path.join(self.tmpdir.name, out_dir))
+            return [(VaSeBuilder.write_validation_fastq_lane,
+                     (self.bgzf_fq, bgzf_r2, skip_set, donor_read_ids, r1_donor_reads,
+                      r2_donor_reads, get_out_path(out_dir, "R1"), get_out_path(out_dir, "R2"),
+                      2))]
+
+        serial_inserts = InsertPositionLog()
+        serial_vase_b = VaSeBuilder("test")
+        for lane_method, lane_args in get_lane_jobs("serial"):
+            lane_method(serial_vase_b, *lane_args, serial_inserts)
+
+        chunk_inserts = InsertPositionLog()
+        chunk_vase_b = VaSeBuilder("test", threads=3, split_templates=True)
+        self.assertGreater(len(chunk_vase_b.plan_template_chunks(self.bgzf_fq)[1]), 1,
+                           "The template should have been split in multiple chunks")
+        chunk_vase_b.run_chunked_lane_jobs(get_lane_jobs("chunked"), chunk_inserts)
+
+        for read_pair in ["R1", "R2"]:
+            with open(get_out_path("serial", read_pair), "rb") as serialfile, \
+                    open(get_out_path("chunked", read_pair), "rb") as chunkfile:
+                self.assertEqual(chunkfile.read(), serialfile.read(),
+                                 f"The chunked {read_pair} output should have been the same as "
+                                 "the serial output")
+        self.assertListEqual([x[1:] for x in chunk_inserts.get_rows()],
+                             [x[1:] for x in serial_inserts.get_rows()],
+                             "The chunked insert positions should have been the same")
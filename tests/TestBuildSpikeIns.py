@@ -0,0 +1,286 @@
+import glob
+import os
+import random
+import tempfile
+import shutil
+import unittest
+from unittest import mock
+
+import argon2
+import pysam
+
+from sample_mapper import Sample, SampleMapper
+from spike_in_cache import SpikeInCache
+from variant_context import VariantContext
+from vasebuilder import VaSeBuilder
+
+
+class TestBuildSpikeIns(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        rng = random.Random(1)
+        self.ref_seq = "".join([rng.choice("ACGT") for _ in range(3000)])
+        self.reference = os.path.join(self.tmpdir.name, "ref.fa")
+        with open(self.reference, "w") as reffile:
+            reffile.write(f">21\n{self.ref_seq}\n")
+        pysam.faidx(self.reference)
+
+        # Variant positions per donor sample, of which the D1 variants at 1000 and 1010 have
+        # overlapping variant contexts.
+        self.donor_variants = {"D1": [1000, 1010, 2000], "D2": [1500]}
+        self.samples = []
+        for sample_id, variant_positions in self.donor_variants.items():
+            self.samples.append(Sample(sample_id,
+                                       self.write_bam(f"{sample_id}.bam", sample_id,
+                                                      f"{sample_id}_", variant_positions),
+                                       self.write_vcf(f"{sample_id}.vcf", sample_id,
+                                                      variant_positions)))
+            self.samples[-1].hash_id = sample_id
+        self.acceptor_bam = self.write_bam("acceptor.bam", "acc", "acc_",
+                                           [x for y in self.donor_variants.values() for x in y])
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_bam(self, bam_name, sample_id, read_prefix, variant_positions):
+        bam_path = os.path.join(self.tmpdir.name, bam_name)
+        bam_header = {"HD": {"VN": "1.6", "SO": "coordinate"},
+                      "SQ": [{"SN": "21", "LN": 3000}],
+                      "RG": [{"ID": sample_id, "SM": sample_id}]}
+        bam_reads = []
+        for variant_pos in variant_positions:
+            for read_num in range(4):
+                read_pos = variant_pos - 140 + 30 * read_num
+                for is_read1, mate_pos in [(True, read_pos), (False, read_pos + 100)]:
+                    bamread = pysam.AlignedSegment()
+                    bamread.query_name = f"{read_prefix}{variant_pos}_{read_num}"
+                    bamread.flag = 1 + 2 + (64 + 32 if is_read1 else 128 + 16)
+                    bamread.reference_id = 0
+                    bamread.reference_start = mate_pos
+                    bamread.mapping_quality = 60
+                    bamread.cigarstring = "50M"
+                    bamread.next_reference_id = 0
+                    bamread.next_reference_start = read_pos + 100 if is_read1 else read_pos
+                    bamread.template_length = 150 if is_read1 else -150
+                    bamread.query_sequence = self.ref_seq[mate_pos:mate_pos + 50]
+                    bamread.query_qualities = pysam.qualitystring_to_array("I" * 50)
+                    bamread.set_tag("RG", sample_id)
+                    bam_reads.append(bamread)
+        with pysam.AlignmentFile(bam_path, "wb", header=bam_header) as bamfile:
+            for bamread in sorted(bam_reads, key=lambda x: x.reference_start):
+                bamfile.write(bamread)
+        pysam.index(bam_path)
+        return bam_path
+
+    def write_vcf(self, vcf_name, sample_id, variant_positions):
+        vcf_path = os.path.join(self.tmpdir.name, vcf_name)
+        with open(vcf_path, "w") as vcffile:
+            vcffile.write("##fileformat=VCFv4.2\n##contig=<ID=21,length=3000>\n"
+                          '##FORMAT=<ID=GT,Number=1,Type=String,Description="Genotype">\n'
+                          f"#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\t{sample_id}\n")
+            for variant_pos in variant_positions:
+                ref_base = self.ref_seq[variant_pos - 1]
+                vcffile.write(f"21\t{variant_pos}\t.\t{ref_base}\t{'A' if ref_base != 'A' else 'C'}"
+                              "\t.\tPASS\t.\tGT\t0/1\n")
+        return pysam.tabix_index(vcf_path, preset="vcf")
+
+    def build_variant_contexts(self, vs_builder, merge=True, acceptor_bam=None):
+        return vs_builder.bvcs(self.samples, acceptor_bam or self.acceptor_bam,
+                               f"{self.tmpdir.name}/", self.reference,
+                               os.path.join(self.tmpdir.name, "VaSe.varcon"), None, merge)
+
+    def read_variant_contexts(self, varconfile):
+        return [(x.get_variant_context_id(), x.get_variant_context_chrom(),
+                 x.get_variant_context_start(), x.get_variant_context_end(),
+                 sorted(x.get_donor_read_ids()), sorted(x.get_acceptor_read_ids()),
+                 x.get_acceptor_context().get_context(), x.get_donor_context().get_context())
+                for x in varconfile.get_variant_contexts()]
+
+    def read_spike_ins(self, outpath):
+        spike_ins = {}
+        for bam_path in sorted(glob.glob(f"{outpath}/*.bam")):
+            with pysam.AlignmentFile(bam_path, "rb") as bamfile:
+                spike_ins[os.path.basename(bam_path)] = [
+                    (x.query_name, x.flag, x.reference_start) for x in bamfile.fetch()
+                    ]
+        for vcf_path in sorted(glob.glob(f"{outpath}/*.vcf")):
+            with pysam.VariantFile(vcf_path) as vcffile:
+                spike_ins[os.path.basename(vcf_path)] = [str(x) for x in vcffile]
+        return spike_ins
+
+    # Tests that P-mode spike-ins written by a process pool are the same as written serially
+    def test_run_p_mode_v3_parallel(self):
+        spike_ins = []
+        for threads in [1, 2]:
+            vs_builder = VaSeBuilder("test", threads)
+            outpath = os.path.join(self.tmpdir.name, f"pmode{threads}")
+            os.mkdir(outpath)
+            vs_builder.run_p_mode_v3(self.samples, self.build_variant_contexts(vs_builder),
+                                     f"{outpath}/")
+            spike_ins.append(self.read_spike_ins(outpath))
+            with open(f"{outpath}/pmode_bamlink_test.txt") as bamlinkfile:
+                spike_ins[-1]["bamlink"] = bamlinkfile.read().replace(outpath, "")
+        self.assertEqual(len([x for x in spike_ins[0] if x.endswith(".bam")]), 3,
+                         "A spike-in BAM should have been written per variant context")
+        self.assertDictEqual(spike_ins[1], spike_ins[0],
+                             "The parallel P-mode spike-ins should have been the same as the "
+                             "serial ones")
+
+    def read_donor_bam(self, sample):
+        with pysam.AlignmentFile(sample.bam, "rb") as bamfile:
+            return [(x.query_name, x.flag, x.reference_start) for x in bamfile.fetch()]
+
+    # Tests that D-mode writes the donor reads and variants of each sample to its own files
+    def test_run_d_mode_v3(self):
+        vs_builder = VaSeBuilder("test")
+        outpath = os.path.join(self.tmpdir.name, "dmode")
+        os.mkdir(outpath)
+        vs_builder.run_d_mode_v3(self.samples, self.build_variant_contexts(vs_builder),
+                                 f"{outpath}/")
+        spike_ins = self.read_spike_ins(outpath)
+        for sample in self.samples:
+            self.assertListEqual(sorted(spike_ins[f"VaSe_{sample.id}.sorted.bam"]),
+                                 sorted(self.read_donor_bam(sample)),
+                                 f"The {sample.id} BAM should have had the {sample.id} reads")
+            self.assertListEqual([x.split("\t")[1] for x in spike_ins[f"VaSe_{sample.id}.vcf"]],
+                                 [str(x) for x in self.donor_variants[sample.id]],
+                                 f"The {sample.id} VCF should have had the {sample.id} variants")
+
+    # Tests that reads and variants shared by overlapping, unmerged variant contexts are
+    # written once
+    def test_run_d_mode_v3_overlapping_contexts(self):
+        vs_builder = VaSeBuilder("test")
+        varconfile = None
+        # Contexts 21_1010 and 21_1000, built in separate runs, both hold variant 1010
+        for variant_positions in [[1010], [1000, 1010]]:
+            context_sample = Sample("D1", self.samples[0].bam,
+                                    self.write_vcf(f"D1_{variant_positions[0]}.vcf", "D1",
+                                                   variant_positions))
+            context_sample.hash_id = "D1"
+            context_varconfile = vs_builder.bvcs([context_sample], self.acceptor_bam,
+                                                 f"{self.tmpdir.name}/", self.reference,
+                                                 os.path.join(self.tmpdir.name, "VaSe.varcon"),
+                                                 None, True)
+            if varconfile is None:
+                varconfile = context_varconfile
+                continue
+            for varcon in context_varconfile.get_variant_contexts():
+                varconfile.add_existing_variant_context(varcon.get_variant_context_id(), varcon)
+        self.assertEqual(len(varconfile.get_all_variant_context_donor_read_ids()),
+                         2 * len(set(varconfile.get_all_variant_context_donor_read_ids())),
+                         "The variant contexts should have shared their donor reads")
+        outpath = os.path.join(self.tmpdir.name, "dmode")
+        os.mkdir(outpath)
+        vs_builder.run_d_mode_v3(self.samples, varconfile, f"{outpath}/")
+        spike_ins = self.read_spike_ins(outpath)
+        self.assertEqual(len(spike_ins["VaSe_D1.sorted.bam"]),
+                         len(set(spike_ins["VaSe_D1.sorted.bam"])),
+                         "Each D1 read should have been written once")
+        self.assertListEqual([x.split("\t")[1] for x in spike_ins["VaSe_D1.vcf"]],
+                             ["1000", "1010"],
+                             "Each D1 variant should have been written once")
+
+    # Tests that a compressed VCF slice is sorted, indexed and fetchable by region with tabix
+    def test_write_vcf_slice_compressed(self):
+        with pysam.VariantFile(self.samples[0].vcf) as vcffile:
+            variants = list(vcffile)
+        vs_builder = VaSeBuilder("test", compress_vcf=True)
+        outpath = os.path.join(self.tmpdir.name, "VaSe_D1.vcf")
+        vs_builder.write_vcf_slice("D1", variants[::-1], outpath)
+        with pysam.TabixFile(f"{outpath}.gz") as tabixfile:
+            self.assertEqual(list(tabixfile.header)[-1].split("\t")[-1], "D1",
+                             "The column header should have had the sample name")
+            self.assertListEqual([x.split("\t")[1] for x in tabixfile.fetch("21")],
+                                 ["1000", "1010", "2000"],
+                                 "The variants should have been written sorted")
+            self.assertListEqual([x.split("\t")[1] for x in tabixfile.fetch("21", 1005, 2500)],
+                                 ["1010", "2000"],
+                                 "The variants in the fetched region should have been returned")
+
+    # Tests that contexts cached by an earlier run are read from the cache without fetching reads
+    def test_bvcs_cached_contexts(self):
+        spike_in_cache = SpikeInCache(os.path.join(self.tmpdir.name, "cache"))
+        varcons = self.read_variant_contexts(
+            self.build_variant_contexts(VaSeBuilder("test", spike_in_cache=spike_in_cache)))
+        with mock.patch.object(VaSeBuilder, "get_variant_reads") as get_variant_reads:
+            cached_varcons = self.read_variant_contexts(
+                self.build_variant_contexts(VaSeBuilder("test", spike_in_cache=spike_in_cache)))
+        self.assertFalse(get_variant_reads.called,
+                         "No reads should have been fetched for cached contexts")
+        self.assertListEqual(cached_varcons, varcons,
+                             "The cached variant contexts should have been the same as the "
+                             "established ones")
+
+        # Another acceptor alignment file misses the cached contexts
+        other_acceptor_bam = os.path.join(self.tmpdir.name, "other_acceptor.bam")
+        shutil.copy(self.acceptor_bam, other_acceptor_bam)
+        shutil.copy(f"{self.acceptor_bam}.bai", f"{other_acceptor_bam}.bai")
+        with mock.patch.object(VaSeBuilder, "get_variant_reads", autospec=True,
+                               side_effect=VaSeBuilder.get_variant_reads) as get_variant_reads:
+            self.build_variant_contexts(VaSeBuilder("test", spike_in_cache=spike_in_cache),
+                                        acceptor_bam=other_acceptor_bam)
+        self.assertTrue(get_variant_reads.called,
+                        "The contexts of another acceptor should have been established")
+
+    # Tests that P-mode spike-ins of cached contexts are copied from the cache by a later run
+    def test_run_p_mode_v3_cached(self):
+        spike_in_cache = SpikeInCache(os.path.join(self.tmpdir.name, "cache"))
+        spike_ins = []
+        for run_num in range(2):
+            vs_builder = VaSeBuilder("test", spike_in_cache=spike_in_cache)
+            outpath = os.path.join(self.tmpdir.name, f"pmode{run_num}")
+            os.mkdir(outpath)
+            varconfile = self.build_variant_contexts(vs_builder)
+            with mock.patch.object(VaSeBuilder, "write_pmode_context",
+                                   wraps=vs_builder.write_pmode_context) as write_pmode_context:
+                vs_builder.run_p_mode_v3(self.samples, varconfile, f"{outpath}/")
+            spike_ins.append(self.read_spike_ins(outpath))
+        self.assertFalse(write_pmode_context.called,
+                         "The spike-ins of the second run should have been copied from the cache")
+        self.assertDictEqual(spike_ins[1], spike_ins[0],
+                             "The cached P-mode spike-ins should have been the same as the "
+                             "written ones")
+
+    # Tests that P-mode spike-ins copied from the cache get the hashed sample IDs of the later run
+    def test_run_p_mode_v3_cached_hashed_samples(self):
+        spike_in_cache = SpikeInCache(os.path.join(self.tmpdir.name, "cache"))
+        hasher = argon2.PasswordHasher(memory_cost=1024)
+        for run_num in range(2):
+            for sample in self.samples:
+                SampleMapper.hash_sample_id(hasher, sample)
+            vs_builder = VaSeBuilder("test", spike_in_cache=spike_in_cache)
+            outpath = os.path.join(self.tmpdir.name, f"pmode{run_num}")
+            os.mkdir(outpath)
+            vs_builder.run_p_mode_v3(self.samples, self.build_variant_contexts(vs_builder),
+                                     f"{outpath}/")
+        with open(os.path.join(self.tmpdir.name, "donor_sampleID_hashtable.txt")) as hashfile:
+            hash_ids = {x.split("\t")[1].rstrip("\n").split("$")[-1]
+                        for x in hashfile if not x.startswith("#")}
+        for bam_path in glob.glob(f"{outpath}/*.bam"):
+            with pysam.AlignmentFile(bam_path, "rb") as bamfile:
+                self.assertIn(bamfile.header.to_dict()["RG"][0]["SM"], hash_ids,
+                              "The BAM sample name should have been hashed by the second run")
+            with pysam.VariantFile(f"{bam_path[:-len('.sorted.bam')]}.vcf") as vcffile:
+                self.assertIn(list(vcffile.header.samples)[0], hash_ids,
+                              "The VCF sample name should have been hashed by the second run")
+
+    # Tests that only donor BAM files of samples with variant contexts are checked to be merged
+    def test_check_donor_header_compatibility(self):
+        vs_builder = VaSeBuilder("test")
+        varconfile = self.build_variant_contexts(vs_builder)
+        other_bam = os.path.join(self.tmpdir.name, "other.bam")
+        with pysam.AlignmentFile(other_bam, "wb",
+                                 header={"HD": {"VN": "1.6"},
+                                         "SQ": [{"SN": "22", "LN": 3000}]}):
+            pass
+        other_sample = Sample("O1", other_bam, self.samples[0].vcf)
+        other_sample.hash_id = "O1"
+        samples = self.samples + [other_sample]
+        self.assertTrue(vs_builder.check_donor_header_compatibility(samples, varconfile),
+                        "A sample without variant contexts should not have been checked")
+        varcon = varconfile.get_variant_contexts()[0]
+        varconfile.add_existing_variant_context(
+            "22_1", VariantContext("22_1", "O1", "21", 1000, 900, 1100, [], [],
+                                   varcon.get_acceptor_context(), varcon.get_donor_context()))
+        self.assertFalse(vs_builder.check_donor_header_compatibility(samples, varconfile),
+                         "A sample with other reference sequences should have been reported")
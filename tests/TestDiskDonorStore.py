@@ -0,0 +1,113 @@
+import glob
+import gzip
+import os
+import tempfile
+import unittest
+
+from acceptor_skip_set import AcceptorSkipSet
+from disk_donor_store import DiskDonorStore
+from insert_position_log import InsertPositionLog
+from vasebuilder import VaSeBuilder
+
+
+class TestDiskDonorStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.donor_reads = [("dRead1", "1", "ACGT", "IIII"), ("dRead1", "2", "TTTT", "IIII"),
+                            ("dRead2", "2", "GGGG", "####"), ("dRead0", "1", "CCCC", "IIII"),
+                            ("dRead0", "2", "AAAA", "IIII"), ("dRead3", "1", "CCCC", "IIII"),
+                            ("dRead3", "1", "GGGG", "IIII"), ("dRead3", "2", "AAAA", "IIII")]
+        self.donor_store = DiskDonorStore(os.path.join(self.tmpdir.name, "donor_reads.sqlite"), 1)
+
+    def tearDown(self):
+        self.donor_store.close()
+        self.tmpdir.cleanup()
+
+    # Tests that the read identifiers of the added donor reads are returned sorted
+    def test_get_read_ids(self):
+        self.donor_store.add_donor_reads(self.donor_reads)
+        self.donor_store.index_donor_reads()
+        self.assertListEqual(self.donor_store.get_read_ids(),
+                             ["dRead0", "dRead1", "dRead2", "dRead3"],
+                             "The donor read identifiers should have been sorted")
+
+    # Tests that donor reads are inserted from generators, keeping their order over calls
+    def test_add_donor_reads_generator(self):
+        self.donor_store.add_donor_reads(x for x in self.donor_reads[:4])
+        self.donor_store.add_donor_reads(x for x in self.donor_reads[4:])
+        self.assertEqual(self.donor_store.read_order, len(self.donor_reads),
+                         "All donor reads should have been counted")
+        self.assertListEqual(
+            self.donor_store.connection.execute(
+                "SELECT read_id, pair, seq, qual FROM donor_reads ORDER BY read_order"
+                ).fetchall(),
+            self.donor_reads, "The donor reads should have been added in order")
+
+    # Tests that read pairs without exactly one R1 and one R2 read are removed
+    def test_remove_incorrect_read_pairs(self):
+        self.donor_store.add_donor_reads(self.donor_reads)
+        self.assertEqual(self.donor_store.remove_incorrect_read_pairs(), 2,
+                         "The dRead2 and dRead3 read pairs should have been removed")
+        self.assertListEqual(self.donor_store.get_read_ids(), ["dRead0", "dRead1"],
+                             "Only the dRead0 and dRead1 read pairs should have been kept")
+
+    # Tests that the donor reads of a lane are read back sorted by insert position
+    def test_read_lane_inserts(self):
+        self.donor_store.add_donor_reads(self.donor_reads)
+        self.donor_store.add_insert_slots(0, [5, 2, 5], ["dRead3", "dRead1", "dRead0"])
+        self.donor_store.add_insert_slots(1, [1], ["dRead2"])
+        self.donor_store.index_insert_slots()
+        lane_inserts = list(DiskDonorStore.read_lane_inserts(self.donor_store.db_path, 0, "1"))
+        self.assertListEqual(lane_inserts, [(2, ("dRead1", "1", "ACGT", "IIII")),
+                                            (5, ("dRead3", "1", "CCCC", "IIII")),
+                                            (5, ("dRead3", "1", "GGGG", "IIII")),
+                                            (5, ("dRead0", "1", "CCCC", "IIII"))],
+                             "The lane 0 R1 reads should have been sorted by insert position")
+
+    # Tests that the on-disk store writes the same validation fastq files as in-memory reads
+    def test_write_fastqs_from_disk_store(self):
+        template_fqs = {}
+        for fr in ["1", "2"]:
+            template_fqs[fr] = os.path.join(self.tmpdir.name, f"template_R{fr}.fq.gz")
+            with gzip.open(template_fqs[fr], "wt") as templatefile:
+                templatefile.write("".join([f"@aRead{x}\nACGT\n+\nIIII\n" for x in range(20)]))
+        skip_set = AcceptorSkipSet(["aRead4", "aRead11"])
+        vase_b = VaSeBuilder("test")
+
+        donor_read_data = {}
+        for donor_read in self.donor_reads:
+            vase_b.add_donor_read_tuple(donor_read, donor_read_data)
+        donor_read_data = vase_b.remove_incorrect_bam_donor_readpairs(donor_read_data)
+        # Both validation sets have the same output name, and thus the same placement
+        memory_out = os.path.join(self.tmpdir.name, "memory", "VaSe")
+        os.mkdir(os.path.dirname(memory_out))
+        memory_inserts = InsertPositionLog()
+        distributed_donor_read_ids = vase_b.divide_donorfastqs_over_acceptors(
+            sorted(donor_read_data), 1)
+        for fr in ["1", "2"]:
+            vase_b.build_fastqs_from_donors_v2([template_fqs[fr]], skip_set,
+                                               distributed_donor_read_ids, donor_read_data, fr,
+                                               2, memory_out, memory_inserts)
+
+        self.donor_store.add_donor_reads(self.donor_reads)
+        self.donor_store.index_donor_reads()
+        self.donor_store.remove_incorrect_read_pairs()
+        disk_out = os.path.join(self.tmpdir.name, "disk", "VaSe")
+        os.mkdir(os.path.dirname(disk_out))
+        disk_inserts = InsertPositionLog()
+        vase_b.max_donor_memory = 1
+        vase_b.write_fastqs_from_disk_store(self.donor_store, [template_fqs["1"]],
+                                            [template_fqs["2"]], skip_set, 2, disk_out,
+                                            disk_inserts)
+
+        for fr in ["1", "2"]:
+            memory_fq = glob.glob(f"{memory_out}_*_L1_R{fr}.fastq")[0]
+            disk_fq = glob.glob(f"{disk_out}_*_L1_R{fr}.fastq")[0]
+            with open(memory_fq, "r") as memoryfile, open(disk_fq, "r") as diskfile:
+                self.assertEqual(diskfile.read(), memoryfile.read(),
+                                 f"The R{fr} validation fastq files should have been the same")
+        self.assertListEqual([x[1:] for x in disk_inserts.get_rows()],
+                             [x[1:] for x in memory_inserts.get_rows()],
+                             "The donor read insert positions should have been the same")
+        self.assertFalse(os.path.isfile(self.donor_store.db_path),
+                         "The donor read store should have been removed")
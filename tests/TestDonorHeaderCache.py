@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+
+import pysam
+
+from donor_header_cache import DonorHeaderCache
+from sample_mapper import Sample
+
+
+class TestDonorHeaderCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.header_cache = DonorHeaderCache()
+        self.sq_lines = [{"SN": "1", "LN": 1000}, {"SN": "2", "LN": 500}]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_bam(self, name, sq_lines, read_group_ids):
+        bam_path = os.path.join(self.tmpdir.name, f"{name}.bam")
+        bam_header = {"HD": {"VN": "1.6"}, "SQ": sq_lines,
+                      "RG": [{"ID": x, "SM": name, "LB": name} for x in read_group_ids],
+                      "PG": [{"ID": "bwa", "PN": "bwa"}]}
+        with pysam.AlignmentFile(bam_path, "wb", header=bam_header):
+            pass
+        return bam_path
+
+    # Tests that headers are reduced to HD, SQ and RG lines and read only once
+    def test_read_header(self):
+        bam_path = self.write_bam("S1", self.sq_lines, ["rg1"])
+        self.assertListEqual(list(self.header_cache.read_header(bam_path)), ["HD", "SQ", "RG"],
+                             "Only the HD, SQ and RG lines should have been kept")
+        os.remove(bam_path)
+        self.assertIn("RG", self.header_cache.read_header(bam_path),
+                      "The header should have been read from the cache")
+
+    # Tests that sample headers get the sample ID without changing the cached header
+    def test_get_sample_header(self):
+        sample = Sample("S1", self.write_bam("S1", self.sq_lines, ["rg1"]), "S1.vcf")
+        sample.hash_id = "hashedS1"
+        sample_header = self.header_cache.get_sample_header(sample)
+        self.assertEqual(sample_header["RG"][0]["SM"], "hashedS1",
+                         "The sample field should have been the hashed sample ID")
+        self.assertEqual(self.header_cache.read_header(sample.bam)["RG"][0]["SM"], "S1",
+                         "The cached header should have been left unchanged")
+
+    # Tests that donor BAM files with other reference sequences are reported
+    def test_get_incompatible_bams(self):
+        bam_paths = [self.write_bam("S1", self.sq_lines, ["rg1"]),
+                     self.write_bam("S2", self.sq_lines, ["rg2"]),
+                     self.write_bam("S3", self.sq_lines[:1], ["rg3"])]
+        self.assertListEqual(self.header_cache.get_incompatible_bams(bam_paths), bam_paths[2:],
+                             "Only the BAM file with other SQ lines should have been reported")
+
+    # Tests that read groups of all headers are merged with each ID kept once
+    def test_merge_headers(self):
+        headers = [{"HD": {"VN": "1.6"}, "SQ": self.sq_lines, "RG": [{"ID": x}]}
+                   for x in ["rg1", "rg2", "rg1"]]
+        merged_header = DonorHeaderCache.merge_headers(headers)
+        self.assertListEqual([x["ID"] for x in merged_header["RG"]], ["rg1", "rg2"],
+                             "Each read group should have been merged once")
+        self.assertEqual(len(headers[0]["RG"]), 1, "The first header should have been unchanged")
@@ -0,0 +1,66 @@
+import gzip
+import os
+import sys
+import tempfile
+import unittest
+
+from acceptor_skip_set import AcceptorSkipSet
+from donor_insert_queue import DonorInsertQueue
+from insert_position_log import InsertPositionLog
+from vasebuilder import VaSeBuilder
+
+
+class TestDonorInsertQueue(unittest.TestCase):
+    def setUp(self):
+        self.insert_queue = DonorInsertQueue([5, 1, 5, 3], ["dRead1", "dRead2", "dRead3", "dRead4"])
+
+    # Tests that the insert positions are sorted with the read identifiers aligned
+    def test_sorted_positions(self):
+        self.assertListEqual(self.insert_queue.positions.tolist(), [1, 3, 5, 5],
+                             "The insert positions should have been sorted")
+        self.assertListEqual(self.insert_queue.donor_read_ids,
+                             ["dRead2", "dRead4", "dRead1", "dRead3"],
+                             "Read identifiers sharing a position should have kept their order")
+
+    # Tests that popping a position returns all reads up to that position
+    def test_pop_position(self):
+        self.assertListEqual(self.insert_queue.pop_position(0), [],
+                             "No reads should have been inserted at position 0")
+        self.assertListEqual(self.insert_queue.pop_position(3), ["dRead2", "dRead4"],
+                             "dRead2 and dRead4 should have been inserted up to position 3")
+        self.assertEqual(self.insert_queue.next_position, 5, "The next position should be 5")
+        self.assertListEqual(self.insert_queue.pop_position(5), ["dRead1", "dRead3"],
+                             "dRead1 and dRead3 should have been inserted at position 5")
+        self.assertEqual(self.insert_queue.next_position, sys.maxsize,
+                         "The queue should have been empty")
+        self.assertEqual(len(self.insert_queue), 0, "The queue should have been empty")
+
+    # Tests that resetting the queue restarts at the first insert position
+    def test_reset(self):
+        self.insert_queue.pop_position(10)
+        self.insert_queue.reset()
+        self.assertEqual(self.insert_queue.next_position, 1, "The next position should be 1")
+        self.assertEqual(len(self.insert_queue), 4, "All reads should be pending again")
+
+    # Tests that every donor read is inserted after the correct template read, also after
+    # a skipped acceptor read with a quality line starting with '@'
+    def test_write_validation_fastq_file(self):
+        template_lines = [b"@aRead1\nAAAA\n+\nIIII\n", b"@aRead2\nCCCC\n+\n@III\n",
+                          b"@aRead3\nGGGG\n+\nIIII\n"]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            template_fq = os.path.join(tmpdir, "template_R1.fq.gz")
+            with gzip.open(template_fq, "wb") as templatefile:
+                templatefile.write(b"".join(template_lines))
+            outpath = os.path.join(tmpdir, "VaSe_L1_R1.fastq")
+            insert_positions = InsertPositionLog()
+            vase_b = VaSeBuilder("test")
+            vase_b.write_validation_fastq_file(
+                template_fq, "1", AcceptorSkipSet(["aRead2"]),
+                DonorInsertQueue([1, 2], ["dRead1", "dRead2"]),
+                {"dRead1": ("dRead1", "1", "TTTT", "IIII"),
+                 "dRead2": ("dRead2", "1", "AAAA", "IIII")},
+                outpath, insert_positions)
+            with open(outpath, "r") as outfile:
+                out_read_ids = [x.strip()[1:] for x in outfile.readlines()[::4]]
+        self.assertListEqual(out_read_ids, ["aRead1", "dRead1", "aRead3", "dRead2"],
+                             "The donor reads should have been inserted after aRead2 and aRead3")
@@ -0,0 +1,60 @@
+import unittest
+
+from donor_read_store import DonorReadStore
+from vasebuilder import VaSeBuilder
+
+
+class TestDonorReadStore(unittest.TestCase):
+    def setUp(self):
+        self.read_tuples = [("dRead2", "2", "TTTT", "IIII"),
+                            ("dRead1", "1", "AAAA", "IIII"),
+                            ("dRead2", "1", "GGGG", "IIII"),
+                            ("dRead1", "2", "CCCC", "IIII")]
+        self.donor_store = DonorReadStore(self.read_tuples)
+
+    # Tests that the read identifiers are returned sorted and unique
+    def test_get_read_ids(self):
+        self.assertListEqual(self.donor_store.get_read_ids(), ["dRead1", "dRead2"],
+                             "The donor read identifiers should have been sorted and unique")
+
+    # Tests that the R1 reads of a read identifier are returned before the R2 reads
+    def test_get_reads(self):
+        reads_answer = [("dRead2", "1", "GGGG", "IIII"), ("dRead2", "2", "TTTT", "IIII")]
+        self.assertListEqual(self.donor_store.get_reads("dRead2"), reads_answer,
+                             "The R1 and R2 donor reads of dRead2 should have been returned")
+        self.assertListEqual(self.donor_store.get_reads("dRead3"), [],
+                             "An unknown read identifier should have returned no reads")
+
+    # Tests that the R1 or R2 reads of a read identifier are returned
+    def test_get_pair_reads(self):
+        self.assertListEqual(self.donor_store.get_pair_reads("dRead1", "2"),
+                             [("dRead1", "2", "CCCC", "IIII")],
+                             "Only the R2 read of dRead1 should have been returned")
+
+    # Tests that a subset only keeps the selected read identifiers
+    def test_subset(self):
+        donor_subset = self.donor_store.subset(["dRead1", "dRead3"])
+        self.assertEqual(len(donor_subset), 1, "The subset should have contained one read ID")
+        self.assertIn("dRead1", donor_subset, "dRead1 should have been in the subset")
+        self.assertNotIn("dRead2", donor_subset, "dRead2 should not have been in the subset")
+
+    # Tests that donor reads saved per read identifier are indexed
+    def test_from_read_data_dict(self):
+        read_data = {"dRead1": [self.read_tuples[1], self.read_tuples[3]]}
+        donor_store = DonorReadStore.from_read_data(read_data)
+        self.assertListEqual(donor_store.get_reads("dRead1"),
+                             [self.read_tuples[1], self.read_tuples[3]],
+                             "Both dRead1 reads should have been indexed")
+        self.assertIs(DonorReadStore.from_read_data(donor_store), donor_store,
+                      "A DonorReadStore should have been returned as is")
+
+    # Tests that linking insert positions gives the same result for a store and a list
+    def test_link_donor_addpos_reads_v2(self):
+        link_answer = VaSeBuilder.link_donor_addpos_reads_v2([6, 8], ["dRead1", "dRead2"],
+                                                            self.read_tuples)
+        link_store = VaSeBuilder.link_donor_addpos_reads_v2([6, 8], ["dRead1", "dRead2"],
+                                                           self.donor_store)
+        self.assertDictEqual(link_store, link_answer,
+                             "Linking a store and a list should have given the same result")
+        self.assertListEqual(link_store[6], self.donor_store.get_reads("dRead1"),
+                             "dRead1 should have been linked to position 6")
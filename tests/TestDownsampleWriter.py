@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from downsample_writer import DownsampleWriter
+from fastq_writer import FastqWriter
+
+
+class TestDownsampleWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.outpath = os.path.join(self.tmpdir.name, "VaSe_2019-01-01_L1_R1.fastq")
+        self.read_names = [f"aRead{x}".encode() for x in range(200)]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read_set(self, fraction):
+        with open(DownsampleWriter.get_set_path(self.outpath, fraction), "rb") as setfile:
+            return setfile.read().split(b"\n")[:-1:4]
+
+    # Tests that the downsample fraction is placed before the read number
+    def test_get_set_path(self):
+        self.assertEqual(DownsampleWriter.get_set_path("out/VaSe_L1_R2.fastq", 0.25),
+                         "out/VaSe_L1_DS0p25_R2.fastq",
+                         "The downsample fraction should have been placed before the read number")
+        self.assertEqual(DownsampleWriter.get_set_path("out/VaSe_L1.fastq", 1.0),
+                         "out/VaSe_L1_DS1.fastq",
+                         "A fraction of 1 should have been written without decimals")
+
+    # Tests that both reads of a pair get the same hash value, which depends on the seed
+    def test_get_read_value(self):
+        self.assertEqual(DownsampleWriter.get_read_value(b"aRead1/1"),
+                         DownsampleWriter.get_read_value(b"aRead1/2"),
+                         "Both reads of a pair should have had the same hash value")
+        self.assertNotEqual(DownsampleWriter.get_read_value(b"aRead1", 2),
+                            DownsampleWriter.get_read_value(b"aRead1", 3),
+                            "Another seed should have given another hash value")
+
+    # Tests that template reads are downsampled per set, smaller sets being subsets of larger
+    # ones, and donor reads are written to every set
+    def test_write_template(self):
+        with DownsampleWriter(self.outpath, FastqWriter, [0.5, 0.1]) as downsample_writer:
+            for read_name in self.read_names:
+                downsample_writer.write_template(b"@" + read_name + b" 1:N\n", b"ACGT\n+\nIIII\n")
+            downsample_writer.write_donor_read(("dRead1", "1", "ACGT", "IIII"))
+            record_counts = list(downsample_writer.record_counts)
+
+        half_set, tenth_set = self.read_set(0.5), self.read_set(0.1)
+        self.assertListEqual(record_counts, [len(half_set), len(tenth_set)],
+                             "The record counts should have been the number of written records")
+        self.assertTrue(60 < len(half_set) < 140 and 5 < len(tenth_set) < 40,
+                        "About half and a tenth of the template reads should have been kept")
+        self.assertTrue(set(tenth_set) <= set(half_set),
+                        "The reads of the smaller set should have been in the larger set")
+        self.assertEqual(half_set[-1], b"@dRead1", "The donor read should have been kept")
+        self.assertEqual(tenth_set[-1], b"@dRead1", "The donor read should have been kept")
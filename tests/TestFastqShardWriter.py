@@ -0,0 +1,94 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from acceptor_skip_set import AcceptorSkipSet
+from fastq_writer import FastqWriter
+from fastq_shard_writer import FastqShardWriter
+from insert_position_log import InsertPositionLog
+from vasebuilder import VaSeBuilder
+
+
+class TestFastqShardWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.outpath = os.path.join(self.tmpdir.name, "VaSe_2019-01-01_L1_R1.fastq")
+        self.template_records = [(f"@aRead{x}\n".encode(), b"ACGT\n+\nIIII\n") for x in range(7)]
+        self.fastq_records = [b"".join(x) for x in self.template_records]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read_shard(self, shard_index):
+        with open(FastqShardWriter.get_shard_path(self.outpath, shard_index), "rb") as shardfile:
+            return shardfile.read()
+
+    # Tests that the shard number is placed before the read number
+    def test_get_shard_path(self):
+        self.assertEqual(FastqShardWriter.get_shard_path("out/VaSe_L1_R2.fastq", 1),
+                         "out/VaSe_L1_S002_R2.fastq",
+                         "The shard number should have been placed before the read number")
+        self.assertEqual(FastqShardWriter.get_shard_path("out/VaSe_L1.bam", 0),
+                         "out/VaSe_L1_S001.bam",
+                         "The shard number should have been appended to the interleaved name")
+
+    # Tests that record positions are mapped to round-robin and fixed size shards
+    def test_get_shard_position(self):
+        self.assertTupleEqual(FastqShardWriter.get_shard_position(5, num_of_shards=3), (2, 1),
+                              "Record 5 should have been the second record of the third shard")
+        self.assertTupleEqual(FastqShardWriter.get_shard_position(5, shard_size=2), (2, 1),
+                              "Record 5 should have been the second record of the third shard")
+        self.assertTupleEqual(FastqShardWriter.get_shard_position(5, num_of_shards=2,
+                                                                  records_per_unit=2),
+                              (0, 3),
+                              "Record 5 should have been the fourth record of the first shard")
+
+    # Tests that records are written round-robin
+    def test_write_round_robin(self):
+        with FastqShardWriter(self.outpath, FastqWriter, num_of_shards=3) as shard_writer:
+            for header_line, record_lines in self.template_records:
+                shard_writer.write_template(header_line, record_lines)
+        for shard_index in range(3):
+            self.assertEqual(self.read_shard(shard_index),
+                             b"".join(self.fastq_records[shard_index::3]),
+                             f"Shard {shard_index + 1} should have had every third record")
+
+    # Tests that fixed size shards are filled one after another with whole read pairs
+    def test_write_shard_size(self):
+        with FastqShardWriter(self.outpath, FastqWriter, shard_size=2,
+                              records_per_unit=2) as shard_writer:
+            for header_line, record_lines in self.template_records[:6]:
+                shard_writer.write_template(header_line, record_lines)
+        self.assertEqual(self.read_shard(0), b"".join(self.fastq_records[:4]),
+                         "The first shard should have had the first two read pairs")
+        self.assertEqual(self.read_shard(1), b"".join(self.fastq_records[4:6]),
+                         "The second shard should have had the last read pair")
+
+    # Tests that an interleaved lane alternates R1 and R2 reads and records shard positions
+    def test_write_interleaved_fastq(self):
+        template_fqs = []
+        for fr in ["1", "2"]:
+            template_fqs.append(os.path.join(self.tmpdir.name, f"template_R{fr}.fq.gz"))
+            with gzip.open(template_fqs[-1], "wt") as templatefile:
+                templatefile.write("".join([f"@aRead{x}/{fr}\nACGT\n+\nIIII\n" for x in range(3)]))
+        vase_b = VaSeBuilder("test", interleaved=True, num_of_shards=2)
+        fastq_outpath = vase_b.get_interleaved_out_path(self.outpath)
+        insert_log = InsertPositionLog()
+        vase_b.write_interleaved_fastq(template_fqs[0], template_fqs[1],
+                                       AcceptorSkipSet(["aRead1/1"]),
+                                       [(0, ("dRead1", "1", "CCCC", "IIII"))],
+                                       [(0, ("dRead1", "2", "GGGG", "IIII"))],
+                                       3, fastq_outpath, insert_log)
+
+        shard_paths = [FastqShardWriter.get_shard_path(fastq_outpath, x) for x in range(2)]
+        with open(shard_paths[0], "r") as shardfile:
+            self.assertListEqual(shardfile.read().split("\n")[::4],
+                                 ["@aRead0/1", "@aRead0/2", "@aRead2/1", "@aRead2/2", ""],
+                                 "The first shard should have had the template read pairs")
+        with open(shard_paths[1], "r") as shardfile:
+            self.assertListEqual(shardfile.read().split("\n")[::4], ["@dRead1", "@dRead1", ""],
+                                 "The second shard should have had the donor read pair")
+        self.assertListEqual(list(insert_log.get_rows()),
+                             [(os.path.splitext(shard_paths[1])[0], "dRead1", 1, 2)],
+                             "The donor read pair should have been recorded in the second shard")
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+
+import pysam
+
+from inclusion_filter import InclusionVariant
+from vasebuilder import VaSeBuilder
+
+
+class TestFetchListedVcfVariants(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.vcf_path = os.path.join(self.tmpdir.name, "donor.vcf")
+        with open(self.vcf_path, "w") as vcffile:
+            vcffile.write("##fileformat=VCFv4.2\n##contig=<ID=21,length=10000>\n"
+                          "##contig=<ID=22,length=10000>\n"
+                          "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n"
+                          "21\t100\t.\tACGT\tA\t.\tPASS\t.\n"
+                          "21\t102\t.\tG\tT\t.\tPASS\t.\n"
+                          "21\t102\t.\tG\tC\t.\tPASS\t.\n"
+                          "21\t500\t.\tA\tG\t.\tPASS\t.\n"
+                          "22\t50\t.\tC\tT\t.\tPASS\t.\n")
+        self.vcf_path = pysam.tabix_index(self.vcf_path, preset="vcf")
+        self.vs_builder = VaSeBuilder("aap")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    # Tests that index queries find the same variants, in file order, as reading the whole file
+    def test_fetch_listed_vcf_variants(self):
+        filterlist = [InclusionVariant("S1", "22", 50, "C", "T"),
+                      InclusionVariant("S1", "21", 102, "G", "C"),
+                      InclusionVariant("S1", "21", 500, "A", "C"),
+                      InclusionVariant("S1", "X", 10, "A", "C")]
+        fetched_variants = self.vs_builder.fetch_listed_vcf_variants(
+            pysam.VariantFile(self.vcf_path), filterlist
+            )
+        read_variants = self.vs_builder.get_sample_vcf_variants_2(self.vcf_path, filterlist)
+        self.assertListEqual([str(x[0]) for x in fetched_variants],
+                             [str(x[0]) for x in read_variants],
+                             "The fetched variants should have been the filtered file variants")
+        self.assertListEqual([(x[0].contig, x[0].pos, x[0].alts) for x in fetched_variants],
+                             [("21", 102, ("C",)), ("22", 50, ("T",))],
+                             "Only the listed variants should have been fetched")
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+from insert_position_log import InsertPositionLog
+
+
+class TestInsertPositionLog(unittest.TestCase):
+    def setUp(self):
+        self.insert_log = InsertPositionLog()
+        self.insert_log.add_fastq("VaSe_L2")
+        self.insert_log.add_fastq("VaSe_L1")
+        self.insert_log.add_insert("VaSe_L2", "dRead2", "1", 30)
+        self.insert_log.add_insert("VaSe_L1", "dRead2", "2", 20)
+        self.insert_log.add_insert("VaSe_L2", "dRead1", "1", 10)
+        self.insert_log.add_insert("VaSe_L2", "dRead1", "2", 10)
+        self.insert_log.add_insert("VaSe_L2", "dRead1", "1", 99)
+        self.insert_log.add_insert("VaSe_L3", "dRead3", "1", 5)
+        self.rows_answer = [("VaSe_L2", "dRead1", 10, 10), ("VaSe_L2", "dRead2", 30, None),
+                            ("VaSe_L1", "dRead2", None, 20)]
+
+    # Tests that rows are sorted per fastq set by read identifier, and only the first insert of
+    # each read is kept
+    def test_get_rows(self):
+        self.assertEqual(len(self.insert_log), 3, "There should have been three logged reads")
+        self.assertListEqual(list(self.insert_log.get_rows()), self.rows_answer,
+                             "The rows should have been sorted by fastq set and read identifier")
+
+    # Tests that the first insert position is kept over separate compactions
+    def test_compact(self):
+        self.insert_log.compact()
+        self.insert_log.add_insert("VaSe_L2", "dRead1", "2", 77)
+        self.insert_log.add_insert("VaSe_L1", "dRead2", "1", 40)
+        self.assertListEqual(list(self.insert_log.get_rows()),
+                             self.rows_answer[:2] + [("VaSe_L1", "dRead2", 40, 20)],
+                             "Only the missing R1 position should have been added")
+
+    # Tests that merging logs of separate lanes gives the same rows as a single log
+    def test_merge(self):
+        lane1_log = InsertPositionLog()
+        lane1_log.add_fastq("VaSe_L1")
+        lane1_log.add_insert("VaSe_L1", "dRead2", "2", 20)
+        lane2_log = InsertPositionLog()
+        lane2_log.add_fastq("VaSe_L2")
+        lane2_log.add_insert("VaSe_L2", "dRead2", "1", 30)
+        lane2_log.add_insert("VaSe_L2", "dRead1", "2", 10)
+        lane2_log.add_insert("VaSe_L2", "dRead1", "1", 10)
+        merged_log = InsertPositionLog()
+        merged_log.add_fastq("VaSe_L2")
+        merged_log.merge(lane1_log)
+        merged_log.merge(lane2_log)
+        self.assertListEqual(list(merged_log.get_rows()), self.rows_answer,
+                             "The merged rows should have been the same")
+
+    # Tests that the log columns are written and read back
+    def test_write_read_columns(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            columns_path = os.path.join(tmpdir, "VaSe_donor_read_insert_positions.npz")
+            self.insert_log.write_columns(columns_path)
+            read_log = InsertPositionLog.read_columns(columns_path)
+        self.assertListEqual(list(read_log.get_rows()), self.rows_answer,
+                             "The read back rows should have been the same")
+        read_log.add_insert("VaSe_L1", "dRead2", "1", 40)
+        self.assertEqual(len(read_log), 3, "The read back log should have been extendable")
+
+    # Tests that rows are selected by read identifier and fastq set
+    def test_query(self):
+        self.assertListEqual(list(self.insert_log.query(read_ids=["dRead2", "dRead9"])),
+                             self.rows_answer[1:],
+                             "Both dRead2 rows should have been selected")
+        self.assertListEqual(list(self.insert_log.query(read_ids=["dRead2"],
+                                                        fastq_prefixes=["VaSe_L1"])),
+                             self.rows_answer[2:],
+                             "Only the VaSe_L1 dRead2 row should have been selected")
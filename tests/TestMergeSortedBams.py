@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+import pysam
+
+from vasebuilder import VaSeBuilder
+
+
+class TestMergeSortedBams(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.bam_header = {"HD": {"VN": "1.6"},
+                           "SQ": [{"SN": "21", "LN": 10000}, {"SN": "22", "LN": 10000}]}
+        # Read name, reference index and position per sorted run
+        run_reads = [[("aRead1", 0, 100), ("aRead2", 0, 500), ("aRead3", 1, 50)],
+                     [("bRead1", 0, 300), ("bRead2", 1, 10), ("bRead3", -1, -1)],
+                     []]
+        self.run_paths = []
+        for run_index, reads in enumerate(run_reads):
+            run_path = os.path.join(self.tmpdir.name, f"run{run_index}.bam")
+            with pysam.AlignmentFile(run_path, "wb", header=self.bam_header) as bamfile:
+                for read_name, read_tid, read_pos in reads:
+                    bamread = pysam.AlignedSegment()
+                    bamread.query_name = read_name
+                    bamread.flag = 4 if read_tid < 0 else 0
+                    bamread.reference_id = read_tid
+                    bamread.reference_start = read_pos
+                    bamread.query_sequence = "ACGTA"
+                    if read_tid >= 0:
+                        bamread.cigarstring = "5M"
+                    bamfile.write(bamread)
+            self.run_paths.append(run_path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    # Tests that sorted runs are merged into one coordinate sorted and indexed BAM file
+    def test_merge_sorted_bams(self):
+        out_path = os.path.join(self.tmpdir.name, "merged.bam")
+        VaSeBuilder.merge_sorted_bams(self.bam_header, self.run_paths, out_path)
+        with pysam.AlignmentFile(out_path) as bamfile:
+            self.assertEqual(bamfile.header.to_dict()["HD"]["SO"], "coordinate",
+                             "The merged BAM file should have been marked coordinate sorted")
+            self.assertListEqual([x.query_name for x in bamfile.fetch(until_eof=True)],
+                                 ["aRead1", "bRead1", "aRead2", "bRead2", "aRead3", "bRead3"],
+                                 "The reads of all runs should have been merged in sorted order")
+        self.assertTrue(os.path.isfile(f"{out_path}.bai"),
+                        "The merged BAM file should have been indexed")
@@ -0,0 +1,152 @@
+import glob
+import gzip
+import os
+import random
+import tempfile
+import unittest
+
+import pysam
+
+import argparser_beta
+from sample_mapper import Sample
+from vase import VaSe
+from vasebuilder import VaSeBuilder
+
+
+class TestMultiAcceptor(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        rng = random.Random(1)
+        self.ref_seq = "".join([rng.choice("ACGT") for _ in range(2000)])
+        self.reference = os.path.join(self.tmpdir.name, "ref.fa")
+        with open(self.reference, "w") as reffile:
+            reffile.write(f">21\n{self.ref_seq}\n")
+        pysam.faidx(self.reference)
+
+        # Donor and acceptor read pairs overlap the variant at position 1000, with the reads of
+        # acceptor accB shifted so its acceptor contexts differ from those of accA.
+        self.donor_bam = self.write_bam("donor.bam", "D1", "dRead", 0)
+        self.acceptors = [self.write_acceptor("accA", 0), self.write_acceptor("accB", 40)]
+        self.donor_vcf = os.path.join(self.tmpdir.name, "donor.vcf")
+        with open(self.donor_vcf, "w") as vcffile:
+            vcffile.write("##fileformat=VCFv4.2\n##contig=<ID=21,length=2000>\n"
+                          '##FORMAT=<ID=GT,Number=1,Type=String,Description="Genotype">\n'
+                          "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\tD1\n"
+                          f"21\t1000\t.\t{self.ref_seq[999]}\t"
+                          f"{'A' if self.ref_seq[999] != 'A' else 'C'}\t.\tPASS\t.\tGT\t0/1\n")
+        self.donor_vcf = pysam.tabix_index(self.donor_vcf, preset="vcf")
+        self.sample = Sample("D1", self.donor_bam, self.donor_vcf)
+        self.sample.hash_id = "D1"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_bam(self, bam_name, sample_id, read_prefix, offset):
+        bam_path = os.path.join(self.tmpdir.name, bam_name)
+        bam_header = {"HD": {"VN": "1.6", "SO": "coordinate"},
+                      "SQ": [{"SN": "21", "LN": 2000}],
+                      "RG": [{"ID": sample_id, "SM": sample_id}]}
+        bam_reads = []
+        for read_num in range(6):
+            read_pos = 900 + 20 * read_num + offset
+            for is_read1, mate_pos in [(True, read_pos), (False, read_pos + 100)]:
+                bamread = pysam.AlignedSegment()
+                bamread.query_name = f"{read_prefix}{read_num}"
+                bamread.flag = 1 + 2 + (64 + 32 if is_read1 else 128 + 16)
+                bamread.reference_id = 0
+                bamread.reference_start = mate_pos
+                bamread.mapping_quality = 60
+                bamread.cigarstring = "50M"
+                bamread.next_reference_id = 0
+                bamread.next_reference_start = read_pos + 100 if is_read1 else read_pos
+                bamread.template_length = 150 if is_read1 else -150
+                bamread.query_sequence = self.ref_seq[mate_pos:mate_pos + 50]
+                bamread.query_qualities = pysam.qualitystring_to_array("I" * 50)
+                bamread.set_tag("RG", sample_id)
+                bam_reads.append(bamread)
+        with pysam.AlignmentFile(bam_path, "wb", header=bam_header) as bamfile:
+            for bamread in sorted(bam_reads, key=lambda x: x.reference_start):
+                bamfile.write(bamread)
+        pysam.index(bam_path)
+        return bam_path
+
+    def write_acceptor(self, acceptor_name, offset):
+        acceptor_bam = self.write_bam(f"{acceptor_name}.bam", acceptor_name, f"{acceptor_name}_",
+                                      offset)
+        template_fqs = []
+        for fr in ["1", "2"]:
+            template_fqs.append(os.path.join(self.tmpdir.name, f"{acceptor_name}_R{fr}.fq.gz"))
+            with gzip.open(template_fqs[-1], "wt") as templatefile:
+                templatefile.write("".join([f"@{acceptor_name}_{x} {fr}:N:0\nACGT\n+\nIIII\n"
+                                            for x in range(10)]))
+        return acceptor_name, acceptor_bam, [template_fqs[0]], [template_fqs[1]]
+
+    def build_validation_sets(self, vs_builder, out_name):
+        outpath = os.path.join(self.tmpdir.name, out_name)
+        os.mkdir(outpath)
+        vs_builder.run_multi_acceptor_f_mode([self.sample], self.acceptors, f"{outpath}/",
+                                             self.reference, f"{outpath}/VaSe.varcon", None,
+                                             True, f"{outpath}/VaSe", 2)
+        return outpath
+
+    def read_validation_set(self, outpath, acceptor_name):
+        with open(f"{outpath}/VaSe_{acceptor_name}.varcon") as varconfile:
+            varcon_lines = [x.split("\t") for x in varconfile if not x.startswith("#")]
+        fastq_data = []
+        for fastq_path in sorted(glob.glob(f"{outpath}/VaSe_{acceptor_name}_*.fastq")):
+            with open(fastq_path) as fastqfile:
+                fastq_data.append(fastqfile.read())
+        return varcon_lines, fastq_data
+
+    # Tests that every acceptor gets its own variant contexts and validation fastq files
+    def test_run_multi_acceptor_f_mode(self):
+        outpath = self.build_validation_sets(VaSeBuilder("test"), "serial")
+        for acceptor_name, other_name in [("accA", "accB"), ("accB", "accA")]:
+            varcon_lines, fastq_data = self.read_validation_set(outpath, acceptor_name)
+            self.assertEqual(len(varcon_lines), 1,
+                             f"{acceptor_name} should have had a single variant context")
+            self.assertTrue(all([x.startswith(f"{acceptor_name}_")
+                                 for x in varcon_lines[0][11].split(";")]),
+                            f"The acceptor reads should have been the reads of {acceptor_name}")
+            self.assertEqual(len(fastq_data), 2,
+                             f"{acceptor_name} should have had an R1 and R2 validation fastq")
+            for fastq_text in fastq_data:
+                self.assertIn("@dRead0", fastq_text,
+                              f"The donor reads should have been added to {acceptor_name}")
+                self.assertIn(f"@{acceptor_name}_9 ", fastq_text,
+                              f"The {acceptor_name} template reads should have been kept")
+                self.assertNotIn(f"@{acceptor_name}_0 ", fastq_text,
+                                 f"The {acceptor_name} context reads should have been removed")
+                self.assertNotIn(other_name, fastq_text,
+                                 f"No {other_name} reads should have been in {acceptor_name}")
+        self.assertNotEqual(self.read_validation_set(outpath, "accA")[0][0][6],
+                            self.read_validation_set(outpath, "accB")[0][0][6],
+                            "The acceptor contexts should have been determined per acceptor")
+
+    # Tests that building the acceptors in forked processes gives the same validation sets
+    def test_run_multi_acceptor_f_mode_parallel(self):
+        serial_outpath = self.build_validation_sets(VaSeBuilder("test"), "serial")
+        parallel_outpath = self.build_validation_sets(VaSeBuilder("test", 2), "parallel")
+        for acceptor_name in ["accA", "accB"]:
+            self.assertEqual(self.read_validation_set(parallel_outpath, acceptor_name),
+                             self.read_validation_set(serial_outpath, acceptor_name),
+                             f"The parallel {acceptor_name} validation set should have been the "
+                             "same as the serial one")
+
+    # Tests that repeated -1/-2 options are kept per acceptor, and flattened into lanes
+    def test_acceptor_fastq_options(self):
+        vase_parser = argparser_beta.VaSeParser()
+        vase_parser.setup()
+        vase_args = vase_parser.parse_args(
+            ["BuildValidationSet", "-r", self.reference, "-b", self.donor_bam,
+             "-v", self.donor_vcf, "-a", self.acceptors[0][1], self.acceptors[1][1],
+             "-1", *self.acceptors[0][2], "-2", *self.acceptors[0][3],
+             "-1", *self.acceptors[1][2], "-2", *self.acceptors[1][3]]
+            )
+        self.assertListEqual(vase_args.acceptor_fq_1s, [self.acceptors[0][2], self.acceptors[1][2]],
+                             "The R1 fastq files should have been listed per -1 option")
+        self.assertListEqual(vase_args.acceptor_fq_2s, [self.acceptors[0][3], self.acceptors[1][3]],
+                             "The R2 fastq files should have been listed per -2 option")
+        self.assertListEqual(VaSe.get_acceptor_lanes(vase_args.acceptor_fq_1s),
+                             self.acceptors[0][2] + self.acceptors[1][2],
+                             "The R1 fastq files should have been flattened into lanes")
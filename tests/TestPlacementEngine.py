@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+
+from placement_engine import PlacementEngine
+
+
+class TestPlacementEngine(unittest.TestCase):
+    def setUp(self):
+        self.placement_engine = PlacementEngine(2)
+
+    # Tests that the output name and lane are taken from a validation fastq path
+    def test_get_output_lane(self):
+        self.assertEqual(PlacementEngine.get_output_lane("/out/VaSe_2020-01-31_L3_R2.fastq"),
+                         ("VaSe", 3), "The output name should have been VaSe and the lane 3")
+        self.assertEqual(PlacementEngine.get_output_lane("/out/other.fastq"), ("other", 0),
+                         "An unknown fastq path should have been lane 0")
+
+    # Tests that R1 and R2 files of a lane get the same positions on any day
+    def test_same_lane_positions(self):
+        r1_positions = self.placement_engine.get_add_positions(
+            100, 10, *PlacementEngine.get_output_lane("VaSe_2020-01-31_L1_R1.fastq"))
+        r2_positions = self.placement_engine.get_add_positions(
+            100, 10, *PlacementEngine.get_output_lane("VaSe_2021-06-01_L1_R2.fastq"))
+        np.testing.assert_array_equal(r1_positions, r2_positions)
+
+    # Tests that lanes use independent random streams that do not depend on call order
+    def test_independent_lanes(self):
+        lane2_positions = self.placement_engine.get_add_positions(1000, 10, "VaSe", 2)
+        lane1_positions = self.placement_engine.get_add_positions(1000, 10, "VaSe", 1)
+        self.assertFalse(np.array_equal(lane1_positions, lane2_positions),
+                         "Lanes 1 and 2 should have had different positions")
+        np.testing.assert_array_equal(
+            PlacementEngine(2).get_add_positions(1000, 10, "VaSe", 2), lane2_positions)
+
+    # Tests that negative seeds give their own reproducible positions
+    def test_negative_seed(self):
+        negative_positions = PlacementEngine(-1).get_add_positions(1000, 10, "VaSe", 1)
+        np.testing.assert_array_equal(
+            PlacementEngine(-1).get_add_positions(1000, 10, "VaSe", 1), negative_positions)
+        positive_positions = PlacementEngine(1).get_add_positions(1000, 10, "VaSe", 1)
+        self.assertFalse(np.array_equal(positive_positions, negative_positions),
+                         "Seeds -1 and 1 should have had different positions")
+
+    # Tests that positions are unique unless there are more donor than template reads
+    def test_get_add_positions(self):
+        add_positions = self.placement_engine.get_add_positions(10, 7, "VaSe", 1)
+        self.assertEqual(len(np.unique(add_positions)), 7, "All 7 positions should be unique")
+        add_positions = self.placement_engine.get_add_positions(10, 25, "VaSe", 1)
+        self.assertListEqual(sorted(np.bincount(add_positions).tolist()), [2] * 5 + [3] * 5,
+                             "Each template position should have been used twice, and 5 "
+                             "positions a third time")
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+
+import pysam
+
+from disk_donor_store import DiskDonorStore
+from vasebuilder import VaSeBuilder
+
+
+class TestReadDonorBam(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.donor_bam = os.path.join(self.tmpdir.name, "donor.bam")
+        bam_header = {"HD": {"VN": "1.6", "SO": "coordinate"},
+                      "SQ": [{"SN": "21", "LN": 10000}]}
+        # Read name, is read 1, is reverse, position, sequence, qualities
+        donor_reads = [("dRead1", True, False, 100, "ACGTN", [30, 31, 32, 33, 34]),
+                       ("dRead1", False, True, 200, "AACCG", [10, 20, 30, 40, 41]),
+                       ("dRead2", False, True, 300, "acgtn", [2, 2, 2, 2, 2]),
+                       ("dRead3", True, False, 400, "TTTTT", [40, 40, 40, 40, 40]),
+                       ("dRead3", True, False, 500, "GGGGG", [40, 40, 40, 40, 40]),
+                       ("dRead3", False, True, 600, "CCCCC", [40, 40, 40, 40, 40])]
+        with pysam.AlignmentFile(self.donor_bam, "wb", header=bam_header) as bamfile:
+            for read_name, is_read1, is_reverse, read_pos, read_seq, read_quals in donor_reads:
+                bamread = pysam.AlignedSegment()
+                bamread.query_name = read_name
+                bamread.flag = 1 + (64 if is_read1 else 128) + (16 if is_reverse else 0)
+                bamread.reference_id = 0
+                bamread.reference_start = read_pos
+                bamread.mapping_quality = 60
+                bamread.cigarstring = f"{len(read_seq)}M"
+                bamread.query_sequence = read_seq
+                bamread.query_qualities = pysam.qualitystring_to_array(
+                    "".join([chr(x + 33) for x in read_quals]))
+                bamfile.write(bamread)
+        pysam.index(self.donor_bam)
+        self.vs_builder = VaSeBuilder("aap")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    # Tests that reads are saved as [R1, R2] with reverse strand reads reverse complemented
+    def test_read_donor_bam_v3(self):
+        donor_read_data = self.vs_builder.read_donor_bam_v3(self.donor_bam, {})
+        self.assertListEqual(donor_read_data["dRead1"],
+                             [("dRead1", "1", "ACGTN", "?@ABC"),
+                              ("dRead1", "2", "CGGTT", "JI?5+")],
+                             "dRead1 should have been saved as R1 and reverse complemented R2")
+        self.assertListEqual(donor_read_data["dRead2"],
+                             [None, ("dRead2", "2", "NACGT", "#####")],
+                             "dRead2 should have had an empty R1 slot")
+        self.assertEqual(len(donor_read_data["dRead3"]), 3,
+                         "The additional R1 read of dRead3 should have been appended")
+
+    # Tests that read pairs without an R1 or R2 read, or with extra reads, are removed
+    def test_remove_incorrect_bam_donor_readpairs(self):
+        donor_read_data = self.vs_builder.read_donor_bam_v3(self.donor_bam, {})
+        donor_read_data = self.vs_builder.remove_incorrect_bam_donor_readpairs(donor_read_data)
+        self.assertListEqual(list(donor_read_data.keys()), ["dRead1"],
+                             "Only the dRead1 read pair should have been kept")
+
+    # Tests that reading BAM files in parallel gives the same result as reading them serially
+    def test_read_donor_bams(self):
+        donor_bams = [self.donor_bam, self.donor_bam, os.path.join(self.tmpdir.name, "nobam.bam")]
+        serial_read_data = self.vs_builder.read_donor_bams(donor_bams)
+        parallel_read_data = VaSeBuilder("aap", 2).read_donor_bams(donor_bams)
+        self.assertEqual(list(parallel_read_data.items()), list(serial_read_data.items()),
+                         "The parallel and serial donor read data should have been the same")
+        self.assertEqual(len(serial_read_data["dRead1"]), 4,
+                         "dRead1 should have been read from both BAM files")
+
+    # Tests that donor reads are streamed into a disk donor store in BAM file order
+    def test_iter_donor_bam_tuples_disk_store(self):
+        donor_bams = [self.donor_bam, os.path.join(self.tmpdir.name, "nobam.bam"), self.donor_bam]
+        stored_reads = []
+        for threads in [1, 2]:
+            donor_store = DiskDonorStore(os.path.join(self.tmpdir.name, f"store{threads}.sqlite"))
+            for donor_read_tuples in VaSeBuilder("aap", threads).iter_donor_bam_tuples(donor_bams):
+                donor_store.add_donor_reads(donor_read_tuples)
+            stored_reads.append(donor_store.connection.execute(
+                "SELECT read_id, pair, read_order FROM donor_reads ORDER BY read_order"
+                ).fetchall())
+            donor_store.close()
+        self.assertEqual(len(stored_reads[0]), 12,
+                         "The reads of both readable BAM files should have been stored")
+        self.assertListEqual(stored_reads[1], stored_reads[0],
+                             "The parallel reads should have been stored in the serial order")
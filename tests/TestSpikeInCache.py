@@ -0,0 +1,64 @@
+import os
+import tempfile
+import time
+import unittest
+
+from spike_in_cache import SpikeInCache
+
+
+class TestSpikeInCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.spike_in_cache = SpikeInCache(os.path.join(self.tmpdir.name, "cache"))
+        self.file_prefix = os.path.join(self.tmpdir.name, "VaSe_1_100")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_spike_in(self, file_prefix, file_size=10):
+        filepaths = [f"{file_prefix}.sorted.bam", f"{file_prefix}.vcf"]
+        for filepath in filepaths:
+            with open(filepath, "wb") as outfile:
+                outfile.write(b"x" * file_size)
+        return filepaths
+
+    # Tests that keys depend on every key part
+    def test_get_key(self):
+        self.assertEqual(self.spike_in_cache.get_key("P", "S1", [1, 2]),
+                         self.spike_in_cache.get_key("P", "S1", [1, 2]),
+                         "The same key parts should have given the same key")
+        self.assertNotEqual(self.spike_in_cache.get_key("P", "S1", [1, 2]),
+                            self.spike_in_cache.get_key("P", "S1", [1, 3]),
+                            "Other key parts should have given another key")
+
+    # Tests that stored files are copied to another output prefix with their suffixes
+    def test_store_fetch(self):
+        cache_key = self.spike_in_cache.get_key("P", "S1")
+        self.assertFalse(self.spike_in_cache.fetch(cache_key, self.file_prefix),
+                         "A missing entry should not have been fetched")
+        self.spike_in_cache.store(cache_key, self.file_prefix,
+                                  self.write_spike_in(self.file_prefix))
+        self.assertTrue(self.spike_in_cache.has_entry(cache_key),
+                        "The entry should have been stored")
+
+        fetch_prefix = os.path.join(self.tmpdir.name, "Other_1_100")
+        self.assertTrue(self.spike_in_cache.fetch(cache_key, fetch_prefix),
+                        "The stored entry should have been fetched")
+        self.assertTrue(os.path.isfile(f"{fetch_prefix}.sorted.bam")
+                        and os.path.isfile(f"{fetch_prefix}.vcf"),
+                        "The cached files should have been copied with their suffixes")
+
+    # Tests that the least recently used entries are evicted first
+    def test_evict(self):
+        self.spike_in_cache.max_size = 50
+        cache_keys = [self.spike_in_cache.get_key("P", x) for x in range(3)]
+        for cache_key in cache_keys:
+            self.spike_in_cache.store(cache_key, self.file_prefix,
+                                      self.write_spike_in(self.file_prefix))
+            time.sleep(0.01)
+        self.spike_in_cache.fetch(cache_keys[0], self.file_prefix)
+
+        self.assertEqual(self.spike_in_cache.evict(), 1, "A single entry should have been evicted")
+        self.assertListEqual([self.spike_in_cache.has_entry(x) for x in cache_keys],
+                             [True, False, True],
+                             "The least recently used entry should have been evicted")
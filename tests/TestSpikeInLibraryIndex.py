@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+
+from spike_in_library_index import SpikeInLibraryIndex
+
+
+class TestSpikeInLibraryIndex(unittest.TestCase):
+    def setUp(self):
+        self.library_index = SpikeInLibraryIndex()
+        self.library_index.add_context("1_100", "1", 50, 250, 1000, 2000, 4)
+        self.library_index.add_context("1_200", "1", 150, 350, 1500, 3000, 6)
+        self.library_index.add_context("1_900", "1", 850, 1050, 5000, 6000, 2)
+        self.library_index.add_context("2_100", "2", 50, 250, 7000, 8000, 2)
+        self.library_index.add_context("2_500", "2", 450, 650, -1, -1, 0)
+
+    # Tests that the index path is based on the library BAM file name
+    def test_get_index_path(self):
+        self.assertEqual(SpikeInLibraryIndex.get_index_path("out/VaSe_library.bam"),
+                         "out/VaSe_library_contexts.txt",
+                         "The index path should have been based on the library BAM file name")
+
+    # Tests that a written index is read back the same
+    def test_write_read(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            index_path = os.path.join(tmpdir, "VaSe_library_contexts.txt")
+            self.library_index.write(index_path)
+            self.assertDictEqual(SpikeInLibraryIndex.read(index_path).contexts,
+                                 self.library_index.contexts,
+                                 "The read index should have been the written index")
+
+    # Tests that regions are parsed to zero based windows
+    def test_parse_region(self):
+        self.assertTupleEqual(SpikeInLibraryIndex.parse_region("1:1,001-2,000"), ("1", 1000, 2000),
+                              "The region should have been parsed to a zero based window")
+        self.assertTupleEqual(SpikeInLibraryIndex.parse_region("X"), ("X", None, None),
+                              "A chromosome region should have had an open window")
+
+    # Tests that contexts are selected by ID and overlapping region, in library order
+    def test_select_contexts(self):
+        self.assertListEqual(self.library_index.select_contexts(), list(self.library_index.contexts),
+                             "All contexts should have been selected without IDs or regions")
+        self.assertListEqual(self.library_index.select_contexts(["2_100"], ["1:300-900"]),
+                             ["1_200", "1_900", "2_100"],
+                             "Contexts with the ID or overlapping the region should have been "
+                             "selected")
+        self.assertListEqual(self.library_index.select_contexts(regions=["2"]), ["2_100", "2_500"],
+                             "All contexts on the chromosome should have been selected")
+
+    # Tests that overlapping byte ranges are merged and contexts without reads skipped
+    def test_get_byte_ranges(self):
+        self.assertListEqual(self.library_index.get_byte_ranges(["2_100", "1_900", "1_200",
+                                                                 "1_100", "2_500"]),
+                             [(1000, 3000), (5000, 6000), (7000, 8000)],
+                             "Overlapping byte ranges should have been merged in file order")
@@ -0,0 +1,122 @@
+import gzip
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pysam
+
+from template_index import TemplateIndex
+from vasebuilder import VaSeBuilder
+
+
+class TestTemplateIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.template_records = [f"@aRead{x}\nACGT\n+\nIIII\n" for x in range(10)]
+        self.bgzf_fq = os.path.join(self.tmpdir.name, "template_R1.fq.gz")
+        with pysam.BGZFile(self.bgzf_fq, "wb") as bgzffile:
+            bgzffile.write("".join(self.template_records).encode())
+        self.gzip_fq = os.path.join(self.tmpdir.name, "template_gzip_R1.fq.gz")
+        with gzip.open(self.gzip_fq, "wb") as gzipfile:
+            gzipfile.write("".join(self.template_records).encode())
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    # Tests that the records and the offsets of every third record are saved
+    def test_build(self):
+        record_offsets_answer = [0, 60, 120, 180]
+        for template_fq, is_bgzf in [(self.bgzf_fq, True), (self.gzip_fq, False)]:
+            template_index = TemplateIndex.build(template_fq, 3)
+            self.assertEqual(template_index.num_of_records, 10,
+                             "The template should have had 10 records")
+            self.assertEqual(template_index.is_bgzf, is_bgzf,
+                             f"{template_fq} should have been BGZF: {is_bgzf}")
+            self.assertListEqual(template_index.uncompressed_offsets, record_offsets_answer,
+                                 "The uncompressed offsets should have been of every 3rd record")
+
+    # Tests that a written index is read back the same
+    def test_write_read_index(self):
+        template_index = TemplateIndex.build(self.gzip_fq, 3)
+        template_index.write_index()
+        read_index = TemplateIndex.read_index(self.gzip_fq)
+        self.assertEqual(read_index.num_of_records, 10, "The index should have had 10 records")
+        self.assertEqual(read_index.checksum, template_index.checksum,
+                         "The checksum should have been read back")
+        self.assertListEqual(read_index.uncompressed_offsets, template_index.uncompressed_offsets,
+                             "The uncompressed offsets should have been read back")
+        self.assertTrue(read_index.verify_checksum(), "The checksum should have matched")
+
+    # Tests that an index is only used while the template is unchanged
+    def test_read_fresh_index(self):
+        self.assertIsNone(TemplateIndex.read_fresh_index(self.gzip_fq),
+                          "There should have been no index")
+        TemplateIndex.build(self.gzip_fq, 3).write_index()
+        self.assertIsNotNone(TemplateIndex.read_fresh_index(self.gzip_fq),
+                             "The index should have been fresh")
+        with gzip.open(self.gzip_fq, "ab") as gzipfile:
+            gzipfile.write(b"@aRead10\nACGT\n+\nIIII\n")
+        self.assertIsNone(TemplateIndex.read_fresh_index(self.gzip_fq),
+                          "The index should have been stale")
+
+    # Tests that an index whose template content no longer matches is rebuilt, with a warning
+    def test_read_fresh_index_rebuild(self):
+        for template_fq, full in [(self.bgzf_fq, False), (self.gzip_fq, True)]:
+            template_index = TemplateIndex.build(template_fq, 3)
+            self.assertTrue(template_index.verify(full=full), "The index should have matched")
+            template_index.virtual_offsets = [x + 1 for x in template_index.virtual_offsets]
+            template_index.checksum = "0" * 32
+            self.assertFalse(template_index.verify(full=full),
+                             "The index should not have matched")
+            template_index.write_index()
+            with self.assertLogs("VaSe_Logger", "WARNING"):
+                read_index = TemplateIndex.read_fresh_index(template_fq, full)
+            self.assertTrue(read_index.verify(full=full), "The index should have been rebuilt")
+            self.assertTrue(TemplateIndex.read_index(template_fq).verify(full=full),
+                            "The rebuilt index should have been written")
+
+    # Tests that a gzip template is not read to load its index without a full verification
+    def test_read_fresh_index_gzip(self):
+        template_index = TemplateIndex.build(self.gzip_fq, 3)
+        template_index.checksum = "0" * 32
+        template_index.write_index()
+        with mock.patch.object(TemplateIndex, "calculate_checksum") as calculate_checksum:
+            self.assertEqual(TemplateIndex.read_fresh_index(self.gzip_fq).checksum, "0" * 32,
+                             "The fresh index should have been used as it is")
+        self.assertFalse(calculate_checksum.called,
+                         "The checksum of the template should not have been calculated")
+
+    # Tests that the checksum of a gzip template is calculated while it is scanned
+    def test_build_checksum(self):
+        with mock.patch.object(TemplateIndex, "calculate_checksum") as calculate_checksum:
+            template_index = TemplateIndex.build(self.gzip_fq, 3)
+        self.assertFalse(calculate_checksum.called,
+                         "The template should not have been read again for the checksum")
+        self.assertEqual(template_index.checksum, TemplateIndex.calculate_checksum(self.gzip_fq),
+                         "The checksum should have been of the compressed template")
+
+    # Tests that check_template_size returns the record count of a fresh index
+    def test_check_template_size(self):
+        template_index = TemplateIndex.build(self.gzip_fq, 3)
+        template_index.num_of_records = 99
+        template_index.write_index()
+        self.assertEqual(VaSeBuilder.check_template_size(self.gzip_fq), 99,
+                         "The record count of the index should have been used")
+
+    # Tests that a single record is read using the nearest checkpoint
+    def test_read_record(self):
+        template_index = TemplateIndex.build(self.bgzf_fq, 3)
+        self.assertEqual(template_index.read_record(7).decode(), self.template_records[7],
+                         "Record 7 should have been read")
+        self.assertIsNone(template_index.read_record(10), "Record 10 should not exist")
+
+    # Tests that verifying indexes only builds the missing ones
+    def test_index_templates_verify(self):
+        TemplateIndex.build(self.gzip_fq, 3).write_index()
+        with mock.patch.object(TemplateIndex, "build", wraps=TemplateIndex.build) as build:
+            VaSeBuilder("test").index_templates([self.gzip_fq, self.bgzf_fq], 3, verify=True)
+        self.assertListEqual([x.args[0] for x in build.call_args_list], [self.bgzf_fq],
+                             "Only the template without an index should have been indexed")
+        self.assertTrue(os.path.isfile(TemplateIndex.get_index_path(self.bgzf_fq)),
+                        "The missing index should have been written")
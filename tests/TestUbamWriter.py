@@ -0,0 +1,82 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+import pysam
+
+from acceptor_skip_set import AcceptorSkipSet
+from insert_position_log import InsertPositionLog
+from ubam_writer import UbamWriter
+from vasebuilder import VaSeBuilder
+
+
+class TestUbamWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read_ubam(self, ubam_path):
+        with pysam.AlignmentFile(ubam_path, "rb", check_sq=False) as ubamfile:
+            return ([x["ID"] for x in ubamfile.header.to_dict()["RG"]],
+                    [(x.query_name, x.flag, x.query_sequence,
+                      pysam.array_to_qualitystring(x.query_qualities), x.get_tag("RG"))
+                     for x in ubamfile.fetch(until_eof=True)])
+
+    # Tests that template and donor reads are written as unmapped paired reads with a read group
+    def test_write(self):
+        ubam_path = os.path.join(self.tmpdir.name, "VaSe_L1.bam")
+        with UbamWriter(ubam_path, {"ID": "VaSe_L1", "SM": "VaSe"}) as ubam_writer:
+            ubam_writer.write_template(b"@aRead1/1 1:N:0\n", b"ACGT\n+\nIIII\n")
+            ubam_writer.write_template(b"@aRead1/2 2:N:0\n", b"GGCA\n+\nI5II\n")
+            ubam_writer.write_donor_read(("dRead1", "2", "TTGA", "#I5I"))
+        self.assertTupleEqual(self.read_ubam(ubam_path),
+                              (["VaSe_L1"],
+                               [("aRead1", 77, "ACGT", "IIII", "VaSe_L1"),
+                                ("aRead1", 141, "GGCA", "I5II", "VaSe_L1"),
+                                ("dRead1", 141, "TTGA", "#I5I", "VaSe_L1")]),
+                              "The template reads should have been flagged R1 and R2 "
+                              "alternately, and the donor read by its pair number")
+
+    # Tests that unaligned BAM output writes both reads of a lane to a single file
+    def test_write_interleaved_ubam(self):
+        template_fqs = []
+        for fr in ["1", "2"]:
+            template_fqs.append(os.path.join(self.tmpdir.name, f"template_R{fr}.fq.gz"))
+            with gzip.open(template_fqs[-1], "wt") as templatefile:
+                templatefile.write("".join([f"@aRead{x}/{fr}\nACGT\n+\nIIII\n" for x in range(2)]))
+        vase_b = VaSeBuilder("test", output_format="ubam")
+        self.assertTrue(vase_b.is_interleaved(),
+                        "Unaligned BAM output should have been interleaved")
+        ubam_path = vase_b.get_interleaved_out_path(
+            vase_b.set_fastq_out_path(os.path.join(self.tmpdir.name, "VaSe"), "1", 3))
+        self.assertTrue(ubam_path.endswith("_L3.bam"),
+                        "The lane should have had a single .bam file")
+        vase_b.write_interleaved_fastq(template_fqs[0], template_fqs[1],
+                                       AcceptorSkipSet(["aRead1/1"]),
+                                       [(0, ("dRead1", "1", "CCCC", "IIII"))],
+                                       [(0, ("dRead1", "2", "GGGG", "IIII"))],
+                                       2, ubam_path, InsertPositionLog())
+
+        read_groups, ubam_reads = self.read_ubam(ubam_path)
+        self.assertListEqual(read_groups, ["VaSe_L3"],
+                             "The read group should have been named after the output and lane")
+        self.assertListEqual([x[:2] for x in ubam_reads],
+                             [("aRead0", 77), ("aRead0", 141), ("dRead1", 77), ("dRead1", 141)],
+                             "Both reads of each pair should have been written to the file")
+
+    # Tests that compression threads are divided over the unaligned BAM writers open at once
+    def test_get_writer_threads(self):
+        vase_b = VaSeBuilder("test", 8, output_format="ubam")
+        lane_threads = []
+        vase_b.run_lane_jobs([(lambda x: lane_threads.append(vase_b.writer_threads), ())],
+                             InsertPositionLog())
+        self.assertListEqual(lane_threads, [8],
+                             "A single lane should have been written with all threads")
+        self.assertEqual(vase_b.get_writer_threads(3), 2,
+                         "The threads should have been divided over the parallel lanes")
+        vase_b.downsample_fractions = [0.5, 0.25]
+        self.assertEqual(vase_b.get_writer_threads(4), 1,
+                         "Each writer should have had at least one thread")
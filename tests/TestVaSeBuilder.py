@@ -6,7 +6,6 @@ from unittest import mock
 from unittest.mock import patch, mock_open, call
 import os
 import sys
-import random
 import pysam
 
 # Import required class
@@ -229,48 +228,6 @@ class TestVaSeBuilder(unittest.TestCase):
         self.assertListEqual(self.vs_builder.divide_donorfastqs_over_acceptors(donorfq_list, 2), divlist_answer,
                              f"The returned divided donor fastq list should have been {divlist_answer}")
 
-    # ====================PERFORM TESTS FOR THE SHUFFLING METHODS====================
-    # Tests that the shuffling of donor read works as expected
-    def test_shuffle_donor_read_identifiers(self):
-        read_ids = ["Read4", "Read3", "Read5", "Read1", "Read2"]
-
-        shuffled_answer = ["Read3", "Read2", "Read4", "Read5", "Read1"]
-        shuffled_answer = read_ids.copy()
-        shuffled_answer.sort()
-        random.seed(2)
-        random.shuffle(shuffled_answer)
-
-        self.assertListEqual(self.vs_builder.shuffle_donor_read_identifiers(read_ids, 2), shuffled_answer,
-                             f"The correct shuffled donor read ids should have been {shuffled_answer}")
-
-    def test_shuffle_donor_add_positions(self):
-        add_positions = [6, 8, 2, 0, 1]
-        shuffled_answer = add_positions.copy()
-
-    def test_get_saved_insert_position_r1(self):
-        read_data = ('1', 100, '2', 100)
-        r1pos_answer = 100
-        self.assertEqual(self.vs_builder.get_saved_insert_position('1', read_data), r1pos_answer,
-                         f"The R1 read insert position should have been {r1pos_answer}")
-
-    def test_get_saved_insert_position_r2(self):
-        read_data = ('1', 100, '2', 150)
-        r2pos_answer = 150
-        self.assertEqual(self.vs_builder.get_saved_insert_position('2', read_data), r2pos_answer,
-                         f"The R2 read insert position should have been {r2pos_answer}")
-
-    def test_get_saved_insert_position_nor1(self):
-        read_data = ('2', 150)
-        r1pos_answer = 'NA'
-        self.assertEqual(self.vs_builder.get_saved_insert_position('1', read_data), r1pos_answer,
-                         "The R1 read insert position should have been NA")
-
-    def test_get_saved_insert_position_nor2(self):
-        read_data = ('1', 100)
-        r2pos_answer = 'NA'
-        self.assertEqual(self.vs_builder.get_saved_insert_position('2', read_data), r2pos_answer,
-                         "The R2 read insert position should have been NA")
-
     # Adds a donor insert data position for a new fastq
     def test_add_donor_insert_data_addnewfq(self):
         donor_add_data = {}
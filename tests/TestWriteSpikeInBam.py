@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pysam
+
+from vasebuilder import VaSeBuilder
+
+
+class TestWriteSpikeInBam(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.bam_header = {"HD": {"VN": "1.6"},
+                           "SQ": [{"SN": "21", "LN": 10000}, {"SN": "22", "LN": 10000}]}
+        # Read name, reference index, position and whether the read is reverse, in no order
+        self.read_data = [("sRead1", 1, 400, False), ("sRead2", -1, -1, False),
+                          ("sRead3", 0, 700, True), ("sRead4", 0, 700, False),
+                          ("sRead5", 1, 20, True), ("sRead6", 0, 30, False),
+                          ("sRead7", -1, -1, False), ("sRead8", 0, 699, True)]
+        self.unsorted_bam = os.path.join(self.tmpdir.name, "unsorted.bam")
+        with pysam.AlignmentFile(self.unsorted_bam, "wb", header=self.bam_header) as bamfile:
+            for read_name, read_tid, read_pos, is_reverse in self.read_data:
+                bamread = pysam.AlignedSegment()
+                bamread.query_name = read_name
+                bamread.flag = 4 if read_tid < 0 else 16 if is_reverse else 0
+                bamread.reference_id = read_tid
+                bamread.reference_start = read_pos
+                bamread.query_sequence = "ACGTA"
+                if read_tid >= 0:
+                    bamread.cigarstring = "5M"
+                bamfile.write(bamread)
+        self.samtools_bam = os.path.join(self.tmpdir.name, "reference.bam")
+        pysam.sort("-o", self.samtools_bam, self.unsorted_bam, catch_stdout=False)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read_bam(self, bam_path):
+        with pysam.AlignmentFile(bam_path, "rb", check_sq=False) as bamfile:
+            return [(x.query_name, x.flag, x.reference_id, x.reference_start)
+                    for x in bamfile.fetch(until_eof=True)]
+
+    def write_spike_in_bam(self, out_name):
+        with pysam.AlignmentFile(self.unsorted_bam, "rb") as bamfile:
+            reads = list(bamfile.fetch(until_eof=True))
+        out_path = os.path.join(self.tmpdir.name, f"{out_name}.bam")
+        VaSeBuilder.write_spike_in_bam(self.bam_header, reads, out_path)
+        return f"{out_path[:-4]}.sorted.bam"
+
+    # Tests that reads sorted in memory are written in the same order as samtools sort writes them
+    def test_write_spike_in_bam_in_memory(self):
+        sorted_bam = self.write_spike_in_bam("memory")
+        self.assertListEqual(self.read_bam(sorted_bam), self.read_bam(self.samtools_bam),
+                             "The reads should have been sorted as by samtools sort")
+        self.assertFalse(os.path.isfile(os.path.join(self.tmpdir.name, "memory.bam")),
+                         "No unsorted BAM file should have been written")
+        self.assertTrue(os.path.isfile(f"{sorted_bam}.bai"),
+                        "The sorted BAM file should have been indexed")
+
+    # Tests that above the in-memory read limit the reads are sorted with samtools sort instead
+    def test_write_spike_in_bam_samtools(self):
+        with mock.patch.object(VaSeBuilder, "IN_MEMORY_SORT_MAX_READS", len(self.read_data) - 1):
+            sorted_bam = self.write_spike_in_bam("limited")
+        self.assertListEqual(self.read_bam(sorted_bam), self.read_bam(self.samtools_bam),
+                             "The reads should have been sorted as by samtools sort")
+        self.assertFalse(os.path.isfile(os.path.join(self.tmpdir.name, "limited.bam")),
+                         "The unsorted BAM file should have been removed")
+        self.assertTrue(os.path.isfile(f"{sorted_bam}.bai"),
+                        "The sorted BAM file should have been indexed")
+
+    # Tests that the sorted BAM file is not indexed if no index is requested
+    def test_write_spike_in_bam_no_index(self):
+        out_path = os.path.join(self.tmpdir.name, "run.bam")
+        with pysam.AlignmentFile(self.unsorted_bam, "rb") as bamfile:
+            VaSeBuilder.write_spike_in_bam(self.bam_header, list(bamfile.fetch(until_eof=True)),
+                                           out_path, compress=False, index=False)
+        self.assertListEqual(self.read_bam(f"{out_path[:-4]}.sorted.bam"),
+                             self.read_bam(self.samtools_bam),
+                             "The reads should have been sorted as by samtools sort")
+        self.assertFalse(os.path.isfile(f"{out_path[:-4]}.sorted.bam.bai"),
+                         "The sorted BAM file should not have been indexed")
@@ -0,0 +1,61 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+import pysam
+
+from vasebuilder import VaSeBuilder
+
+
+class TestWriteSpikeInFastqs(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        bam_header = pysam.AlignmentHeader.from_dict({"SQ": [{"SN": "21", "LN": 10000}]})
+        # Read name, is read 1, is reverse, position, sequence, qualities
+        donor_reads = [("dRead2", True, False, 100, "ACGTN", [30, 31, 32, 33, 34]),
+                       ("dRead1", False, True, 200, "AACCG", [10, 20, 30, 40, 41]),
+                       ("dRead1", True, False, 300, "TTTTT", [40, 40, 40, 40, 40]),
+                       ("dRead2", False, True, 400, "acgtn", [2, 3, 4, 5, 6])]
+        self.donor_reads = []
+        for read_name, is_read1, is_reverse, read_pos, read_seq, read_quals in donor_reads:
+            bamread = pysam.AlignedSegment(bam_header)
+            bamread.query_name = read_name
+            bamread.flag = 1 + (64 if is_read1 else 128) + (16 if is_reverse else 0)
+            bamread.reference_id = 0
+            bamread.reference_start = read_pos
+            bamread.cigarstring = f"{len(read_seq)}M"
+            bamread.query_sequence = read_seq
+            bamread.query_qualities = pysam.qualitystring_to_array(
+                "".join([chr(x + 33) for x in read_quals]))
+            self.donor_reads.append(bamread)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    # Tests that mates are written to R1 and R2 by name, as they were sequenced
+    def test_write_spike_in_fastqs(self):
+        out_path = os.path.join(self.tmpdir.name, "VaSe_21_100.bam")
+        fastq_paths = VaSeBuilder.write_spike_in_fastqs(self.donor_reads, out_path)
+        self.assertTupleEqual(fastq_paths, (f"{out_path[:-4]}_R1.fastq.gz",
+                                            f"{out_path[:-4]}_R2.fastq.gz"),
+                              "The FastQ files should have been named after the BAM file")
+        with gzip.open(fastq_paths[0], "rt") as fastq_r1:
+            self.assertEqual(fastq_r1.read(),
+                             "@dRead1\nTTTTT\n+\nIIIII\n@dRead2\nACGTN\n+\n?@ABC\n",
+                             "R1 reads should have been written by name")
+        with gzip.open(fastq_paths[1], "rt") as fastq_r2:
+            self.assertEqual(fastq_r2.read(),
+                             "@dRead1\nCGGTT\n+\nJI?5+\n@dRead2\nNACGT\n+\n'&%$#\n",
+                             "Reverse strand reads should have been reverse complemented")
+
+    # Tests that duplicate reads are written once and reads without their mate are left out
+    def test_write_spike_in_fastqs_unpaired(self):
+        out_path = os.path.join(self.tmpdir.name, "VaSe_21_100.bam")
+        with self.assertLogs("VaSe_Logger", "WARNING"):
+            fastq_paths = VaSeBuilder.write_spike_in_fastqs(
+                self.donor_reads[:3] + self.donor_reads[1:3], out_path)
+        for fastq_path in fastq_paths:
+            with gzip.open(fastq_path, "rt") as fastq_file:
+                self.assertListEqual(fastq_file.read().split("\n")[::4], ["@dRead1", ""],
+                                     "Only the dRead1 pair should have been written, once")
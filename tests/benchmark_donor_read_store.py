@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""Compare list scanning with the DonorReadStore for linking donor reads.
+
+Usage: PYTHONPATH=.. python benchmark_donor_read_store.py [num_of_read_pairs] [num_of_lanes]
+"""
+import sys
+import time
+
+from donor_read_store import DonorReadStore
+from vasebuilder import VaSeBuilder
+
+
+def make_donor_reads(num_of_pairs):
+    """Return synthetic donor read pairs as string tuples."""
+    donor_reads = []
+    for pair_index in range(num_of_pairs):
+        read_id = f"donor_read_{pair_index:08d}"
+        donor_reads.append((read_id, "1", "ACGT" * 25, "I" * 100))
+        donor_reads.append((read_id, "2", "TGCA" * 25, "I" * 100))
+    return donor_reads
+
+
+def list_scan(donor_reads, num_of_lanes):
+    """Select lane reads and link them to positions by scanning lists."""
+    donor_read_ids = sorted(set([x[0] for x in donor_reads]))
+    for lane_ids in VaSeBuilder.divide_donorfastqs_over_acceptors(donor_read_ids, num_of_lanes):
+        lane_reads = [x for x in donor_reads if x[0] in lane_ids]
+        add_posread_link = {}
+        for addpos, dread_id in enumerate(lane_ids):
+            add_posread_link[addpos] = [x for x in lane_reads if x[0] == dread_id]
+
+
+def store_lookup(donor_reads, num_of_lanes):
+    """Select lane reads and link them to positions using a DonorReadStore."""
+    donor_store = DonorReadStore(donor_reads)
+    donor_read_ids = donor_store.get_read_ids()
+    for lane_ids in VaSeBuilder.divide_donorfastqs_over_acceptors(donor_read_ids, num_of_lanes):
+        VaSeBuilder.link_donor_addpos_reads_v2(range(len(lane_ids)), lane_ids,
+                                               donor_store.subset(lane_ids))
+
+
+def time_run(bench_function, donor_reads, num_of_lanes):
+    """Return the run time of a benchmark function in seconds."""
+    starttime = time.perf_counter()
+    bench_function(donor_reads, num_of_lanes)
+    return time.perf_counter() - starttime
+
+
+def main():
+    num_of_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    num_of_lanes = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    donor_reads = make_donor_reads(num_of_pairs)
+    print(f"{num_of_pairs} donor read pairs over {num_of_lanes} lanes")
+    print(f"List scan: {time_run(list_scan, donor_reads, num_of_lanes):.3f} seconds")
+    print(f"DonorReadStore: {time_run(store_lookup, donor_reads, num_of_lanes):.3f} seconds")
+
+
+if __name__ == "__main__":
+    main()
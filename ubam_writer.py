@@ -0,0 +1,121 @@
+"""UbamWriter object class.
+
+Validation sets can be written as unaligned BAM (uBAM) files instead of
+FastQ files, for pipelines that start from unaligned BAM. Tools such as
+Picard and GATK expect both reads of a pair in the same uBAM file, so each
+lane is written to a single uBAM file with the R1 and R2 reads interleaved.
+The UbamWriter takes the same template and donor read records as the
+FastqWriter and writes them as unmapped, paired BAM records with a read
+group tag into a BGZF compressed BAM file.
+"""
+
+from array import array
+
+import pysam
+
+
+class UbamWriter:
+    """Writer of interleaved template and donor reads to an unaligned BAM file.
+
+    Attributes
+    ----------
+    outpath : str
+        Path to the unaligned BAM file
+    read_group : dict
+        Read group header line of the written reads
+    num_of_records : int
+        Number of written reads
+    """
+
+    PAIR_FLAGS = {"1": 77, "2": 141}
+    # Translation table from Phred+33 quality characters to quality scores.
+    PHRED_SCORE_TABLE = bytes((x - 33) % 256 for x in range(256))
+
+    def __init__(self, outpath, read_group, threads=1):
+        """Open the unaligned BAM file and write its header.
+
+        Parameters
+        ----------
+        outpath : str
+            Path to write the unaligned BAM file to
+        read_group : dict
+            Read group header line, with at least an ID
+        threads : int
+            Number of BGZF compression threads
+        """
+        self.outpath = outpath
+        self.read_group = read_group
+        self.num_of_records = 0
+        self.num_of_templates = 0
+        self.bamfile = pysam.AlignmentFile(
+            outpath, "wb", threads=threads,
+            header={"HD": {"VN": "1.6", "SO": "unsorted"},
+                    "RG": [read_group],
+                    "PG": [{"ID": "VaSeBuilder", "PN": "VaSeBuilder"}]}
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write_template(self, header_line, record_lines):
+        """Write a template read, flagged as R1 and R2 alternately.
+
+        Parameters
+        ----------
+        header_line : bytes
+            Read header line, starting with '@'
+        record_lines : bytes
+            Remaining three lines of the record
+        """
+        read_name = header_line[1:].split(None, 1)[0]
+        if read_name[-2:] in (b"/1", b"/2"):
+            read_name = read_name[:-2]
+        sequence, _, qualities, _ = record_lines.split(b"\n", 3)
+        self.write_read(read_name.decode(),
+                        self.PAIR_FLAGS["1" if self.num_of_templates % 2 == 0 else "2"],
+                        sequence.decode(), qualities)
+        self.num_of_templates += 1
+
+    def write_donor_read(self, donorread):
+        """Write a donor read, flagged as its pair number.
+
+        Parameters
+        ----------
+        donorread : tuple of str
+            Read identifier, pair number, sequence and qualities
+        """
+        self.write_read(donorread[0], self.PAIR_FLAGS[donorread[1]], donorread[2],
+                        donorread[3].encode())
+
+    def write_read(self, read_name, read_flag, sequence, qualities):
+        """Write a single read as an unmapped BAM record.
+
+        Parameters
+        ----------
+        read_name : str
+            Read name without /1 or /2 suffix
+        read_flag : int
+            SAM flag of the read
+        sequence : str
+            Read sequence
+        qualities : bytes
+            Phred+33 base qualities
+        """
+        ubam_read = pysam.AlignedSegment(self.bamfile.header)
+        ubam_read.query_name = read_name
+        ubam_read.flag = read_flag
+        ubam_read.query_sequence = sequence
+        ubam_read.query_qualities = array("B", qualities.translate(self.PHRED_SCORE_TABLE))
+        ubam_read.set_tag("RG", self.read_group["ID"], "Z")
+        self.bamfile.write(ubam_read)
+        self.num_of_records += 1
+
+    def flush(self):
+        """Do nothing, records are compressed as BGZF blocks fill up."""
+
+    def close(self):
+        """Close the unaligned BAM file."""
+        self.bamfile.close()
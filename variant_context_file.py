@@ -53,6 +53,8 @@ class VariantContextFile:
         self.template_alignment_file = ""
         self.contributing_alignment_files = []
         self.contributing_variant_files = []
+        # Whether filters were applied while reading variant contexts from file.
+        self.variant_context_file_filtered = False
 
         # Check whether to read a provided variant context file with set optional parameters
         if fileloc is not None:
@@ -83,11 +85,10 @@ class VariantContextFile:
         dict
 
         """
-        varcons = self.get_variant_contexts()
-        return {x.get_variant_context_sample(): [
-            y for y in varcons
-            if y.get_variant_context_sample() == x.get_variant_context_sample()
-            ] for x in varcons}
+        varcons_per_sample = {}
+        for varcon in self.variant_contexts.values():
+            varcons_per_sample.setdefault(varcon.get_variant_context_sample(), []).append(varcon)
+        return varcons_per_sample
 
     def get_number_of_contexts(self):
         """Count variant contexts.
@@ -369,6 +370,8 @@ class VariantContextFile:
             sys.exit()
         varcon_records = [x.strip().split("\t")
                           for x in varcon_records if not x.startswith("#")]
+        if samplefilter is not None or idfilter is not None or chromfilter is not None:
+            self.variant_context_file_filtered = True
 
         for record in varcon_records:
             if record[0] in self.variant_contexts:
@@ -7,6 +7,7 @@ command line options, switch modes, etc.
 
 # Import necessary standard modules.
 import logging
+import os
 import sys
 import subprocess
 import uuid
@@ -21,6 +22,8 @@ from sample_mapper import SampleMapper
 from vasebuilder import VaSeBuilder
 from variant_context_file import VariantContextFile
 from inclusion_filter import InclusionFilter
+from spike_in_library_index import SpikeInLibraryIndex
+from spike_in_cache import SpikeInCache
 
 
 class VaSe:
@@ -73,7 +76,7 @@ class VaSe:
         # Initialize the logger.
         self.vaselogger = self.start_logger(self.args.log, self.args.debug)
         # Initialize a VaSeBuilder instance with an ID number.
-        self.vase_b = VaSeBuilder(uuid.uuid4().hex)
+        self.vase_b = VaSeBuilder(uuid.uuid4().hex, self.args.threads)
 
     def main(self):
         """Run selected VaSeBuilder methods."""
@@ -133,6 +136,22 @@ class VaSe:
 
         return vaselogger
 
+    @staticmethod
+    def get_acceptor_lanes(acceptor_fqs):
+        """Return the acceptor FastQ files of all repeated -1 or -2 options.
+
+        Parameters
+        ----------
+        acceptor_fqs : list of list of str
+            Acceptor FastQ files per repeated -1 or -2 option
+
+        Returns
+        -------
+        list of str
+            Acceptor FastQ files, used as the lanes of a single acceptor
+        """
+        return [x for y in acceptor_fqs for x in y]
+
     def buildspikeins(self):
         """Run BuildSpikeIns tool.
 
@@ -163,13 +182,22 @@ class VaSe:
                 self.args.prioritization
                 )
 
+        # Keep variant contexts and P-mode spike-ins in a cache directory shared between runs.
+        if self.args.cache_dir is not None:
+            self.vase_b.spike_in_cache = SpikeInCache(self.args.cache_dir,
+                                                      self.args.cache_size * 1024**2)
+
         # Read pre-existing variant context file, if provided.
         if self.args.varcons_in:
             # TODO: Make a way to automate multiple varcon combining here.
             # Use VaSeUtils.MergeVarcons.py?
             varconfile = VariantContextFile(self.args.varcons_in)
-            # Refetch reads and variants.
-            self.vase_b.rebuild(sample_list, varconfile, self.args.reference)
+            # Refetch reads and variants, except for variant contexts with cached spike-ins.
+            rebuild_varconfile = varconfile
+            if self.args.output_mode == "P" and self.vase_b.spike_in_cache is not None:
+                rebuild_varconfile = self.vase_b.get_uncached_variant_contexts(sample_list,
+                                                                               varconfile)
+            self.vase_b.rebuild(sample_list, rebuild_varconfile, self.args.reference)
 
         # Establish variant contexts if none provided.
         else:
@@ -188,16 +216,32 @@ class VaSe:
         if self.args.output_mode == "V":
             return
 
+        # Check that the headers of all donors with contexts can be merged before writing.
+        if (self.args.output_mode in ("A", "L")
+                and not self.vase_b.check_donor_header_compatibility(sample_list, varconfile)):
+            self.vaselogger.critical("Donor BAM files have different reference sequences. "
+                                     "Stopping.")
+            return
+        self.vase_b.compress_vcf = self.args.compress_vcf
+        self.vase_b.spike_in_type = self.args.output_type
+
         # Write all outputs to a single BAM and single VCF file.
         if self.args.output_mode == "A":
             self.vaselogger.info("Making one combined spike-in for all contexts.")
             self.vase_b.run_a_mode_v3(sample_list, varconfile, self.args.out_dir)
 
-        # NOT IMPLEMENTED.
+        # Write all outputs of each sample to its own BAM and VCF file.
         elif self.args.output_mode == "D":
-            return
-        #    self.vaselogger.info("Making combined spike-ins per sample.")
-        #     # TODO: Make a method in between A and P that combines each SAMPLE.
+            self.vaselogger.info("Making combined spike-ins per sample.")
+            self.vase_b.run_d_mode_v3(sample_list, varconfile, self.args.out_dir)
+
+        # Write all outputs to a single indexed spike-in library.
+        elif self.args.output_mode == "L":
+            self.vaselogger.info("Making a spike-in library of all contexts.")
+            if self.args.output_type != "B":
+                self.vaselogger.warning("The spike-in library is always written as a BAM file; "
+                                        "ignoring the output type.")
+            self.vase_b.run_l_mode_v3(sample_list, varconfile, self.args.out_dir)
 
         # Write each output to its own BAM and VCF file.
         elif self.args.output_mode == "P":
@@ -216,22 +260,58 @@ class VaSe:
         varconfile = VariantContextFile(self.args.varcons_in)
 
         # Write new FastQ files with donor reads added and acceptors removed.
+        self.vase_b.split_templates = self.args.split_templates
+        self.vase_b.max_donor_memory = self.args.max_donor_memory
+        self.vase_b.output_format = self.args.output_format
+        self.vase_b.interleaved = self.args.interleaved
+        self.vase_b.num_of_shards = self.args.num_of_shards
+        self.vase_b.shard_size = self.args.shard_size
+        if self.args.downsample_fractions is not None:
+            self.vase_b.downsample_fractions = list(dict.fromkeys(self.args.downsample_fractions))
+        self.vase_b.downsample_seed = self.args.seed
+        # Lanes given with repeated -1/-2 options are used as a single acceptor.
+        acceptor_fq_1s = self.get_acceptor_lanes(self.args.acceptor_fq_1s)
+        acceptor_fq_2s = self.get_acceptor_lanes(self.args.acceptor_fq_2s)
+        # Donor reads are from selected variant contexts of a spike-in library.
+        if self.args.spike_in_library:
+            library_index = SpikeInLibraryIndex.read(
+                SpikeInLibraryIndex.get_index_path(self.args.spike_in_library)
+                )
+            if self.args.library_contexts or self.args.library_regions:
+                library_contexts = library_index.select_contexts(self.args.library_contexts,
+                                                                 self.args.library_regions)
+                varconfile = VariantContextFile(self.args.varcons_in,
+                                                varconfilter=set(library_contexts))
+            library_contexts = [x for x in varconfile.get_variant_context_ids()
+                                if x in library_index]
+            self.vaselogger.info(f"Taking {len(library_contexts)} variant contexts from spike-in "
+                                 f"library {self.args.spike_in_library}")
+            self.vase_b.run_ab_mode_v2(varconfile,
+                                       acceptor_fq_1s,
+                                       acceptor_fq_2s,
+                                       [self.args.spike_in_library],
+                                       self.args.seed,
+                                       self.args.out_dir + self.args.fastq_out,
+                                       self.args.exact_skip,
+                                       library_contexts)
         # Donor reads are from BAM files.
-        if self.args.spike_in_bams:
+        elif self.args.spike_in_bams:
             self.vase_b.run_ab_mode_v2(varconfile,
-                                       self.args.acceptor_fq_1s,
-                                       self.args.acceptor_fq_2s,
+                                       acceptor_fq_1s,
+                                       acceptor_fq_2s,
                                        self.args.spike_in_bams,
                                        self.args.seed,
-                                       self.args.out_dir + self.args.fastq_out)
+                                       self.args.out_dir + self.args.fastq_out,
+                                       self.args.exact_skip)
         # Donor reads are from FastQ files.
         elif self.args.spike_in_fastqs:
-            self.vase_b.run_ac_mode_v2(self.args.acceptor_fq_1s,
-                                       self.args.acceptor_fq_2s,
+            self.vase_b.run_ac_mode_v2(acceptor_fq_1s,
+                                       acceptor_fq_2s,
                                        self.args.spike_in_fastqs,
                                        varconfile,
                                        self.args.seed,
-                                       self.args.out_dir + self.args.fastq_out)
+                                       self.args.out_dir + self.args.fastq_out,
+                                       self.args.exact_skip)
 
     def buildvalidationset(self):
         """Run BuildValidationSet tool.
@@ -253,20 +333,74 @@ class VaSe:
                 self.args.prioritization
                 )
 
+        # Write new FastQ files with donor reads added and acceptors removed.
+        self.vase_b.split_templates = self.args.split_templates
+        self.vase_b.output_format = self.args.output_format
+        self.vase_b.interleaved = self.args.interleaved
+        self.vase_b.num_of_shards = self.args.num_of_shards
+        self.vase_b.shard_size = self.args.shard_size
+        if self.args.downsample_fractions is not None:
+            self.vase_b.downsample_fractions = list(dict.fromkeys(self.args.downsample_fractions))
+        self.vase_b.downsample_seed = self.args.seed
+
+        # Build several acceptors from the same donor contexts.
+        if len(self.args.acceptor_bam) > 1:
+            if not (len(self.args.acceptor_bam) == len(self.args.acceptor_fq_1s)
+                    == len(self.args.acceptor_fq_2s)):
+                self.vaselogger.critical("Each acceptor BAM requires its own -1 and -2 "
+                                         "acceptor FastQ files.")
+                sys.exit()
+            acceptor_names = [os.path.basename(x).split(".")[0] for x in self.args.acceptor_bam]
+            if len(set(acceptor_names)) < len(acceptor_names):
+                acceptor_names = [f"{x}_{y + 1}" for y, x in enumerate(acceptor_names)]
+            self.vase_b.run_multi_acceptor_f_mode(
+                sample_list,
+                list(zip(acceptor_names, self.args.acceptor_bam,
+                         self.args.acceptor_fq_1s, self.args.acceptor_fq_2s)),
+                self.args.out_dir,
+                self.args.reference,
+                self.args.varcon_out,
+                variantfilter,
+                self.args.merge,
+                self.args.out_dir + self.args.fastq_out,
+                self.args.seed,
+                self.args.exact_skip
+                )
+            return
+
         # Establish variant contexts.
         varconfile = self.vase_b.bvcs(sample_list,
-                                      self.args.acceptor_bam,
+                                      self.args.acceptor_bam[0],
                                       self.args.out_dir,
                                       self.args.reference,
                                       self.args.varcon_out,
                                       variantfilter,
                                       self.args.merge)
-        # Write new FastQ files with donor reads added and acceptors removed.
         self.vase_b.run_f_mode(varconfile,
-                               self.args.acceptor_fq_1s,
-                               self.args.acceptor_fq_2s,
+                               self.get_acceptor_lanes(self.args.acceptor_fq_1s),
+                               self.get_acceptor_lanes(self.args.acceptor_fq_2s),
                                self.args.out_dir + self.args.fastq_out,
-                               self.args.seed)
+                               self.args.seed,
+                               self.args.exact_skip)
+
+    def indextemplate(self):
+        """Run IndexTemplate tool.
+
+        Will write a .vfqi index sidecar next to each provided acceptor FastQ
+        file, with the number of reads and the offsets of every Nth read.
+        """
+        self.vase_b.index_templates(self.args.fastqs, self.args.interval, self.args.verify)
+
+    def queryinsertpositions(self):
+        """Run QueryInsertPositions tool.
+
+        Will write the insert positions of the selected spike-in reads and
+        validation FastQ files from a donor read insert position log.
+        """
+        self.vase_b.query_insert_positions(self.args.insert_log,
+                                           self.args.query_out,
+                                           self.args.read_ids,
+                                           self.args.fastqs)
 
     # TODO: Different 'dest' values make this hard to implement now. Try to think
     # of a way to store raw commands maybe.
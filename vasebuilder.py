@@ -2,13 +2,21 @@
 """Main VaSeBuilder module."""
 import sys
 import io
+import copy
 import time
-import random
 import logging
+import multiprocessing
 import gzip
 import os
+import shutil
+import tempfile
+import glob
+import heapq
+from collections import deque
 from datetime import datetime
-from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import groupby, repeat, zip_longest
 
 import numpy as np
 import pysam
@@ -18,6 +26,21 @@ from sample_mapper import SampleMapper
 from variant_context_file import VariantContextFile
 from variant_context import VariantContext
 from overlap_context import OverlapContext
+from acceptor_skip_set import AcceptorSkipSet
+from donor_read_store import DonorReadStore
+from donor_insert_queue import DonorInsertQueue
+from bgzf_template import BgzfTemplate
+from template_index import TemplateIndex
+from disk_donor_store import DiskDonorStore
+from placement_engine import PlacementEngine
+from insert_position_log import InsertPositionLog
+from fastq_writer import FastqWriter
+from ubam_writer import UbamWriter
+from fastq_shard_writer import FastqShardWriter
+from downsample_writer import DownsampleWriter
+from spike_in_library_index import SpikeInLibraryIndex
+from spike_in_cache import SpikeInCache
+from donor_header_cache import DonorHeaderCache
 
 
 class VaSeBuilder:
@@ -33,12 +56,59 @@ class VaSeBuilder:
         The date and time of creation to identify VaSeBuilder runs
     vaselogger : Logger
         VaSeBuilder logger to log VaSeBuilder activity
+    threads : int
+        Number of worker processes to use for steps that run in parallel
+    split_templates : bool
+        Split BGZF template fastq files into chunks that are rewritten in
+        parallel
+    max_donor_memory : int or None
+        Keep donor reads in an on-disk store using at most this many MB of
+        cache, or in memory if None
+    output_format : str
+        Write the validation set as 'fastq' files or as unaligned BAM
+        ('ubam') files, which are always interleaved
     """
 
-    def __init__(self, vaseid):
+    # Translation tables to reverse complement sequences and to convert Phred
+    # scores to Phred+33 quality characters.
+    COMPLEMENT_TABLE = str.maketrans("acgtnACGTN", "tgcanTGCAN")
+    PHRED33_TABLE = bytes((x + 33) % 256 for x in range(256))
+
+    # Donor contexts shared with forked acceptor workers, see set_shared_donor_pass.
+    shared_donor_pass = None
+    # Spike-ins shared with forked P-mode and D-mode workers, see set_shared_spike_ins.
+    shared_spike_ins = None
+
+    # Spike-in BAM files with more reads than this are sorted by samtools instead of in memory.
+    IN_MEMORY_SORT_MAX_READS = 2000000
+    # BAM tag and VCF INFO field holding the variant context of spike-in library records.
+    LIBRARY_CONTEXT_TAG = "XC"
+    LIBRARY_CONTEXT_INFO = "VASE_CONTEXT"
+
+    def __init__(self, vaseid, threads=1, split_templates=False, max_donor_memory=None,
+                 output_format="fastq", interleaved=False, num_of_shards=None, shard_size=None,
+                 downsample_fractions=None, downsample_seed=2, compress_vcf=False,
+                 spike_in_cache=None, spike_in_type="B"):
         self.vaselogger = logging.getLogger("VaSe_Logger")
         self.creation_id = str(vaseid)
         self.creation_time = datetime.now()
+        self.threads = max(1, threads)
+        # BGZF compression threads per unaligned BAM writer, set per run of lane jobs.
+        self.writer_threads = self.threads
+        self.split_templates = split_templates
+        self.max_donor_memory = max_donor_memory
+        self.output_format = output_format
+        self.interleaved = interleaved
+        self.num_of_shards = num_of_shards
+        self.shard_size = shard_size
+        self.downsample_fractions = downsample_fractions
+        self.downsample_seed = downsample_seed
+        self.compress_vcf = compress_vcf
+        self.spike_in_cache = spike_in_cache
+        self.spike_in_type = spike_in_type
+        # Spike-in cache key of the contexts per acceptor, sample and variant.
+        self.context_cache_keys = {}
+        self.header_cache = DonorHeaderCache()
         self.vaselogger.info(f"VaSeBuilder: {self.creation_id} ; {self.creation_time}")
 
         # VariantContextFile that saves the acceptor, donor, and variant contexts
@@ -126,7 +196,8 @@ class VaSeBuilder:
         basic variant info, so the original full records must be retrieved
         from their original files before constructing spike-ins. Only variants
         matching those in the variant context file will be retrieved from each
-        sample. Variants retrieved will overwrite the placeholder filter
+        sample, with index queries at their positions if the variant file is
+        indexed. Variants retrieved will overwrite the placeholder filter
         variants located in the variant contexts read from file.
 
         Parameters
@@ -137,12 +208,60 @@ class VaSeBuilder:
         all_varcons = varconfile.get_variant_contexts_by_sampleid()
         for sample in samples:
             sample_varcons = all_varcons[sample.hash_id]
-            for sample_varcon in sample_varcons:
-                varcon_variants = self.get_sample_vcf_variants_2(sample.vcf, sample_varcon.variants)
-                sample_varcon.variants = [var[0] for var in varcon_variants]
+            try:
+                variant_file = pysam.VariantFile(sample.vcf, "r")
+            except IOError:
+                self.vaselogger.warning(f"Could not open variant file {sample.vcf}")
+                for sample_varcon in sample_varcons:
+                    sample_varcon.variants = []
+                continue
+            with variant_file:
+                for sample_varcon in sample_varcons:
+                    if variant_file.index is None:
+                        varcon_variants = self.get_sample_vcf_variants_2(sample.vcf,
+                                                                         sample_varcon.variants)
+                    else:
+                        varcon_variants = self.fetch_listed_vcf_variants(variant_file,
+                                                                         sample_varcon.variants)
+                    sample_varcon.variants = [var[0] for var in varcon_variants]
+
+    def fetch_listed_vcf_variants(self, variant_file, filterlist):
+        """Fetch the variants of a filter list with index queries at their positions.
+
+        Parameters
+        ----------
+        variant_file : pysam.VariantFile
+            Opened and indexed variant file
+        filterlist : list of InclusionVariant objects
+            Variants to fetch
+
+        Returns
+        -------
+        sample_variant_list : list of tuple
+            Fetched variants and their prioritization Filter objects, in
+            variant file order
+        """
+        contig_order = {x: y for y, x in enumerate(variant_file.header.contigs)}
+        variant_positions = sorted({(x.chrom, x.pos) for x in filterlist},
+                                   key=lambda x: (contig_order.get(x[0], len(contig_order)),
+                                                  x[0], x[1]))
+        sample_variant_list = []
+        for variant_chrom, variant_pos in variant_positions:
+            try:
+                vcfvars = variant_file.fetch(variant_chrom, variant_pos - 1, variant_pos)
+            except ValueError:
+                # The contig is not in the variant file.
+                continue
+            for var in vcfvars:
+                if var.pos != variant_pos:
+                    continue
+                variant_to_add = self.filter_vcf_variant(var, filterlist)
+                if variant_to_add is not None:
+                    sample_variant_list.append(variant_to_add)
+        return sample_variant_list
 
     def rebuild(self, samples, varconfile, reference):
-        """Refetch reads and variants for variant contexts."""
+        """Refetch the listed donor reads and variants for variant contexts."""
         all_varcons = varconfile.get_variant_contexts_by_sampleid()
         viables = [sample for sample in samples
                    if sample.hash_id in all_varcons]
@@ -270,13 +389,15 @@ class VaSeBuilder:
         )
         return [searchstart, searchstop]
 
-    def get_variant_reads(self, variantchrom, variantstart, variantend, bamfile):
+    def get_variant_reads(self, variantchrom, variantstart, variantend, bamfile, read_ids=None):
         """Fetch and return reads overlapping with a specified variant.
 
         First reads overlapping directly with the variant position are
         fetched. Then the read mates are fetched using the RNEXT and PNEXT
         values of each read. Lastly, it is ensured that each read only
-        occurs once.
+        occurs once. If read identifiers are provided, other reads are
+        skipped while fetching, so only mates of the listed reads outside
+        the window are fetched.
 
         Parameters
         ----------
@@ -292,6 +413,8 @@ class VaSeBuilder:
             Already opened pysam AlignmentFile
         umatelist : list of str
             Identifiers of reads with an unmapped mate
+        read_ids : set of str
+            Identifiers of the reads to fetch, all reads if None
 
         Returns
         -------
@@ -309,6 +432,8 @@ class VaSeBuilder:
         list_r2 = []
 
         for vread in bamfile.fetch(variantchrom, variantstart-1, variantend+1):
+            if read_ids is not None and vread.query_name not in read_ids:
+                continue
             if vread.is_duplicate:
                 duplicate_read_num += 1
             if vread.is_secondary:
@@ -329,8 +454,8 @@ class VaSeBuilder:
             elif vread.is_read2:
                 list_r2.append(vread)
 
-        list_r1_ids = [x.query_name for x in list_r1]
-        list_r2_ids = [x.query_name for x in list_r2]
+        list_r1_ids = {x.query_name for x in list_r1}
+        list_r2_ids = {x.query_name for x in list_r2}
 
         for r1 in list_r1:
             if r1.query_name not in list_r2_ids:
@@ -395,7 +520,7 @@ class VaSeBuilder:
             Set of reads with each read occurring only once
         """
         unique_variantreads = []
-        checklist = []
+        checklist = set()
         for fetched in variantreads:
             readpn = "2"
             if fetched.is_read1:
@@ -403,7 +528,7 @@ class VaSeBuilder:
             id_pair = (fetched.query_name, readpn)
             if id_pair not in checklist:
                 unique_variantreads.append(fetched)
-                checklist.append(id_pair)
+                checklist.add(id_pair)
         return unique_variantreads
 
     def fetch_mate_read(self, readid, rnext, pnext, pair_num, bamfile):
@@ -607,10 +732,12 @@ class VaSeBuilder:
             return bamread.is_read1
         return bamread.is_read2
 
-    @staticmethod
-    def set_fastq_out_path(outpath, fr, lnum):
+    def set_fastq_out_path(self, outpath, fr, lnum):
         """Set and return the fastq output path and filename.
 
+        Unaligned BAM validation files get a .bam instead of a .fastq
+        extension.
+
         Parameters
         ----------
         outpath : str
@@ -626,8 +753,152 @@ class VaSeBuilder:
             Full path to write fastq file to
         """
         if fr == "1":
-            return f"{outpath}_{datetime.now().date()}_L{lnum}_R1.fastq"
-        return f"{outpath}_{datetime.now().date()}_L{lnum}_R2.fastq"
+            return f"{outpath}_{datetime.now().date()}_L{lnum}_R1.{self.get_validation_extension()}"
+        return f"{outpath}_{datetime.now().date()}_L{lnum}_R2.{self.get_validation_extension()}"
+
+    def get_validation_extension(self):
+        """Return the file extension of the validation files.
+
+        Returns
+        -------
+        str
+            'bam' for unaligned BAM output, 'fastq' otherwise
+        """
+        if self.output_format == "ubam":
+            return "bam"
+        return "fastq"
+
+    def get_interleaved_out_path(self, r1_outpath):
+        """Return the interleaved validation fastq path of a lane.
+
+        Parameters
+        ----------
+        r1_outpath : str
+            R1 validation fastq path of the lane, as set by set_fastq_out_path
+
+        Returns
+        -------
+        str
+            Lane validation fastq path without the read number
+        """
+        return f"{os.path.splitext(r1_outpath)[0][:-3]}.{self.get_validation_extension()}"
+
+    def is_interleaved(self):
+        """Return whether the R1 and R2 reads of a lane are written to a single file.
+
+        Unaligned BAM output is always interleaved, as both reads of a pair
+        have to be in the same unaligned BAM file.
+
+        Returns
+        -------
+        bool
+            True if interleaving is enabled or the output format is 'ubam'
+        """
+        return self.interleaved or self.output_format == "ubam"
+
+    def is_sharded(self):
+        """Return whether the validation fastq files are split into shards.
+
+        Returns
+        -------
+        bool
+            True if a number of shards or a shard size is set
+        """
+        return self.num_of_shards is not None or self.shard_size is not None
+
+    def open_validation_output(self, outpath, forward_reverse):
+        """Open and return a validation file to write FastQ record lines to.
+
+        If downsampling is enabled, a DownsampleWriter is returned that writes
+        the records to a validation file per downsample fraction instead.
+
+        Parameters
+        ----------
+        outpath : str
+            Path to the validation fastq or unaligned BAM file
+        forward_reverse : str
+            Whether the file is R1 ('1') or R2 ('2'), None if interleaved
+
+        Returns
+        -------
+        FastqWriter, UbamWriter, FastqShardWriter or DownsampleWriter
+            Opened validation file
+        """
+        if self.downsample_fractions is not None:
+            return DownsampleWriter(outpath,
+                                    partial(self.open_validation_set,
+                                            forward_reverse=forward_reverse),
+                                    self.downsample_fractions, self.downsample_seed)
+        return self.open_validation_set(outpath, forward_reverse)
+
+    def open_validation_set(self, outpath, forward_reverse):
+        """Open and return a validation file of a single output set.
+
+        If sharding is enabled, a FastqShardWriter is returned that writes
+        the records to the shards of the validation file instead.
+
+        Parameters
+        ----------
+        outpath : str
+            Path to the validation fastq or unaligned BAM file
+        forward_reverse : str
+            Whether the file is R1 ('1') or R2 ('2'), None if interleaved
+
+        Returns
+        -------
+        FastqWriter, UbamWriter or FastqShardWriter
+            Opened validation file
+        """
+        if self.is_sharded():
+            return FastqShardWriter(outpath,
+                                    partial(self.open_validation_file,
+                                            forward_reverse=forward_reverse),
+                                    self.num_of_shards, self.shard_size,
+                                    1 if forward_reverse is not None else 2)
+        return self.open_validation_file(outpath, forward_reverse)
+
+    def open_validation_file(self, outpath, forward_reverse):
+        """Open and return a single validation fastq or unaligned BAM file.
+
+        Parameters
+        ----------
+        outpath : str
+            Path to the validation fastq or unaligned BAM file
+        forward_reverse : str
+            Whether the file is R1 ('1') or R2 ('2'), None if interleaved
+
+        Returns
+        -------
+        FastqWriter or UbamWriter
+            Opened validation file
+        """
+        if self.output_format == "ubam":
+            output_name, lane = PlacementEngine.get_output_lane(outpath)
+            return UbamWriter(outpath, {"ID": f"{output_name}_L{lane}", "SM": output_name,
+                                        "PU": str(lane)}, self.writer_threads)
+        return FastqWriter(outpath)
+
+    @staticmethod
+    def get_output_position(outfile, cur_add_index):
+        """Return the position of the last written read in a validation file.
+
+        Parameters
+        ----------
+        outfile : FastqWriter, UbamWriter, FastqShardWriter or DownsampleWriter
+            Opened validation file
+        cur_add_index : int
+            Number of reads written without downsampling
+
+        Returns
+        -------
+        int or list of int
+            Position of the last written read, per downsampled set if
+            downsampling is enabled
+        """
+        if isinstance(outfile, DownsampleWriter):
+            return list(outfile.record_counts)
+        return cur_add_index
+
 
     # ===METHODS TO OBTAIN SOME DATA OF THE VASEBUILDER OBJECT=================
     def get_creation_id(self):
@@ -898,17 +1169,45 @@ class VaSeBuilder:
             cycler += 1
         return split_donors
 
+    def build_acceptor_skip_set(self, variant_context_file, exact=False):
+        """Build the compact set of acceptor read IDs to exclude from the template fastqs.
+
+        If the variant contexts were read unfiltered from a variant context
+        file, the acceptor read IDs are streamed from that file. Otherwise the
+        acceptor read IDs of the variant contexts in memory are used.
+
+        Parameters
+        ----------
+        variant_context_file : VariantContextFile
+            Variant contexts with the acceptor reads to exclude
+        exact : bool
+            Keep the read IDs to confirm hashed matches (Default: False)
+
+        Returns
+        -------
+        skip_set : AcceptorSkipSet
+            Acceptor read IDs to exclude
+        """
+        varcon_fileloc = variant_context_file.variant_context_file_location
+        if varcon_fileloc is not None and not variant_context_file.variant_context_file_filtered:
+            self.vaselogger.debug(f"Streaming acceptor read IDs to skip from {varcon_fileloc}")
+            skip_set = AcceptorSkipSet.from_varcon_file(varcon_fileloc, exact)
+        else:
+            skip_set = AcceptorSkipSet(
+                variant_context_file.get_all_variant_context_acceptor_read_ids(), exact
+                )
+        self.vaselogger.debug(f"Acceptor skip set contains {len(skip_set)} read IDs")
+        return skip_set
+
     # BUILDS A SET OF R1/R2 VALIDATION FASTQS WITH ALREADY EXISTING DONOR FASTQS
-    @classmethod
-    def make_bam_headers(cls, samples, variant_context_file):
+    def make_bam_headers(self, samples, variant_context_file):
         """Construct simple BAM headers for all samples.
 
-        Retrieves original BAM header information from the first read from the
-        first variant context (arbitrary selection) constructed for each
-        sample. If no variant context was created for a sample, it is skipped.
-        Headers are reduced to only necessary information, and sample IDs are
-        replaced with the hashed ID for each sample (if a hash was created).
-        Returns a dictionary of sample_ID: header pairs.
+        Headers are read once per donor BAM file and reduced to only
+        necessary information, and sample IDs are replaced with the hashed ID
+        for each sample (if a hash was created). Samples without a variant
+        context with donor reads are skipped. Returns a dictionary of
+        sample_ID: header pairs.
 
         Parameters
         ----------
@@ -917,37 +1216,71 @@ class VaSeBuilder:
 
         Returns
         -------
-        used_headers : list of OrderedDict objects
+        used_headers : dict of OrderedDict objects
         """
-        # Get all varcons per sample and all used donor BAM filenames.
         varcons_per_sample = variant_context_file.get_variant_contexts_by_sampleid()
-        # used_bams = variant_context_file.get_donor_alignment_files()
-        # Empty dict to store results.
         used_headers = {}
         for sample in samples:
             # Skip unused samples.
-            if sample.hash_id not in varcons_per_sample:
+            if not any(x.variant_context_dreads
+                       for x in varcons_per_sample.get(sample.hash_id, [])):
                 continue
-            # if sample.bam not in used_bams:
-                # continue
-            # Retrieve header from arbitrary read from this sample.
-            head = varcons_per_sample[sample.hash_id][0].variant_context_dreads[0].header.as_dict()
-            # Replace header sample and library fields with hash (if hashed).
-            if "RG" in head:
-                for i in range(len(head["RG"])):
-                    head["RG"][i]["SM"] = sample.hash_id
-                    head["RG"][i]["LB"] = sample.hash_id
-            # Keep only basic header information.
-            head = cls.select_bam_header_fields(head, ["HD", "SQ", "RG"])
-            used_headers[sample.hash_id] = head
+            try:
+                used_headers[sample.hash_id] = self.header_cache.get_sample_header(sample)
+            except IOError:
+                self.vaselogger.warning(f"Could not read the header of {sample.bam} ; Skipping "
+                                        f"sample {sample.hash_id}")
         return used_headers
 
+    def check_donor_header_compatibility(self, samples, variantcontextfile):
+        """Check that the donor BAM headers can be merged into one header.
+
+        Donor reads keep the reference sequence indices of their donor BAM
+        file, so all donor BAM files written to one spike-in BAM file need
+        the same SQ lines. Only the donor BAM files of samples with variant
+        contexts are written, so other samples are not checked. Unreadable
+        donor BAM files are left to be reported when their reads are fetched.
+
+        Parameters
+        ----------
+        samples : list of sample_mapper.Sample objects
+        variantcontextfile : VariantContextFile
+            Variant contexts to write to one spike-in BAM file
+
+        Returns
+        -------
+        bool
+            True if all readable donor BAM files of the samples with variant
+            contexts have the same SQ lines
+        """
+        context_sample_ids = {x.sample_id for x in variantcontextfile.get_variant_contexts()}
+        bam_paths = []
+        for sample in samples:
+            if sample.hash_id not in context_sample_ids:
+                continue
+            try:
+                self.header_cache.read_header(sample.bam)
+            except IOError:
+                continue
+            if sample.bam not in bam_paths:
+                bam_paths.append(sample.bam)
+        incompatible_bams = self.header_cache.get_incompatible_bams(bam_paths)
+        for bam_path in incompatible_bams:
+            self.vaselogger.critical(f"Reference sequences of {bam_path} differ from those of "
+                                     f"{bam_paths[0]} ; Cannot merge their spike-ins")
+        return not incompatible_bams
+
     def run_a_mode_v3(self, samples, variant_context_file, out_path, prefix="VaSe"):
         """Write all spike-ins to a single BAM and single VCF.
 
         All donor reads from all created variant contexts are written to a
         single BAM file, which has a merged header constructed from all used
-        sample BAMs with only minimal necessary header lines retained. If
+        sample BAMs with only minimal necessary header lines retained. The
+        donor reads of each sample are first written to a coordinate sorted
+        run, by worker processes if multiple threads are available, after
+        which the runs are merged while streaming into the output BAM file.
+        The runs spread the sorting over the workers; the donor reads are
+        taken from the variant contexts, which hold all of them already. If
         hashing was enabled when creating sample objects (default), sample IDs
         in the BAM headers will be replaced with their hashes. All donor
         variants from all created variant contexts are written to one
@@ -966,46 +1299,177 @@ class VaSeBuilder:
 
         # Get all used headers and replace IDs if necessary, then merge them.
         headers = self.make_bam_headers(samples, variant_context_file)
-        merged_header = list(headers.values())[0]
-        for header in list(headers.values())[1:]:
-            merged_header = self.merge_donor_alignment_headers(merged_header, header)
-
-        # Get all donor reads from all variant contexts and write to BAM.
-        donor_reads_to_add = variant_context_file.get_all_variant_context_donor_reads_2()
-        outpathbam = f"{out_path}{prefix}.bam"
-        self.vaselogger.debug(f"Start writing A-mode donor BAM output file to {outpathbam}")
-        self.write_spike_in_bam(merged_header, donor_reads_to_add, outpathbam)
+        merged_header = DonorHeaderCache.merge_headers(list(headers.values()))
+
+        # Write a sorted run of donor reads per sample, then merge the runs into one BAM.
+        sample_varcons = [x for x in variant_context_file.get_variant_contexts_by_sampleid().items()
+                          if x[0] in headers]
+        outpathbam = f"{out_path}{prefix}.sorted.bam"
+        if self.spike_in_type == "F":
+            self.vaselogger.debug(f"Start writing A-mode donor FastQ output files to {out_path}")
+            fastq_pair = self.write_spike_in_fastqs(
+                variant_context_file.get_all_variant_context_donor_reads_2(),
+                f"{out_path}{prefix}.bam"
+                )
+            self.write_spike_in_fastq_list([fastq_pair], f"{out_path}{prefix}_fastqs.txt")
+        else:
+            self.vaselogger.debug(f"Start writing A-mode donor BAM output file to {outpathbam}")
+            with tempfile.TemporaryDirectory(prefix=f"{prefix}_runs_",
+                                             dir=os.path.dirname(outpathbam) or None) as run_dir:
+                run_paths = self.map_spike_in_jobs(
+                    self.write_amode_run, (headers, sample_varcons, f"{run_dir}/", prefix),
+                    len(sample_varcons)
+                    )
+                self.merge_sorted_bams(merged_header, run_paths, outpathbam,
+                                       threads=self.threads,
+                                       compress=self.spike_in_type != "U")
+
         # Get all variants from all variant contexts and write to VCF.
         donor_variants_to_add = variant_context_file.get_all_variant_context_variant_records()
         outpathvcf = f"{out_path}{prefix}.vcf"
         self.vaselogger.debug(f"Start writing A-mode donor VCF output file to {outpathvcf}")
         self.write_vcf_slice("VaSeBuilder", donor_variants_to_add, outpathvcf)
 
-    @staticmethod
-    def merge_donor_alignment_headers(base_header, header_to_add):
-        """Merge a new header into a provided header.
+    def run_l_mode_v3(self, samples, variant_context_file, out_path, prefix="VaSe"):
+        """Run VaSeBuilder L-mode.
+
+        Writes a spike-in library of all variant contexts: one coordinate
+        sorted BAM file with every donor read tagged with its variant context,
+        a bgzipped and tabix indexed VCF file with the variant context in the
+        INFO field, and a context index with the BAM byte range per context.
+        Reads of overlapping variant contexts are written once per context.
+
+        Parameters
+        ----------
+        samples : list of sample_mapper.Sample objects
+        variant_context_file : VariantContextFile
+        out_path : str
+            Path to output directory.
+        prefix : str
+            Prefix for output BAM, VCF and index filenames
+        """
+        self.vaselogger.info("Running VaSeBuilder L-mode")
+        merged_header = self.make_merged_bam_header(samples, variant_context_file)
+        varcons = variant_context_file.get_variant_contexts()
+
+        outpathbam = f"{out_path}{prefix}_library.bam"
+        self.vaselogger.debug(f"Start writing spike-in library BAM file to {outpathbam}")
+        library_index = self.write_library_bam(merged_header, varcons, outpathbam)
+        library_index.write(SpikeInLibraryIndex.get_index_path(outpathbam))
+
+        outpathvcf = f"{out_path}{prefix}_library.vcf"
+        self.vaselogger.debug(f"Start writing spike-in library VCF file to {outpathvcf}.gz")
+        contig_order = {x["SN"]: y for y, x in enumerate(merged_header["SQ"])}
+        self.write_library_vcf(varcons, outpathvcf, contig_order)
+
+    def write_library_bam(self, out_header, varcons, outpath):
+        """Write and index the spike-in library BAM file of variant contexts.
+
+        Reads are written with a single compression thread, as the virtual
+        offsets of a multi-threaded BGZF writer are not exact.
+
+        Parameters
+        ----------
+        out_header : OrderedDict
+            Header with required fields
+        varcons : list of VariantContext
+            Variant contexts to write the donor reads of
+        outpath : str
+            Path to write the library BAM file to
+
+        Returns
+        -------
+        library_index : SpikeInLibraryIndex
+            Window and BAM byte range per variant context
+        """
+        library_reads = []
+        for varcon in varcons:
+            for donor_read in varcon.get_donor_reads():
+                library_read = copy.copy(donor_read)
+                library_read.set_tag(self.LIBRARY_CONTEXT_TAG, varcon.get_variant_context_id(),
+                                     "Z")
+                library_reads.append(library_read)
+        library_reads.sort(key=self.get_coordinate_sort_key)
+
+        byte_ranges = {x.get_variant_context_id(): [-1, -1, 0] for x in varcons}
+        sorted_header = pysam.AlignmentHeader.from_dict(out_header).to_dict()
+        sorted_header["HD"] = {**sorted_header.get("HD", {"VN": "1.6"}), "SO": "coordinate"}
+        with pysam.AlignmentFile(outpath, "wb", header=sorted_header) as library_bam:
+            for library_read in library_reads:
+                byte_range = byte_ranges[library_read.get_tag(self.LIBRARY_CONTEXT_TAG)]
+                if byte_range[0] < 0:
+                    byte_range[0] = library_bam.tell()
+                library_bam.write(library_read)
+                byte_range[1] = library_bam.tell()
+                byte_range[2] += 1
+        pysam.index(outpath, catch_stdout=False)
+
+        library_index = SpikeInLibraryIndex()
+        for varcon in varcons:
+            library_index.add_context(varcon.get_variant_context_id(),
+                                      varcon.get_variant_context_chrom(),
+                                      varcon.get_variant_context_start(),
+                                      varcon.get_variant_context_end(),
+                                      *byte_ranges[varcon.get_variant_context_id()])
+        return library_index
+
+    def write_library_vcf(self, varcons, outpath, contig_order):
+        """Write the bgzipped and tabix indexed spike-in library VCF file.
+
+        Each variant is written once per variant context it belongs to, with
+        the variant context identifier added to its INFO field.
+
+        Parameters
+        ----------
+        varcons : list of VariantContext
+            Variant contexts to write the variants of
+        outpath : str
+            Path to write the uncompressed VCF file to, '.gz' is appended
+        contig_order : dict
+            Sort index per chromosome name
+        """
+        library_variants = [(x.get_variant_context_id(), y) for x in varcons for y in x.variants]
+        if not library_variants:
+            self.vaselogger.warning("No variants to write to the spike-in library VCF file.")
+            return
+        library_variants.sort(key=lambda x: (contig_order.get(x[1].contig, len(contig_order)),
+                                             x[1].contig, x[1].pos))
+        header_records = self.get_vcf_slice_header_records([x[1] for x in library_variants])
+        header_records.append(f"##INFO=<ID={self.LIBRARY_CONTEXT_INFO},Number=1,Type=String,"
+                              "Description=\"VaSeBuilder variant context\">\n")
+        header_records.append(
+            "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\tVaSeBuilder\n"
+            )
+        variant_lines = []
+        for context_id, variant in library_variants:
+            variant_fields = str(variant).split("\t")
+            context_info = f"{self.LIBRARY_CONTEXT_INFO}={context_id}"
+            variant_fields[7] = (context_info if variant_fields[7] == "."
+                                 else f"{variant_fields[7]};{context_info}")
+            variant_lines.append("\t".join(variant_fields))
+        try:
+            self.write_indexed_vcf(outpath, header_records, variant_lines,
+                                   library_variants[0][1].header)
+        except IOError:
+            self.vaselogger.warning("Could not write the spike-in library VCF file.")
+
+    def make_merged_bam_header(self, samples, variant_context_file):
+        """Return a single BAM header merged from the headers of all samples.
 
         Parameters
         ----------
-        base_header : OrderedDict
-            Header to add another header to
-        header_to_add : OrderedDict
-            AlignmentFile header to merge into larger header
+        samples : list of sample_mapper.Sample objects
+        variant_context_file : VariantContextFile
 
         Returns
         -------
-        base_header : OrderedDict
+        merged_header : OrderedDict
         """
-        merged_header = OrderedDict(base_header)
-        present_read_groups = {x["ID"] for x in base_header["RG"]
-                               if x is not None}
-        if "RG" in header_to_add:
-            for rg_entry in header_to_add["RG"]:
-                if rg_entry["ID"] not in present_read_groups:
-                    merged_header["RG"].append(rg_entry)
-        return merged_header
+        headers = self.make_bam_headers(samples, variant_context_file)
+        return DonorHeaderCache.merge_headers(list(headers.values()))
 
-    def run_f_mode(self, variantcontextfile, fq1_in, fq2_in, fq_out, random_seed):
+    def run_f_mode(self, variantcontextfile, fq1_in, fq2_in, fq_out, random_seed,
+                   exact_skip=False):
         """Run VaSeBuilder F-mode.
 
         This run mode creates a full set of validation fastq files from
@@ -1022,15 +1486,29 @@ class VaSeBuilder:
             R2 fastq files to use as template
         fq_out : str
             Path and suffix to write validation fastq files to
+        random_seed : int
+            Seed value to use for random read insertion
+        exact_skip : bool
+            Confirm hashed acceptor read skips against the read IDs
         """
         self.vaselogger.info("Running VaSeBuilder F-mode")
 
-        # Combine all donor reads from all variant contexts
-        add_list = variantcontextfile.get_all_variant_context_donor_reads()
         self.vaselogger.info("Writing FastQ files.")
-        skip_list = set(variantcontextfile.get_all_variant_context_acceptor_read_ids())
-
-        donor_read_add_data = {}
+        skip_list = self.build_acceptor_skip_set(variantcontextfile, exact_skip)
+        donor_read_add_data = InsertPositionLog()
+
+        # Combine and index all donor reads from all variant contexts
+        add_list = DonorReadStore(variantcontextfile.get_all_variant_context_donor_reads())
+        if self.is_interleaved():
+            self.build_interleaved_fastqs(
+                fq1_in, fq2_in, skip_list,
+                self.divide_donorfastqs_over_acceptors(add_list.get_read_ids(), len(fq1_in)),
+                add_list, random_seed, fq_out, donor_read_add_data
+                )
+            self.vaselogger.info("Finished writing FastQ files.")
+            self.write_donor_insert_positions_v2(donor_read_add_data,
+                                                 f"{fq_out}_donor_read_insert_positions.txt")
+            return
         for i, fq_i in zip(["1", "2"], [fq1_in, fq2_in]):
             # Write the fastq files.
             self.vaselogger.info(f"Start writing the R{i} FastQ files.")
@@ -1063,114 +1541,837 @@ class VaSeBuilder:
         None.
 
         """
-        context_bam_link = {}
         self.vaselogger.info("Running VaSeBuilder P-mode")
         self.vaselogger.info("Begin writing BAM files")
 
-        headers = self.make_bam_headers(samples, variantcontextfile)
-
-        for varcon in variantcontextfile.get_variant_contexts():
-            outpathbam = f"{outpath}{prefix}_{varcon.get_variant_context_id()}.bam"
-            outpathvcf = f"{outpath}{prefix}_{varcon.get_variant_context_id()}.vcf"
-            self.write_spike_in_bam(headers[varcon.sample_id], varcon.get_donor_reads(), outpathbam)
-            self.write_vcf_slice(varcon.sample_id, varcon.variants, outpathvcf)
-            context_bam_link[varcon.get_variant_context_id()] = outpathbam
+        # Copy the spike-ins of cached variant contexts and only write the others.
+        write_varconfile = variantcontextfile
+        if self.spike_in_cache is not None:
+            write_varconfile = VariantContextFile()
+            cache_keys = self.get_spike_in_cache_keys(samples, variantcontextfile)
+            for varcon in variantcontextfile.get_variant_contexts():
+                varcon_id = varcon.get_variant_context_id()
+                if (varcon_id not in cache_keys or not self.spike_in_cache.fetch(
+                        cache_keys[varcon_id], f"{outpath}{prefix}_{varcon_id}")):
+                    write_varconfile.add_existing_variant_context(varcon_id, varcon)
+            num_of_cached = (variantcontextfile.get_number_of_contexts()
+                             - write_varconfile.get_number_of_contexts())
+            self.vaselogger.info(f"Copied {num_of_cached} cached P-mode spike-ins")
+
+        write_varcons = write_varconfile.get_variant_contexts()
+        if write_varcons:
+            headers = self.make_bam_headers(samples, write_varconfile)
+            self.map_spike_in_jobs(self.write_pmode_context,
+                                   (headers, write_varcons, outpath, prefix), len(write_varcons))
+
+        if self.spike_in_cache is not None:
+            for varcon in write_varcons:
+                varcon_id = varcon.get_variant_context_id()
+                if varcon_id in cache_keys:
+                    file_prefix = f"{outpath}{prefix}_{varcon_id}"
+                    self.spike_in_cache.store(
+                        cache_keys[varcon_id], file_prefix,
+                        glob.glob(f"{glob.escape(file_prefix)}.*")
+                        + glob.glob(f"{glob.escape(file_prefix)}_R[12].fastq.gz")
+                        )
+            num_of_evicted = self.spike_in_cache.evict()
+            self.vaselogger.debug(f"Evicted {num_of_evicted} spike-ins from the spike-in cache")
+
+        if self.spike_in_type == "F":
+            self.write_spike_in_fastq_list(
+                [self.get_spike_in_fastq_paths(f"{outpath}{prefix}_{x}.bam")
+                 for x in variantcontextfile.get_variant_context_ids()],
+                f"{outpath}{prefix}_fastqs.txt"
+                )
+            return
+        context_bam_link = {x: f"{outpath}{prefix}_{x}.bam"
+                            for x in variantcontextfile.get_variant_context_ids()}
         self.write_pmode_bamlinkfile(context_bam_link,
                                      f"{outpath}pmode_bamlink_{self.creation_id}.txt")
 
-    @staticmethod
-    def get_sample_filter(sample, filterdict):
-        """Retrieve sample's filter variants."""
-        if sample.id not in filterdict:
-            return None
-        return filterdict[sample.id]
-
-    # =====SPLITTING THE BUILD_VARCON_SET() INTO MULTIPLE SMALLER METHODS=====
-    def bvcs(self, samples, acceptorbamloc, outpath, reference_loc, varcon_outpath,
-             variantlist, merge=True):
-        """Build, write, and return a variant context file.
-
-        The variant context file is built from the provided variants and
-        acceptor and donors alignment files.
+    def get_spike_in_cache_keys(self, samples, variantcontextfile):
+        """Return the spike-in cache key of each variant context.
+
+        The key of a variant context established in this run is made of the
+        donor sample identifier and the context cache keys of its variants,
+        which cover the donor and acceptor files and the variants. A variant
+        context read from a variant context file was established by an
+        earlier run, so its key covers what its spike-in is made of instead:
+        the donor sample and its alignment file, the context window, the
+        donor read identifiers and the donor variants. Both keys also cover
+        the VCF compression and spike-in output type, as they change the
+        written files. The sample identifier is the hashed one written to
+        the spike-in headers and VCF files, which differs between runs that
+        hash sample names with a new salt.
 
         Parameters
         ----------
         samples : list of sample_mapper.Sample objects
-        acceptorbamloc : str
-            Path to alignment file to use as acceptor
-        outpath : str
-            Path to folder to write output files to
-        reference_loc : str
-            Path to the genomic reference fasta file
-        varcon_outpath : str
-            Path and name to write variant context file to
-        variantlist : dict
-            Variants to use per sample
-        merge : bool
-            Whether to merge overlapping contexts from the same sample
+        variantcontextfile : VariantContextFile
 
         Returns
         -------
-        variantcontexts : VariantContextFile
-            Established variant contexts
+        cache_keys : dict
+            Cache key per variant context identifier, for contexts of samples
+            with a readable alignment file
         """
-        donor_vcfs_used = []
-        donor_bams_used = []
-        variantcontexts = VariantContextFile()
-
-        try:
-            acceptorbamfile = pysam.AlignmentFile(acceptorbamloc, reference_filename=reference_loc)
-        except IOError:
-            self.vaselogger.critical("Could not open Acceptor BAM/CRAM")
-            sys.exit()
-
-        # Start iterating over the samples
+        acceptor_bam = variantcontextfile.get_template_alignment_file()
+        donor_bams = {}
         for sample in samples:
-            self.vaselogger.debug(f"Start processing sample {sample.hash_id}")
-
-            # Establish variant filter for this sample, if present.
-            sample_var_filter = None
-            if variantlist is not None:
-                sample_var_filter = self.get_sample_filter(sample, variantlist)
-                if sample_var_filter is None:
-                    continue
-            samplevariants = self.get_sample_vcf_variants_2(sample.vcf, sample_var_filter)
-
-            if not samplevariants:
-                self.vaselogger.warning(f"No variants obtained for sample {sample.hash_id}. "
-                                        "Skipping sample")
+            try:
+                donor_bams[sample.hash_id] = SpikeInCache.get_file_identity(sample.bam)
+            except OSError:
+                self.vaselogger.warning(f"Could not read {sample.bam} ; Not caching its spike-ins")
+        cache_keys = {}
+        for varcon in variantcontextfile.get_variant_contexts():
+            if varcon.sample_id not in donor_bams:
+                continue
+            context_keys = [self.context_cache_keys.get(
+                (acceptor_bam, varcon.sample_id, self.get_vcf_variant_id(x)))
+                            for x in varcon.variants]
+            if context_keys and None not in context_keys:
+                cache_keys[varcon.get_variant_context_id()] = self.spike_in_cache.get_key(
+                    "P", varcon.sample_id, sorted(context_keys), self.compress_vcf,
+                    self.spike_in_type
+                    )
                 continue
+            cache_keys[varcon.get_variant_context_id()] = self.spike_in_cache.get_key(
+                "P", varcon.sample_id, donor_bams[varcon.sample_id],
+                str(varcon.get_variant_context_chrom()),
+                int(varcon.get_variant_context_start()),
+                int(varcon.get_variant_context_end()),
+                sorted(set(varcon.get_donor_read_ids())),
+                [f"{x.chrom}_{x.pos}_{x.ref}_{','.join(x.alts)}" for x in varcon.variants],
+                self.compress_vcf, self.spike_in_type
+                )
+        return cache_keys
 
-            # Call the method that will process the sample
-            self.bvcs_process_sample(sample.hash_id, variantcontexts, acceptorbamfile,
-                                     sample.bam, reference_loc, samplevariants, merge)
+    def get_uncached_variant_contexts(self, samples, variantcontextfile):
+        """Return the variant contexts without a cached P-mode spike-in.
 
-            # Add the used donor VCF and BAM to the lists of used VCF and BAM files
-            donor_bams_used.append(sample.bam)
-            donor_vcfs_used.append(sample.vcf)
+        Parameters
+        ----------
+        samples : list of sample_mapper.Sample objects
+        variantcontextfile : VariantContextFile
 
-        # Check if there are no variant contexts.
-        if variantcontexts.get_number_of_contexts() <= 0:
-            self.vaselogger.info("No variant contexts were created. "
-                                 "No output files will be written.")
-            return None
+        Returns
+        -------
+        uncached_varconfile : VariantContextFile
+            Variant contexts, shared with the provided file, that are not cached
+        """
+        cache_keys = self.get_spike_in_cache_keys(samples, variantcontextfile)
+        uncached_varconfile = VariantContextFile()
+        for varcon in variantcontextfile.get_variant_contexts():
+            varcon_id = varcon.get_variant_context_id()
+            if varcon_id not in cache_keys or not self.spike_in_cache.has_entry(
+                    cache_keys[varcon_id]):
+                uncached_varconfile.add_existing_variant_context(varcon_id, varcon)
+        return uncached_varconfile
 
-        # Write the output variant context output data
-        self.bvcs_write_output_files(outpath, varcon_outpath, variantcontexts, samples,
-                                     donor_vcfs_used, donor_bams_used)
+    def run_d_mode_v3(self, samples, variantcontextfile, outpath, prefix="VaSe"):
+        """Run VaSeBuilder in D-mode.
 
-        # Checks whether the program is running on debug and, if so, write some extra output files.
-        if self.vaselogger.getEffectiveLevel() == 10:
-            self.write_optional_output_files(outpath, variantcontexts)
+        Writes a sorted BAM and a VCF file with the donor reads and variants
+        of all variant contexts per donor sample. Samples are written by
+        worker processes, each writing a single sample at a time.
 
-        # Set the used acceptor and donor files
-        variantcontexts.set_template_alignment_file(acceptorbamloc)
+        Parameters
+        ----------
+        samples : list of Sample objects
+            Sample objects containing relevant file paths and attributes.
+        variantcontextfile : VariantContextFile object
+            Object containing the constructed variant contexts to use.
+        outpath : str
+            Path to output dir.
+        prefix : str, optional
+            Prefix for created BAM and VCF file names. The default is "VaSe".
+        """
+        self.vaselogger.info("Running VaSeBuilder D-mode")
+        headers = self.make_bam_headers(samples, variantcontextfile)
+        sample_varcons = list(variantcontextfile.get_variant_contexts_by_sampleid().items())
+        spike_in_paths = self.map_spike_in_jobs(self.write_dmode_sample,
+                                                (headers, sample_varcons, outpath, prefix),
+                                                len(sample_varcons))
+        if self.spike_in_type == "F":
+            self.write_spike_in_fastq_list(spike_in_paths, f"{outpath}{prefix}_fastqs.txt")
+
+    def map_spike_in_jobs(self, write_job, spike_ins, num_of_jobs):
+        """Run spike-in write jobs, in a process pool if multiple threads are available.
+
+        Parameters
+        ----------
+        write_job : callable
+            Writes the spike-in of a job index, called with the spike-ins,
+            job index and number of compression threads
+        spike_ins : tuple
+            Spike-ins to write, passed to every job
+        num_of_jobs : int
+            Number of job indices to write
+
+        Returns
+        -------
+        list
+            Results of the write jobs in job index order
+        """
+        num_of_processes = min(self.threads, num_of_jobs)
+        if num_of_processes <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+            return [write_job(spike_ins, x, self.threads) for x in range(num_of_jobs)]
+
+        # Variant contexts hold pysam reads and variants that can not be pickled, so they are
+        # handed to forked workers when they start and jobs only pass indices.
+        self.vaselogger.debug(f"Writing {num_of_jobs} spike-ins using {num_of_processes} "
+                              "processes")
+        with ProcessPoolExecutor(max_workers=num_of_processes,
+                                 mp_context=multiprocessing.get_context("fork"),
+                                 initializer=self.set_shared_spike_ins,
+                                 initargs=(spike_ins,)) as spike_in_pool:
+            return list(spike_in_pool.map(write_job, repeat(None), range(num_of_jobs),
+                                          chunksize=max(1, num_of_jobs // (num_of_processes * 4))))
+
+    @classmethod
+    def set_shared_spike_ins(cls, spike_ins):
+        """Set the spike-ins written by the P-mode or D-mode worker processes.
+
+        Parameters
+        ----------
+        spike_ins : tuple
+            BAM headers per sample, variant contexts, output path and prefix
+        """
+        cls.shared_spike_ins = spike_ins
+
+    def write_pmode_context(self, pmode_contexts, varcon_index, threads=1):
+        """Write the BAM and VCF files of a single P-mode variant context.
+
+        Parameters
+        ----------
+        pmode_contexts : tuple
+            BAM headers per sample, variant contexts, output path and prefix,
+            the shared spike-ins if None
+        varcon_index : int
+            Index of the variant context to write
+        threads : int
+            Number of BGZF compression threads
+
+        Returns
+        -------
+        spike_in_paths : tuple of str
+            Paths the spike-in read files of the variant context were
+            written to
+        """
+        if pmode_contexts is None:
+            pmode_contexts = self.shared_spike_ins
+        headers, varcons, outpath, prefix = pmode_contexts
+        varcon = varcons[varcon_index]
+        outpathbam = f"{outpath}{prefix}_{varcon.get_variant_context_id()}.bam"
+        outpathvcf = f"{outpath}{prefix}_{varcon.get_variant_context_id()}.vcf"
+        spike_in_paths = self.write_spike_in_reads(headers.get(varcon.sample_id),
+                                                   varcon.get_donor_reads(), outpathbam,
+                                                   threads=threads)
+        self.write_vcf_slice(varcon.sample_id, varcon.variants, outpathvcf)
+        return spike_in_paths
+
+    def write_dmode_sample(self, dmode_samples, sample_index, threads=1):
+        """Write the BAM and VCF files of a single D-mode donor sample.
+
+        Variant contexts of a sample that overlap, when they are not merged,
+        share donor reads and can share variants. Each read and variant is
+        written once.
+
+        Parameters
+        ----------
+        dmode_samples : tuple
+            BAM headers per sample, variant contexts per sample, output path
+            and prefix, the shared spike-ins if None
+        sample_index : int
+            Index of the sample to write
+        threads : int
+            Number of BGZF compression threads
+
+        Returns
+        -------
+        spike_in_paths : tuple of str
+            Paths the spike-in read files of the sample were written to
+        """
+        if dmode_samples is None:
+            dmode_samples = self.shared_spike_ins
+        headers, sample_varcons, outpath, prefix = dmode_samples
+        sample_id, varcons = sample_varcons[sample_index]
+        outpathbam = f"{outpath}{prefix}_{sample_id}.bam"
+        outpathvcf = f"{outpath}{prefix}_{sample_id}.vcf"
+        donor_reads = self.uniqify_variant_reads(
+            [x for varcon in varcons for x in varcon.get_donor_reads()]
+            )
+        spike_in_paths = self.write_spike_in_reads(headers.get(sample_id), donor_reads,
+                                                   outpathbam, threads=threads)
+        variants = sorted({str(x): x for varcon in varcons for x in varcon.variants}.values(),
+                          key=lambda x: (x.rid, x.pos))
+        self.write_vcf_slice(sample_id, variants, outpathvcf)
+        return spike_in_paths
+
+    def write_amode_run(self, amode_runs, sample_index, threads=1):
+        """Write the coordinate sorted run of donor reads of a single A-mode donor sample.
+
+        The run is only read through once by the merge, so it is not indexed.
+
+        Parameters
+        ----------
+        amode_runs : tuple
+            BAM headers per sample, variant contexts per sample, output path
+            and prefix, the shared spike-ins if None
+        sample_index : int
+            Index of the sample to write
+        threads : int
+            Number of BGZF compression threads
+
+        Returns
+        -------
+        str
+            Path the sorted run BAM file of the sample was written to
+        """
+        if amode_runs is None:
+            amode_runs = self.shared_spike_ins
+        headers, sample_varcons, outpath, prefix = amode_runs
+        sample_id, varcons = sample_varcons[sample_index]
+        outpathbam = f"{outpath}{prefix}_{sample_index}.bam"
+        donor_reads = [x for varcon in varcons for x in varcon.get_donor_reads()]
+        self.write_spike_in_bam(headers[sample_id], donor_reads, outpathbam, threads=threads,
+                                compress=False, index=False)
+        return f"{outpathbam[:-4]}.sorted.bam"
+
+    @classmethod
+    def merge_sorted_bams(cls, out_header, bam_paths, out_path, threads=1, compress=True):
+        """Merge coordinate sorted BAM files into one sorted and indexed BAM file.
+
+        Reads are merged while streaming from the BAM files, so only one read
+        per BAM file is held in memory. All BAM files need the SQ lines of the
+        output header.
+
+        Parameters
+        ----------
+        out_header : OrderedDict
+            Header with required fields
+        bam_paths : list of str
+            Paths to the coordinate sorted BAM files to merge
+        out_path : str
+            Path to write the merged BAM file to
+        threads : int
+            Number of BGZF compression threads
+        compress : bool
+            Option to compress the merged BAM file. The default is True.
+        """
+        sorted_header = pysam.AlignmentHeader.from_dict(out_header).to_dict()
+        sorted_header["HD"] = {**sorted_header.get("HD", {"VN": "1.6"}), "SO": "coordinate"}
+        in_bams = [pysam.AlignmentFile(x, "rb") for x in bam_paths]
+        try:
+            with pysam.AlignmentFile(out_path, "wb" if compress else "wbu", header=sorted_header,
+                                     threads=threads) as out_bam:
+                for read in heapq.merge(*(x.fetch(until_eof=True) for x in in_bams),
+                                        key=cls.get_coordinate_sort_key):
+                    out_bam.write(read)
+        finally:
+            for in_bam in in_bams:
+                in_bam.close()
+        pysam.index(out_path, catch_stdout=False)
+
+    @staticmethod
+    def get_sample_filter(sample, filterdict):
+        """Retrieve sample's filter variants."""
+        if sample.id not in filterdict:
+            return None
+        return filterdict[sample.id]
+
+    # =====SPLITTING THE BUILD_VARCON_SET() INTO MULTIPLE SMALLER METHODS=====
+    def bvcs(self, samples, acceptorbamloc, outpath, reference_loc, varcon_outpath,
+             variantlist, merge=True):
+        """Build, write, and return a variant context file.
+
+        The variant context file is built from the provided variants and
+        acceptor and donors alignment files.
+
+        Parameters
+        ----------
+        samples : list of sample_mapper.Sample objects
+        acceptorbamloc : str
+            Path to alignment file to use as acceptor
+        outpath : str
+            Path to folder to write output files to
+        reference_loc : str
+            Path to the genomic reference fasta file
+        varcon_outpath : str
+            Path and name to write variant context file to
+        variantlist : dict
+            Variants to use per sample
+        merge : bool
+            Whether to merge overlapping contexts from the same sample
+
+        Returns
+        -------
+        variantcontexts : VariantContextFile
+            Established variant contexts
+        """
+        donor_pass = self.bvcs_donor_pass(samples, reference_loc, variantlist, [acceptorbamloc])
+        return self.bvcs_acceptor_pass(donor_pass, samples, acceptorbamloc, outpath,
+                                       reference_loc, varcon_outpath, merge)
+
+    def bvcs_donor_pass(self, samples, reference_loc, variantlist, acceptor_bams):
+        """Read the sample variants and establish their donor and acceptor contexts.
+
+        The donor contexts do not depend on the acceptor, so they are
+        established once and shared by all acceptors built in the same run.
+        The acceptor contexts of every acceptor are established alongside,
+        so the donor reads of each variant context window are fetched in
+        this single pass over the donor alignment file, which is not read
+        again per acceptor.
+
+        With a spike-in cache set, the contexts of a variant are looked up
+        in the cache before they are established. If they are cached for
+        every acceptor, they are read from the cache instead of fetched from
+        the donor and acceptor alignment files.
+
+        Parameters
+        ----------
+        samples : list of sample_mapper.Sample objects
+        reference_loc : str
+            Path to the genomic reference fasta file
+        variantlist : dict
+            Variants to use per sample
+        acceptor_bams : list of str
+            Paths to the alignment files to use as acceptor
+
+        Returns
+        -------
+        donor_samples : list of tuple
+            Sample and its variants with their established donor context and
+            acceptor context per acceptor alignment file
+        donor_read_cache : dict
+            Donor reads per sample and variant context window
+        acceptor_read_caches : dict
+            Acceptor reads per variant context window, per acceptor alignment
+            file
+        """
+        donor_samples = []
+        donor_read_cache = {}
+        acceptor_read_caches = {x: {} for x in acceptor_bams}
+        try:
+            acceptorbamfiles = {x: pysam.AlignmentFile(x, reference_filename=reference_loc)
+                                for x in acceptor_bams}
+        except IOError:
+            self.vaselogger.critical("Could not open Acceptor BAM/CRAM")
+            sys.exit()
+
+        # Start iterating over the samples
+        for sample in samples:
+            self.vaselogger.debug(f"Start processing sample {sample.hash_id}")
+
+            # Establish variant filter for this sample, if present.
+            sample_var_filter = None
+            if variantlist is not None:
+                sample_var_filter = self.get_sample_filter(sample, variantlist)
+                if sample_var_filter is None:
+                    continue
+            samplevariants = self.get_sample_vcf_variants_2(sample.vcf, sample_var_filter)
+
+            if not samplevariants:
+                self.vaselogger.warning(f"No variants obtained for sample {sample.hash_id}. "
+                                        "Skipping sample")
+                continue
+
+            donor_variants = []
+            donor_samples.append((sample, donor_variants))
+            donorbamfile = None
+            for samplevariant in samplevariants:
+                variantid = self.get_vcf_variant_id(samplevariant[0])
+                cache_keys = {}
+                cached_contexts = {}
+                if self.spike_in_cache is not None:
+                    for acceptor_bam in acceptor_bams:
+                        cache_keys[acceptor_bam] = self.get_context_cache_key(
+                            sample, samplevariant[0], acceptor_bam, reference_loc)
+                        self.context_cache_keys[(acceptor_bam, sample.hash_id, variantid)] = \
+                            cache_keys[acceptor_bam]
+                        cached_context = self.read_cached_context(
+                            cache_keys[acceptor_bam], sample.hash_id, variantid)
+                        if cached_context is not None:
+                            cached_contexts[acceptor_bam] = cached_context
+
+                # Take the contexts from the cache if cached for every acceptor
+                if len(cached_contexts) == len(acceptor_bams):
+                    self.vaselogger.debug(f"Reading the contexts of {variantid} from the cache")
+                    acontexts = {}
+                    for acceptor_bam, cached_context in cached_contexts.items():
+                        dcontext, acontexts[acceptor_bam], vcontext_dreads, vcontext_areads = \
+                            cached_context
+                        vcontext_window = self.determine_largest_context(
+                            samplevariant[0].pos, acontexts[acceptor_bam].get_context(),
+                            dcontext.get_context())
+                        donor_read_cache.setdefault(
+                            (sample.hash_id, vcontext_window[0], vcontext_window[2],
+                             vcontext_window[3]), vcontext_dreads)
+                        acceptor_read_caches[acceptor_bam].setdefault(
+                            (vcontext_window[0], vcontext_window[2], vcontext_window[3]),
+                            vcontext_areads)
+                    donor_variants.append((samplevariant, dcontext, acontexts))
+                    continue
+
+                if donorbamfile is None:
+                    try:
+                        donorbamfile = pysam.AlignmentFile(sample.bam,
+                                                           reference_filename=reference_loc)
+                    except IOError:
+                        self.vaselogger.warning(f"Could not open {sample.bam} ; Skipping "
+                                                f"{sample.hash_id}")
+                        break
+                dcontext = self.bvcs_establish_donor_context(sample.hash_id, samplevariant[0],
+                                                             donorbamfile)
+                if not dcontext:
+                    continue
+                acontexts = {}
+                for acceptor_bam, acceptorbamfile in acceptorbamfiles.items():
+                    acontexts[acceptor_bam] = self.bvcs_establish_acceptor_context(
+                        sample.hash_id, samplevariant[0], acceptorbamfile, dcontext)
+                    vcontext_window = self.determine_largest_context(
+                        samplevariant[0].pos, acontexts[acceptor_bam].get_context(),
+                        dcontext.get_context())
+                    cache_key = (sample.hash_id, vcontext_window[0], vcontext_window[2],
+                                 vcontext_window[3])
+                    if cache_key not in donor_read_cache:
+                        donor_read_cache[cache_key] = self.get_variant_reads(
+                            vcontext_window[0], vcontext_window[2], vcontext_window[3],
+                            donorbamfile)
+                    if cache_key[1:] not in acceptor_read_caches[acceptor_bam]:
+                        acceptor_read_caches[acceptor_bam][cache_key[1:]] = self.get_variant_reads(
+                            vcontext_window[0], vcontext_window[2], vcontext_window[3],
+                            acceptorbamfile)
+                    if cache_keys.get(acceptor_bam) is not None:
+                        self.store_cached_context(
+                            cache_keys[acceptor_bam], dcontext, acontexts[acceptor_bam],
+                            donor_read_cache[cache_key],
+                            acceptor_read_caches[acceptor_bam][cache_key[1:]],
+                            donorbamfile.header, acceptorbamfile.header
+                            )
+                donor_variants.append((samplevariant, dcontext, acontexts))
+            if donorbamfile is not None:
+                donorbamfile.close()
+        for acceptorbamfile in acceptorbamfiles.values():
+            acceptorbamfile.close()
+        return donor_samples, donor_read_cache, acceptor_read_caches
+
+    def get_context_cache_key(self, sample, variant, acceptor_bam, reference_loc):
+        """Return the spike-in cache key of the contexts of a variant.
+
+        The key covers everything the contexts are established from, which
+        is known before they are established: the donor alignment and
+        variant file, the acceptor alignment file, the reference and the
+        variant. The way the contexts are established, such as which reads
+        are fetched, is covered by the cache version.
+
+        Parameters
+        ----------
+        sample : sample_mapper.Sample
+            Sample the variant is from
+        variant : pysam.VariantRecord
+            Variant to establish the contexts of
+        acceptor_bam : str
+            Path to the alignment file used as acceptor
+        reference_loc : str
+            Path to the genomic reference fasta file
+
+        Returns
+        -------
+        str or None
+            Cache key, None if a file could not be read
+        """
+        try:
+            file_identities = [SpikeInCache.get_file_identity(x)
+                               for x in [sample.bam, sample.vcf, acceptor_bam, reference_loc]]
+        except OSError:
+            self.vaselogger.warning(f"Could not read the files of {sample.hash_id} ; Not "
+                                    "caching its contexts")
+            return None
+        return self.spike_in_cache.get_key("contexts", *file_identities,
+                                           self.get_vcf_variant_id(variant))
+
+    def read_cached_context(self, cache_key, sampleid, variantid):
+        """Read and return the donor and acceptor context of a variant from the cache.
+
+        Parameters
+        ----------
+        cache_key : str or None
+            Cache key of the contexts of the variant
+        sampleid : str
+            Sample name/identifier
+        variantid : str
+            Variant identifier
+
+        Returns
+        -------
+        tuple or None
+            Donor context, acceptor context, and donor and acceptor reads of
+            the variant context window, None if not cached
+        """
+        if cache_key is None or not self.spike_in_cache.has_entry(cache_key):
+            return None
+        entry_dir = self.spike_in_cache.get_entry_dir(cache_key)
+        cached_context = []
+        try:
+            with open(os.path.join(entry_dir, "contexts.txt")) as contextfile:
+                context_windows = [x.rstrip("\n").split("\t") for x in contextfile]
+            for (context_chrom, context_origin, context_start, context_end,
+                 num_of_context_reads), read_type in zip(context_windows, ["donor", "acceptor"]):
+                with pysam.AlignmentFile(os.path.join(entry_dir, f"{read_type}_reads.bam"), "rb",
+                                         check_sq=False) as readfile:
+                    cached_reads = list(readfile.fetch(until_eof=True))
+                context = OverlapContext(variantid, sampleid, context_chrom, int(context_origin),
+                                         int(context_start), int(context_end),
+                                         cached_reads[:int(num_of_context_reads)])
+                context.set_unmapped_mate_ids([])
+                cached_context.append((context, cached_reads[int(num_of_context_reads):]))
+            os.utime(entry_dir)
+        except (OSError, ValueError):
+            self.vaselogger.debug(f"Could not read cached contexts of {variantid}")
+            return None
+        return (cached_context[0][0], cached_context[1][0], cached_context[0][1],
+                cached_context[1][1])
+
+    def store_cached_context(self, cache_key, dcontext, acontext, vcontext_dreads,
+                             vcontext_areads, donor_header, acceptor_header):
+        """Store the donor and acceptor context of a variant in the cache.
+
+        The windows of both contexts are written to a text file, and the
+        reads of each context, followed by the reads of the variant context
+        window, to a BAM file with the header of their alignment file.
+
+        Parameters
+        ----------
+        cache_key : str
+            Cache key of the contexts of the variant
+        dcontext : OverlapContext
+            Established donor context
+        acontext : OverlapContext
+            Established acceptor context
+        vcontext_dreads : list of pysam.AlignedSegment
+            Donor reads of the variant context window
+        vcontext_areads : list of pysam.AlignedSegment
+            Acceptor reads of the variant context window
+        donor_header : pysam.AlignmentHeader
+            Header of the donor alignment file
+        acceptor_header : pysam.AlignmentHeader
+            Header of the acceptor alignment file
+        """
+        if self.spike_in_cache.has_entry(cache_key):
+            return
+        with tempfile.TemporaryDirectory(prefix="vase_contexts_") as context_dir:
+            context_files = [os.path.join(context_dir, "contexts.txt")]
+            with open(context_files[0], "w") as contextfile:
+                for context in [dcontext, acontext]:
+                    contextfile.write("\t".join(map(str, context.get_context()))
+                                      + f"\t{len(context.get_context_bam_reads())}\n")
+            for read_type, context, window_reads, read_header in [
+                    ("donor", dcontext, vcontext_dreads, donor_header),
+                    ("acceptor", acontext, vcontext_areads, acceptor_header)]:
+                context_files.append(os.path.join(context_dir, f"{read_type}_reads.bam"))
+                with pysam.AlignmentFile(context_files[-1], "wb", header=read_header) as readfile:
+                    for context_read in context.get_context_bam_reads() + window_reads:
+                        readfile.write(context_read)
+            self.spike_in_cache.store(cache_key, f"{context_dir}/", context_files)
+
+    def bvcs_acceptor_pass(self, donor_pass, samples, acceptorbamloc, outpath, reference_loc,
+                           varcon_outpath, merge=True):
+        """Build, write, and return the variant context file of an acceptor.
+
+        Parameters
+        ----------
+        donor_pass : tuple
+            Donor samples with their donor and acceptor contexts, and cached
+            donor and acceptor reads, as returned by bvcs_donor_pass
+        samples : list of sample_mapper.Sample objects
+        acceptorbamloc : str
+            Path to alignment file to use as acceptor, one of the acceptors
+            of the donor pass
+        outpath : str
+            Path to folder to write output files to
+        reference_loc : str
+            Path to the genomic reference fasta file
+        varcon_outpath : str
+            Path and name to write variant context file to
+        merge : bool
+            Whether to merge overlapping contexts from the same sample
+
+        Returns
+        -------
+        variantcontexts : VariantContextFile
+            Established variant contexts
+        """
+        donor_samples, donor_read_cache, acceptor_read_caches = donor_pass
+        donor_vcfs_used = []
+        donor_bams_used = []
+        variantcontexts = VariantContextFile()
+
+        try:
+            acceptorbamfile = pysam.AlignmentFile(acceptorbamloc, reference_filename=reference_loc)
+        except IOError:
+            self.vaselogger.critical("Could not open Acceptor BAM/CRAM")
+            sys.exit()
+
+        for sample, donor_variants in donor_samples:
+            # Call the method that will process the sample
+            self.bvcs_process_sample(sample.hash_id, variantcontexts, acceptorbamfile,
+                                     sample.bam, reference_loc, [x[0] for x in donor_variants],
+                                     merge, [x[1] for x in donor_variants], donor_read_cache,
+                                     [x[2][acceptorbamloc] for x in donor_variants],
+                                     acceptor_read_caches[acceptorbamloc])
+
+            # Add the used donor VCF and BAM to the lists of used VCF and BAM files
+            donor_bams_used.append(sample.bam)
+            donor_vcfs_used.append(sample.vcf)
+
+        # Check if there are no variant contexts.
+        if variantcontexts.get_number_of_contexts() <= 0:
+            self.vaselogger.info("No variant contexts were created. "
+                                 "No output files will be written.")
+            return None
+
+        # Write the output variant context output data
+        self.bvcs_write_output_files(outpath, varcon_outpath, variantcontexts, samples,
+                                     donor_vcfs_used, donor_bams_used)
+
+        # Checks whether the program is running on debug and, if so, write some extra output files.
+        if self.vaselogger.getEffectiveLevel() == 10:
+            self.write_optional_output_files(outpath, variantcontexts)
+
+        # Set the used acceptor and donor files
+        variantcontexts.set_template_alignment_file(acceptorbamloc)
         variantcontexts.set_donor_alignment_files(donor_bams_used)
         variantcontexts.set_donor_variant_files(donor_vcfs_used)
         return variantcontexts
 
+    def run_multi_acceptor_f_mode(self, samples, acceptors, outpath, reference_loc,
+                                  varcon_outpath, variantlist, merge, fq_out, random_seed,
+                                  exact_skip=False):
+        """Build a validation set per acceptor, sharing a single donor pass.
+
+        The sample variants, donor and acceptor contexts, and donor reads
+        are established in a single pass over the donor alignment files. The
+        variant context file and validation fastq files are then built per
+        acceptor, in parallel if multiple threads are available. Output
+        files are named after the acceptor.
+
+        The acceptor contexts and reads of every acceptor are established
+        serially in the donor pass and held in memory until all acceptors
+        are built, so only the per-acceptor output is written in parallel
+        and the memory use grows with the number of acceptors.
+
+        Parameters
+        ----------
+        samples : list of sample_mapper.Sample objects
+        acceptors : list of tuple
+            Name, alignment file, and R1 and R2 template fastq files per acceptor
+        outpath : str
+            Path to folder to write output files to
+        reference_loc : str
+            Path to the genomic reference fasta file
+        varcon_outpath : str
+            Path and name to write variant context files to
+        variantlist : dict
+            Variants to use per sample
+        merge : bool
+            Whether to merge overlapping contexts from the same sample
+        fq_out : str
+            Path and prefix to write validation fastq files to
+        random_seed : int
+            Seed value to use for random read insertion
+        exact_skip : bool
+            Confirm hashed acceptor read skips against the read IDs
+        """
+        self.vaselogger.info(f"Establishing donor contexts shared by {len(acceptors)} acceptors")
+        donor_pass = self.bvcs_donor_pass(samples, reference_loc, variantlist,
+                                          [x[1] for x in acceptors])
+        acceptor_args = [(samples, x, outpath, reference_loc, varcon_outpath, merge, fq_out,
+                          random_seed, exact_skip) for x in acceptors]
+        num_of_processes = min(self.threads, len(acceptors))
+        if num_of_processes <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+            for acceptor_arg in acceptor_args:
+                self.build_acceptor_validation_set(donor_pass, *acceptor_arg)
+            return
+
+        # Donor contexts hold pysam reads and variants that can not be pickled, so the donor
+        # pass is handed to forked workers when they start instead of with each job.
+        self.vaselogger.debug(f"Building {len(acceptors)} acceptors using {num_of_processes} "
+                              "processes")
+        with ProcessPoolExecutor(max_workers=num_of_processes,
+                                 mp_context=multiprocessing.get_context("fork"),
+                                 initializer=self.set_shared_donor_pass,
+                                 initargs=(donor_pass,)) as acceptor_pool:
+            acceptor_futures = [
+                acceptor_pool.submit(self.build_acceptor_validation_set, None, *acceptor_arg,
+                                     max(1, self.threads // num_of_processes))
+                for acceptor_arg in acceptor_args
+                ]
+            for acceptor_future in acceptor_futures:
+                acceptor_future.result()
+
+    @classmethod
+    def set_shared_donor_pass(cls, donor_pass):
+        """Set the donor pass shared by the acceptors built in a worker process.
+
+        Parameters
+        ----------
+        donor_pass : tuple
+            Donor samples with their donor and acceptor contexts, and cached
+            donor and acceptor reads
+        """
+        cls.shared_donor_pass = donor_pass
+
+    def build_acceptor_validation_set(self, donor_pass, samples, acceptor, outpath,
+                                      reference_loc, varcon_outpath, merge, fq_out, random_seed,
+                                      exact_skip=False, threads=None):
+        """Build the variant contexts and validation fastq files of a single acceptor.
+
+        Parameters
+        ----------
+        donor_pass : tuple
+            Donor samples with their donor and acceptor contexts, and cached
+            donor and acceptor reads, the shared donor pass if None
+        samples : list of sample_mapper.Sample objects
+        acceptor : tuple
+            Name, alignment file, and R1 and R2 template fastq files
+        outpath : str
+            Path to folder to write output files to
+        reference_loc : str
+            Path to the genomic reference fasta file
+        varcon_outpath : str
+            Path and name to write variant context files to
+        merge : bool
+            Whether to merge overlapping contexts from the same sample
+        fq_out : str
+            Path and prefix to write validation fastq files to
+        random_seed : int
+            Seed value to use for random read insertion
+        exact_skip : bool
+            Confirm hashed acceptor read skips against the read IDs
+        threads : int
+            Number of processes to write the validation fastq files with
+        """
+        if donor_pass is None:
+            donor_pass = self.shared_donor_pass
+        if threads is not None:
+            self.threads = threads
+        acceptor_name, acceptor_bam, fq1_in, fq2_in = acceptor
+        self.vaselogger.info(f"Building validation set for acceptor {acceptor_name}")
+        varcon_root, varcon_extension = os.path.splitext(varcon_outpath)
+        varconfile = self.bvcs_acceptor_pass(donor_pass, samples, acceptor_bam,
+                                             f"{outpath}{acceptor_name}_", reference_loc,
+                                             f"{varcon_root}_{acceptor_name}{varcon_extension}",
+                                             merge)
+        if varconfile is None:
+            return
+        self.run_f_mode(varconfile, fq1_in, fq2_in, f"{fq_out}_{acceptor_name}", random_seed,
+                        exact_skip)
+
     def bvcs_process_sample(self, sampleid, variantcontextfile, abamfile, dbamfileloc,
-                            referenceloc, samplevariants, merge=True):
+                            referenceloc, samplevariants, merge=True, donor_contexts=None,
+                            donor_read_cache=None, acceptor_contexts=None,
+                            acceptor_read_cache=None):
         """Process a sample and add variant contexts to a variant context file.
 
         Parameters
@@ -1189,17 +2390,36 @@ class VaSeBuilder:
             Variants to process for the specified sample
         merge : bool
             Whether to merge overlapping contexts from the same sample
+        donor_contexts : list of OverlapContext
+            Already established donor context per sample variant
+        donor_read_cache : dict
+            Already fetched donor reads per sample and context window
+        acceptor_contexts : list of OverlapContext
+            Already established acceptor context per sample variant. The
+            donor alignment file is not opened if the donor and acceptor
+            contexts and the donor reads are all provided.
+        acceptor_read_cache : dict
+            Already fetched acceptor reads per context window
         """
-        try:
-            donorbamfile = pysam.AlignmentFile(dbamfileloc, reference_filename=referenceloc)
-        except IOError:
-            self.vaselogger.warning(f"Could not open {dbamfileloc} ; Skipping {sampleid}")
-            return
+        donorbamfile = None
+        if donor_contexts is None or donor_read_cache is None or acceptor_contexts is None:
+            try:
+                donorbamfile = pysam.AlignmentFile(dbamfileloc, reference_filename=referenceloc)
+            except IOError:
+                self.vaselogger.warning(f"Could not open {dbamfileloc} ; Skipping {sampleid}")
+                return
+        if donor_contexts is None:
+            donor_contexts = [None] * len(samplevariants)
+        if acceptor_contexts is None:
+            acceptor_contexts = [None] * len(samplevariants)
 
         # Iterate over the sample variants
-        for samplevariant in samplevariants:
+        for samplevariant, dcontext, acontext in zip(samplevariants, donor_contexts,
+                                                     acceptor_contexts):
             variantcontext = self.bvcs_process_variant(sampleid, samplevariant[0],
-                                                       abamfile, donorbamfile)
+                                                       abamfile, donorbamfile, dcontext,
+                                                       donor_read_cache, acontext,
+                                                       acceptor_read_cache)
             if not variantcontext:
                 self.vaselogger.info("Could not establish variant context; Skipping.")
                 continue
@@ -1237,8 +2457,11 @@ class VaSeBuilder:
             variantcontextfile.remove_variant_context(varcon_collided.get_variant_context_id())
             variantcontextfile.add_existing_variant_context(variantcontext.get_variant_context_id(),
                                                             variantcontext)
+        if donorbamfile is not None:
+            donorbamfile.close()
 
-    def bvcs_process_variant(self, sampleid, samplevariant, abamfile, dbamfile):
+    def bvcs_process_variant(self, sampleid, samplevariant, abamfile, dbamfile, dcontext=None,
+                             donor_read_cache=None, acontext=None, acceptor_read_cache=None):
         """Process a variant and return the established variant context.
 
         Parameters
@@ -1251,13 +2474,62 @@ class VaSeBuilder:
             Already opened pysam AlignmentFile to use as acceptor
         dbamfile : pysam.AlignmentFile
             Already opened pysam AlignmentFile to use as donor
+        dcontext : OverlapContext
+            Already established donor context, established here if None
+        donor_read_cache : dict
+            Already fetched donor reads per sample and context window
+        acontext : OverlapContext
+            Already established acceptor context, established here if None
+        acceptor_read_cache : dict
+            Already fetched acceptor reads per context window
 
         Returns
         -------
         vcontext : VariantContext or None
             The established variant context, None if context could not be established
         """
-        # Establish the donor context
+        # Establish the donor and acceptor context
+        if dcontext is None:
+            dcontext = self.bvcs_establish_donor_context(sampleid, samplevariant, dbamfile)
+            if not dcontext:
+                return None
+        if acontext is None:
+            acontext = self.bvcs_establish_acceptor_context(sampleid, samplevariant, abamfile,
+                                                            dcontext)
+        variantid = self.get_vcf_variant_id(samplevariant)
+
+        # Determine the variant context.
+        self.debug_msg("cc", variantid)
+        start_time = time.time()
+        vcontext = self.bvcs_establish_variant_context(sampleid, variantid, samplevariant,
+                                                       samplevariant.pos, acontext, dcontext,
+                                                       abamfile, dbamfile, donor_read_cache,
+                                                       acceptor_read_cache)
+        self.debug_msg("cc", variantid, start_time)
+        if vcontext is not None:
+            self.vaselogger.debug(f"Combined context determined to be "
+                                  f"{vcontext.get_variant_context_chrom()}:"
+                                  f"{vcontext.get_variant_context_start()}-"
+                                  f"{vcontext.get_variant_context_end()}")
+        return vcontext
+
+    def bvcs_establish_donor_context(self, sampleid, samplevariant, dbamfile):
+        """Establish and return the donor context of a variant.
+
+        Parameters
+        ----------
+        sampleid : str
+            Sample name/identifier
+        samplevariant : pysam.VariantRecord
+            Variant to establish the donor context for
+        dbamfile : pysam.AlignmentFile
+            Already opened pysam AlignmentFile to use as donor
+
+        Returns
+        -------
+        dcontext : OverlapContext or None
+            The established donor context, None if context could not be established
+        """
         variantid = self.get_vcf_variant_id(samplevariant)
         varianttype = self.determine_variant_type(samplevariant.start, samplevariant.stop)
 
@@ -1280,8 +2552,30 @@ class VaSeBuilder:
         self.debug_msg("dc", variantid, start_time)
         self.vaselogger.debug(f"Donor context determined to be {dcontext.get_context_chrom()}:"
                               f"{dcontext.get_context_start()}-{dcontext.get_context_end()}")
+        return dcontext
+
+    def bvcs_establish_acceptor_context(self, sampleid, samplevariant, abamfile, dcontext):
+        """Establish and return the acceptor context of a variant.
+
+        Parameters
+        ----------
+        sampleid : str
+            Sample name/identifier
+        samplevariant : pysam.VariantRecord
+            Variant to establish the acceptor context for
+        abamfile : pysam.AlignmentFile
+            Already opened pysam AlignmentFile to use as acceptor
+        dcontext : OverlapContext
+            Established donor context, used as window if no acceptor context
+            could be determined
 
-        # Determine the acceptor context.
+        Returns
+        -------
+        acontext : OverlapContext
+            The established acceptor context
+        """
+        variantid = self.get_vcf_variant_id(samplevariant)
+        searchwindow = [samplevariant.pos, samplevariant.stop]
         self.debug_msg("ac", variantid)
         start_time = time.time()
         acontext = self.bvcs_establish_context(sampleid, variantid, samplevariant.chrom,
@@ -1290,23 +2584,11 @@ class VaSeBuilder:
         self.debug_msg("ac", variantid, start_time)
         self.vaselogger.debug(f"Acceptor context determined to be {acontext.get_context_chrom()}:"
                               f"{acontext.get_context_start()}-{acontext.get_context_end()}")
-
-        # Determine the variant context.
-        self.debug_msg("cc", variantid)
-        start_time = time.time()
-        vcontext = self.bvcs_establish_variant_context(sampleid, variantid, samplevariant,
-                                                       samplevariant.pos, acontext, dcontext,
-                                                       abamfile, dbamfile)
-        self.debug_msg("cc", variantid, start_time)
-        if vcontext is not None:
-            self.vaselogger.debug(f"Combined context determined to be "
-                                  f"{vcontext.get_variant_context_chrom()}:"
-                                  f"{vcontext.get_variant_context_start()}-"
-                                  f"{vcontext.get_variant_context_end()}")
-        return vcontext
+        return acontext
 
     def bvcs_establish_variant_context(self, sampleid, variantid, variant, variantpos,
-                                       acontext, dcontext, abamfile, dbamfile):
+                                       acontext, dcontext, abamfile, dbamfile,
+                                       donor_read_cache=None, acceptor_read_cache=None):
         """Establish and return a variant context.
 
         The variant context window is established based on the acceptor and
@@ -1329,6 +2611,10 @@ class VaSeBuilder:
             Already opened pysam AlignmentFile used as acceptor
         dbamfile : pysam.AlignmentFile
             Already opened pysam AlignmentFile used as donor
+        donor_read_cache : dict
+            Already fetched donor reads per sample and context window
+        acceptor_read_cache : dict
+            Already fetched acceptor reads per context window
 
         Returns
         -------
@@ -1345,15 +2631,22 @@ class VaSeBuilder:
         # Gather variant context donor reads.
         self.debug_msg("cdr", variantid)
         start_time = time.time()
-        vcontext_dreads = self.get_variant_reads(vcontext_window[0], vcontext_window[2],
-                                                 vcontext_window[3], dbamfile)
+        cache_key = (sampleid, vcontext_window[0], vcontext_window[2], vcontext_window[3])
+        if donor_read_cache is not None and cache_key in donor_read_cache:
+            vcontext_dreads = list(donor_read_cache[cache_key])
+        else:
+            vcontext_dreads = self.get_variant_reads(vcontext_window[0], vcontext_window[2],
+                                                     vcontext_window[3], dbamfile)
         self.debug_msg("cdr", variantid, start_time)
 
         # Gather variant context acceptor reads.
         self.debug_msg("car", variantid)
         start_time = time.time()
-        vcontext_areads = self.get_variant_reads(vcontext_window[0], vcontext_window[2],
-                                                 vcontext_window[3], abamfile)
+        if acceptor_read_cache is not None and cache_key[1:] in acceptor_read_cache:
+            vcontext_areads = list(acceptor_read_cache[cache_key[1:]])
+        else:
+            vcontext_areads = self.get_variant_reads(vcontext_window[0], vcontext_window[2],
+                                                     vcontext_window[3], abamfile)
         self.debug_msg("car", variantid, start_time)
 
         variant_context = VariantContext(variantid, sampleid, *vcontext_window, vcontext_areads,
@@ -1533,36 +2826,13 @@ class VaSeBuilder:
             self.vaselogger.warning(f"Could not write P-mode link file {plinkloc} "
                                     f"for run {self.creation_id}")
 
-    @staticmethod
-    def shuffle_donor_read_identifiers(donorreads, seed=2):
-        """Shuffle and return a list of donor read identifiers.
-
-        Prior to shuffling the donor read identifiers, the provided donor
-        read list is copied to preserve the original. The new list is then
-        sorted and a seed is set to ensure that the shuffling can be
-        reproduced if the same data is used.
-
-        Parameters
-        ----------
-        donorreads :
-            Donor read identifiers to shuffle
-        s: int
-            Seed to set for shuffling (default = 2)
-
-        Returns
-        -------
-        shuffled_donor_reads : list of str
-            Shuffled donor read identifiers
-        """
-        shuffled_donor_reads = donorreads.copy()
-        shuffled_donor_reads.sort()
-
-        random.seed(seed)
-        random.shuffle(shuffled_donor_reads)
-        return shuffled_donor_reads
+    def get_donor_add_positions(self, num_of_template_reads, num_of_donor_reads, seed,
+                                fastq_outpath):
+        """Return random donor read add positions for a validation fastq file.
 
-    def shuffle_donor_add_positions(self, num_of_template_reads, num_of_donor_reads, seed=2):
-        """Shuffle FASTQ donor read add positions.
+        The positions are drawn from the random generator of the output lane
+        of the validation fastq file, so they do not depend on the order in
+        which lanes are written, and are the same for the R1 and R2 file.
 
         Parameters
         ----------
@@ -1570,36 +2840,21 @@ class VaSeBuilder:
             Number of template reads in the acceptor
         num_of_donor_reads : int
             Number of donor reads to be added
-        s : int
-            Seed to set for shuffling (default = 2)
+        seed : int
+            Random seed of the validation set
+        fastq_outpath : str
+            Path to the R1 or R2 validation fastq file
 
         Returns
         -------
-        add_positions : list of int
+        numpy.ndarray of numpy.int64
             Shuffled positions in fastq file to add donor reads to
         """
-        random.seed(seed)
-        self.vaselogger.debug(f"Semi random donor add positions seed set to {seed}")
-        add_positions = []
-
-        # Check whether the number of donor reads to add exceeds the number
-        # of acceptor reads in the template.
-        if num_of_donor_reads > num_of_template_reads:
-            self.vaselogger.debug("Found more donor reads to add than")
-            random_sample_size = num_of_donor_reads
-            while random_sample_size > 0:
-                pos_to_add = []
-                if random_sample_size >= num_of_template_reads:
-                    pos_to_add = random.sample(range(0, num_of_template_reads),
-                                               num_of_template_reads)
-                else:
-                    pos_to_add = random.sample(range(0, num_of_template_reads),
-                                               random_sample_size)
-                add_positions.extend(pos_to_add)
-                random_sample_size = random_sample_size - num_of_template_reads
-            return add_positions
-        add_positions = random.sample(range(0, num_of_template_reads), num_of_donor_reads)
-        return add_positions
+        output_name, lane = PlacementEngine.get_output_lane(fastq_outpath)
+        self.vaselogger.debug(f"Drawing donor add positions for {output_name} lane {lane} "
+                              f"with seed {seed}")
+        return PlacementEngine(seed).get_add_positions(num_of_template_reads, num_of_donor_reads,
+                                                       output_name, lane)
 
     @staticmethod
     def read_is_hard_clipped(fetchedread):
@@ -1624,6 +2879,8 @@ class VaSeBuilder:
         """Return the number of reads in the template fastq file.
 
         The returned number is divided by 4 as each read entry consists of four lines.
+        If the template has a fresh index sidecar, the saved record count is
+        returned instead.
 
         Parameters
         ----------
@@ -1635,12 +2892,89 @@ class VaSeBuilder:
         int
             Number of read entries in the template fastq file
         """
+        template_index = TemplateIndex.read_fresh_index(templatefqloc)
+        if template_index is not None:
+            return template_index.num_of_records
         line_count = 0
         with gzip.open(templatefqloc, "r") as templatefq:
             for _ in templatefq:
                 line_count += 1
         return int(line_count/4)
 
+    def index_templates(self, template_fqs, checkpoint_interval=100000, verify=False):
+        """Build and write an index sidecar for each template fastq file.
+
+        Parameters
+        ----------
+        template_fqs : list of str
+            Paths to the template fastq files to index
+        checkpoint_interval : int
+            Number of records between two saved record offsets
+        verify : bool
+            Whether to check existing indexes against their whole template
+            and only build missing or mismatching ones
+        """
+        if verify:
+            template_fqs = [x for x in template_fqs
+                            if TemplateIndex.read_fresh_index(x, full=True) is None]
+            self.vaselogger.info(f"{len(template_fqs)} template indexes are missing or outdated")
+        num_of_processes = min(self.threads, len(template_fqs))
+        if num_of_processes > 1:
+            with ProcessPoolExecutor(max_workers=num_of_processes) as index_pool:
+                template_indexes = list(index_pool.map(TemplateIndex.build, template_fqs,
+                                                       [checkpoint_interval] * len(template_fqs)))
+        else:
+            template_indexes = [TemplateIndex.build(x, checkpoint_interval) for x in template_fqs]
+        for template_index in template_indexes:
+            index_path = TemplateIndex.get_index_path(template_index.template_fq)
+            try:
+                template_index.write_index(index_path)
+            except IOError:
+                self.vaselogger.critical(f"Could not write template index {index_path}")
+                sys.exit()
+            self.vaselogger.info(f"Indexed {template_index.num_of_records} reads of "
+                                 f"{template_index.template_fq} to {index_path}")
+
+    def query_insert_positions(self, insert_log_path, outpath, read_ids=None, fastq_files=None):
+        """Write the logged insert positions of selected donor reads and validation fastqs.
+
+        Parameters
+        ----------
+        insert_log_path : str
+            Path to the .npz donor read insert position log
+        outpath : str
+            Path and name to write the selected insert positions to
+        read_ids : list of str
+            Donor read identifiers to select, all reads if None
+        fastq_files : list of str
+            R1 or R2 validation fastq files to select, all files if None
+        """
+        try:
+            insert_log = InsertPositionLog.read_columns(insert_log_path)
+        except (IOError, ValueError, KeyError):
+            self.vaselogger.critical(f"Could not read donor read insert position log "
+                                     f"{insert_log_path}")
+            sys.exit()
+        fastq_prefixes = None
+        if fastq_files is not None:
+            fastq_prefixes = [x.split(".")[0][:-3] for x in fastq_files]
+        num_of_rows = 0
+        try:
+            with open(outpath, "w") as queryfile:
+                queryfile.write("ReadId\tR1_InsertPos\tFastqR1Out\tR2_InsertPos\tFastqR2Out\n")
+                for fastqout, readid, r1_insertpos, r2_insertpos in insert_log.query(
+                        read_ids, fastq_prefixes):
+                    r1_insertpos = "NA" if r1_insertpos is None else r1_insertpos
+                    r2_insertpos = "NA" if r2_insertpos is None else r2_insertpos
+                    queryfile.write(f"{readid}\t{r1_insertpos}\t{fastqout}_R1.fastq\t"
+                                    f"{r2_insertpos}\t{fastqout}_R2.fastq\n")
+                    num_of_rows += 1
+        except IOError:
+            self.vaselogger.critical(f"Could not write donor read insert positions to {outpath}")
+            sys.exit()
+        self.vaselogger.info(f"Wrote {num_of_rows} of {len(insert_log)} donor read insert "
+                             f"positions to {outpath}")
+
     def build_fastq_v2(self, acceptorfq_filepaths, acceptorreads_toskip, donor_context_reads,
                        forward_or_reverse, vasefq_outpath, random_seed, donor_read_insert_data):
         """Build and write a set of validation fastq files.
@@ -1648,17 +2982,17 @@ class VaSeBuilder:
         A set of validation fastq files is build using a set of
         template/acceptor fastq files. Acceptor reads will be filtered from
         these file via read identifier and donor reads will be added. Donor
-        reads reads will be added at semi-random positions. The random.seed()
-        method is used to ensure reproducibility as using the same data (in
-        the same order) and the same seed results in the same shuffle.
+        reads reads will be added at semi-random positions drawn from the
+        random generator of the output lane, so using the same data and the
+        same seed results in the same positions.
 
         Parameters
         ----------
         acceptorfq_filepaths : list of str
             Paths to template fastq files to use
-        acceptorreads_toskip : list of str
+        acceptorreads_toskip : AcceptorSkipSet
             Identifiers of acceptor reads to skip
-        donor_context_reads : list of tuple
+        donor_context_reads : DonorReadStore or list of tuple
             Donor reads to add to the validation fastq files
         forward_or_reverse : str
             Write forward ('1') or reverse ('2')
@@ -1666,20 +3000,20 @@ class VaSeBuilder:
             Path to write VaSeBuilder validation fastq files to
         """
         # Split all donor reads to add over the template fastq files
-        donor_read_ids = [x[0] for x in donor_context_reads]
-        donor_read_ids.sort()
-        donor_read_ids = list(set(donor_read_ids))
+        donor_context_reads = DonorReadStore.from_read_data(donor_context_reads)
+        donor_read_ids = donor_context_reads.get_read_ids()
         # self.vaselogger.debug(f"Donor read ids: {donor_read_ids}")
         distributed_read_ids = self.divide_donorfastqs_over_acceptors(donor_read_ids,
                                                                       len(acceptorfq_filepaths))
         # self.vaselogger.debug(f"Distributed read ids: {distributed_read_ids}")
 
         # Iterate over the R1/R2 fastq in files to use as templates for the
+        lane_jobs = []
         for i in range(0, len(acceptorfq_filepaths)):
             # Collect the donor reads to write.
             add_donor_ids = distributed_read_ids[i]
             self.vaselogger.debug(f"Distributed read ids: {add_donor_ids}")
-            add_donor_reads = [x for x in donor_context_reads if x[0] in add_donor_ids]
+            add_donor_reads = donor_context_reads.subset(add_donor_ids)
             self.vaselogger.debug(f"Will add {len(add_donor_ids)} donor reads")
 
             # Write the new VaSe FastQ file.
@@ -1687,12 +3021,12 @@ class VaSeBuilder:
             self.vaselogger.debug(f"Set FastQ output path to: {vasefq_outname}")
 
             # Check whether to add the fastq file name into the donor read insert position map
-            if vasefq_outname.split(".")[0][:-3] not in donor_read_insert_data:
-                donor_read_insert_data[vasefq_outname.split(".")[0][:-3]] = {}
+            donor_read_insert_data.add_fastq(vasefq_outname.split(".")[0][:-3])
 
-            self.write_vase_fastq_v2(acceptorfq_filepaths[i], vasefq_outname,
-                                     acceptorreads_toskip, add_donor_reads, add_donor_ids,
-                                     forward_or_reverse, random_seed, donor_read_insert_data)
+            lane_jobs.append((self.write_vase_fastq_v2,
+                              (acceptorfq_filepaths[i], vasefq_outname, acceptorreads_toskip,
+                               add_donor_reads, add_donor_ids, forward_or_reverse, random_seed)))
+        self.run_lane_jobs(lane_jobs, donor_read_insert_data)
 
     def write_vase_fastq_v2(self, acceptor_infq, fastq_outpath,
                             acceptorreads_toskip, donorbamreaddata,
@@ -1705,67 +3039,63 @@ class VaSeBuilder:
             Path to
         fastq_outpath : str
             Path to write VaSeBuilder validation fastq file to
-        acceptorreads_toskip : list of str
+        acceptorreads_toskip : AcceptorSkipSet
             Acceptor read identifiers to exclude from the validation fastq file
-        donorbamreaddata : list of tuple
+        donorbamreaddata : DonorReadStore or list of tuple
             Donor reads to writes
         fr : str
             Forward('1') or reverse ('2') fastq file
         """
         fastq_prefix = fastq_outpath.split(".")[0][:-3]
+        donor_read_insert_data.add_fastq(fastq_prefix)
         try:
-            fqgz_outfile = io.BufferedWriter(open(fastq_outpath, "wb"))
+            fqgz_outfile = self.open_validation_output(fastq_outpath, fr)
             self.vaselogger.debug(f"Writing data to validation fastq {fastq_outpath}")
 
-            cur_line_index = -1    # Current read position in the template fastq
+            cur_read_index = -1    # Current read position in the template fastq
             cur_add_index = 0    # Current read position in the validation fastq
 
             # Determine where to semi randomly add the donor reads in the fastq
             num_of_template_reads = self.check_template_size(acceptor_infq)
             self.vaselogger.debug(f"Template has {num_of_template_reads} reads")
-            donor_add_positions = self.shuffle_donor_add_positions(num_of_template_reads,
-                                                                   len(donor_readids),
-                                                                   random_seed)
+            donor_add_positions = self.get_donor_add_positions(num_of_template_reads,
+                                                               len(donor_readids), random_seed,
+                                                               fastq_outpath)
             # self.vaselogger.debug(f"Add positions for {fastq_outpath} = {donor_add_positions}")
-            donor_reads_to_addpos = self.link_donor_addpos_reads_v2(donor_add_positions,
-                                                                    donor_readids,
-                                                                    donorbamreaddata)
-            # self.vaselogger.debug(f"Read to add pos for {fastq_outpath} = "
-            #                       f"{donor_reads_to_addpos}")
+            donor_read_store = DonorReadStore.from_read_data(donorbamreaddata)
+            donor_insert_queue = DonorInsertQueue(donor_add_positions, donor_readids)
+            next_insert_index = donor_insert_queue.next_position
 
             # Open the template fastq and write filtered data to a new fastq.gz file.
             fqgz_infile = io.BufferedReader(gzip.open(acceptor_infq, "rb"))
             self.vaselogger.debug(f"Opened template FastQ: {acceptor_infq}")
             for fileline in fqgz_infile:
-                cur_line_index += 1
                 # Check if we are located at a read identifier.
                 if not fileline.startswith(b"@"):
                     continue
-                if fileline.decode("utf-8").split()[0][1:] not in acceptorreads_toskip:
-                    fqgz_outfile.write(fileline)
-                    fqgz_outfile.write(next(fqgz_infile))
-                    fqgz_outfile.write(next(fqgz_infile))
-                    fqgz_outfile.write(next(fqgz_infile))
+                cur_read_index += 1
+                fqrecord_lines = next(fqgz_infile) + next(fqgz_infile) + next(fqgz_infile)
+                if fileline.split()[0][1:] not in acceptorreads_toskip:
+                    fqgz_outfile.write_template(fileline, fqrecord_lines)
                     cur_add_index += 1
                 else:
                     self.vaselogger.debug(f"Skipping acceptor read {fileline}")
 
                 # Check if we need to add a donor read at the current position
-                if cur_line_index not in donor_reads_to_addpos:
+                if cur_read_index < next_insert_index:
                     continue
-                # self.vaselogger.debug(f"{cur_line_index} is in list of positions to add donor")
-                for donorread in donor_reads_to_addpos[cur_line_index]:
-                    if donorread[1] == fr:
-                        fqlines = ("@" + str(donorread[0]) + "\n"
-                                   + str(donorread[2]) + "\n"
-                                   + "+\n"
-                                   + str(donorread[3]) + "\n")
-                        fqgz_outfile.write(fqlines.encode("utf-8"))
+                for donorreadid in donor_insert_queue.pop_position(cur_read_index):
+                    for donorread in donor_read_store.get_pair_reads(donorreadid, fr):
+                        fqgz_outfile.write_donor_read(donorread)
                         cur_add_index += 1
                         # self.vaselogger.debug(f"Added donor read {donorread[0]}/{donorread[1]} "
                         #                       f"at {cur_add_index}")
-                        self.add_donor_insert_data(fastq_prefix, donorread[0], fr,
-                                                   cur_add_index, donor_read_insert_data)
+                        self.record_validation_insert(
+                            fastq_prefix, donorread[0], fr,
+                            self.get_output_position(fqgz_outfile, cur_add_index),
+                            donor_read_insert_data
+                            )
+                next_insert_index = donor_insert_queue.next_position
             fqgz_infile.close()
 
             fqgz_outfile.flush()
@@ -1790,7 +3120,7 @@ class VaSeBuilder:
             Positions in validation fastq to add donor reads at
         donor_read_ids : list of str
 
-        donor_reads : list of tuple
+        donor_reads : DonorReadStore, dict or list of tuple
             Donor reads to add to validation fastq
 
         Returns
@@ -1798,11 +3128,12 @@ class VaSeBuilder:
         add_posread_link : dict of list
             Donor reads to add per add position
         """
+        donor_read_store = DonorReadStore.from_read_data(donor_reads)
         add_posread_link = {}
         for addpos, dread_id in zip(donor_addpos, donor_read_ids):
             if addpos not in add_posread_link:
                 add_posread_link[addpos] = []
-            add_posread_link[addpos].extend([x for x in donor_reads if x[0] == dread_id])
+            add_posread_link[addpos].extend(donor_read_store.get_reads(dread_id))
         return add_posread_link
 
     def read_donor_fastq(self, donor_fastq, forward_reverse, donor_read_data):
@@ -1828,7 +3159,7 @@ class VaSeBuilder:
                     if dfqfileline.startswith("@"):
                         dfq_readid = dfqfileline[1:].strip()
                         dfq_readseq = next(dfqfile).strip()
-                        # dfq_optline = next(dfqfile).strip()
+                        next(dfqfile)
                         dfq_readqual = next(dfqfile).strip()
                         if dfq_readid not in donor_read_data:
                             donor_read_data[dfq_readid] = []
@@ -1838,7 +3169,8 @@ class VaSeBuilder:
             self.vaselogger.debug(f"Could not read donor fastq file {donor_fastq}")
         return donor_read_data
 
-    def run_ac_mode_v2(self, afq1_in, afq2_in, dfqs, varconfile, random_seed, outpath):
+    def run_ac_mode_v2(self, afq1_in, afq2_in, dfqs, varconfile, random_seed, outpath,
+                       exact_skip=False):
         """Run VaSeBuilder AC-mode.
 
         This run mode builds a set of validation fastq files by adding already
@@ -1859,15 +3191,16 @@ class VaSeBuilder:
             Variant context to use for filtering out acceptor reads
         outpath: str
             Path to folder to write the output to
+        exact_skip : bool
+            Confirm hashed acceptor read skips against the read IDs
         """
         self.vaselogger.info("Running VaSeBuilder AC-mode")
         # Split the donor fastqs into an R1 and R2 group
         r1_dfqs = [dfq[0] for dfq in dfqs]
         r2_dfqs = [dfq[1] for dfq in dfqs]
 
-        # Get the list of acceptor reads to exclude
-        skip_list = varconfile.get_all_variant_context_acceptor_read_ids()
-        skip_list.sort()
+        # Get the set of acceptor reads to exclude
+        skip_list = self.build_acceptor_skip_set(varconfile, exact_skip)
 
         # Read all the donor read fastq data
         donor_reads = {}
@@ -1884,16 +3217,20 @@ class VaSeBuilder:
                                                                             len(afq1_in))
 
         # Iterate over the acceptor fastq files
-        donor_read_add_data = {}
-        for fr_i, afq_i in zip(["1", "2"], [afq1_in, afq2_in]):
-            self.build_fastqs_from_donors_v2(afq_i, skip_list, distributed_donor_read_ids,
-                                             donor_reads, fr_i, random_seed, outpath,
-                                             donor_read_add_data)
+        donor_read_add_data = InsertPositionLog()
+        if self.is_interleaved():
+            self.build_interleaved_fastqs(afq1_in, afq2_in, skip_list, distributed_donor_read_ids,
+                                          donor_reads, random_seed, outpath, donor_read_add_data)
+        else:
+            for fr_i, afq_i in zip(["1", "2"], [afq1_in, afq2_in]):
+                self.build_fastqs_from_donors_v2(afq_i, skip_list, distributed_donor_read_ids,
+                                                 donor_reads, fr_i, random_seed, outpath,
+                                                 donor_read_add_data)
         self.write_donor_insert_positions_v2(donor_read_add_data,
                                              f"{outpath}_donor_read_insert_positions.txt")
 
     def run_ac_mode_v25(self, afq1_in, afq2_in, donor_bams, variant_context_file,
-                        random_seed, outpath):
+                        random_seed, outpath, exact_skip=False):
         """Run VaSeBuilder AB-mode.
 
         Parameters
@@ -1910,32 +3247,40 @@ class VaSeBuilder:
             Seed value to use for random read insertion
         outpath : str
             Folder to write output files to
+        exact_skip : bool
+            Confirm hashed acceptor read skips against the read IDs
         """
         # Get all acceptor read identifiers
-        acceptor_skip_list = variant_context_file.get_all_variant_context_acceptor_read_ids()
-        acceptor_skip_list.sort()
+        acceptor_skip_list = self.build_acceptor_skip_set(variant_context_file, exact_skip)
 
         # Read all the donor BAM files
-        donor_reads = {}
-        for dbamfile in donor_bams:
-            donor_reads = self.read_donor_bam_v3(dbamfile, donor_reads)
+        donor_reads = self.read_donor_bams(donor_bams)
         donor_read_ids = list(donor_reads.keys())
         donor_read_ids.sort()
 
         distributed_donor_read_ids = self.divide_donorfastqs_over_acceptors(donor_read_ids,
                                                                             len(afq1_in))
 
-        donor_read_add_data = {}
-        for fr_i, afq_i in zip(["1", "2"], [afq1_in, afq2_in]):
-            self.build_fastqs_from_donors_v2(afq_i, acceptor_skip_list, distributed_donor_read_ids,
-                                             donor_reads, fr_i, random_seed, outpath,
-                                             donor_read_add_data)
+        donor_read_add_data = InsertPositionLog()
+        if self.is_interleaved():
+            self.build_interleaved_fastqs(afq1_in, afq2_in, acceptor_skip_list,
+                                          distributed_donor_read_ids, donor_reads, random_seed,
+                                          outpath, donor_read_add_data)
+        else:
+            for fr_i, afq_i in zip(["1", "2"], [afq1_in, afq2_in]):
+                self.build_fastqs_from_donors_v2(afq_i, acceptor_skip_list,
+                                                 distributed_donor_read_ids, donor_reads, fr_i,
+                                                 random_seed, outpath, donor_read_add_data)
         self.write_donor_insert_positions_v2(donor_read_add_data,
                                              f"{outpath}_donor_read_insert_positions.txt")
 
     def read_donor_bam_v3(self, path_to_donorbam, donorreaddata):
         """Read a provided BAM file and add the reads from the file.
 
+        Reads are saved per read identifier as an [R1, R2] list. Additional
+        R1 or R2 reads with the same identifier are appended after these, so
+        that the read pair is recognized as incorrect.
+
         Parameters
         ----------
         path_to_donorbam : str
@@ -1948,48 +3293,205 @@ class VaSeBuilder:
         donorreaddata : dict
             Updated donor read data with added reads from BAM file
         """
-        rep_dict = {"a": "t", "c": "g", "g": "c", "t": "a", "n": "n",
-                    "A": "T", "C": "G", "G": "C", "T": "A", "N": "N"}
-        readnum = 0
+        for donor_read_tuple in self.read_donor_bam_tuples(path_to_donorbam):
+            self.add_donor_read_tuple(donor_read_tuple, donorreaddata)
+        return donorreaddata
+
+    def read_donor_bams(self, donor_bams, library_contexts=None):
+        """Read the reads from all provided donor BAM files.
+
+        With more than one thread the BAM files are read in a process pool.
+        Each worker returns the reads of a BAM file as string tuples, which
+        are added in the order of the provided BAM files, so the result is
+        the same as reading the files one after another.
+
+        Parameters
+        ----------
+        donor_bams : list of str
+            Paths to the BAM donor files to read
+        library_contexts : list of str
+            Variant contexts to read from spike-in library BAM files, None if
+            the BAM files are no spike-in libraries
+
+        Returns
+        -------
+        donor_read_data : dict
+            Donor reads per read identifier as [R1, R2] lists
+        """
+        donor_read_data = {}
+        for donor_read_tuples in self.iter_donor_bam_tuples(donor_bams, library_contexts):
+            for donor_read_tuple in donor_read_tuples:
+                self.add_donor_read_tuple(donor_read_tuple, donor_read_data)
+        return donor_read_data
+
+    def iter_donor_bam_tuples(self, donor_bams, library_contexts=None):
+        """Yield the reads of each donor BAM file as string tuples.
+
+        With a single thread, the reads of each BAM file are yielded by a
+        generator while they are read. With more than one thread the BAM
+        files are read in a process pool, with at most one BAM file per
+        process read ahead of the consumed reads. The reads are yielded in
+        the order of the provided BAM files.
+
+        Parameters
+        ----------
+        donor_bams : list of str
+            Paths to the BAM donor files to read
+        library_contexts : list of str
+            Variant contexts to read from spike-in library BAM files, None if
+            the BAM files are no spike-in libraries
+
+        Yields
+        ------
+        iterable of tuple
+            Donor reads of a BAM file in BAM file order
+        """
+        if library_contexts is not None:
+            for library_bam in donor_bams:
+                self.vaselogger.debug(f"Start reading spike-in library {library_bam}")
+                yield self.read_library_bam_tuples(library_bam, library_contexts)
+            return
+
+        num_of_processes = min(self.threads, len(donor_bams))
+        if num_of_processes <= 1:
+            for dbamfile in donor_bams:
+                self.vaselogger.debug(f"Start reading BAM donor file {dbamfile}")
+                yield self.iter_donor_read_tuples(dbamfile)
+            return
+
+        self.vaselogger.debug(f"Reading {len(donor_bams)} BAM donor files using "
+                              f"{num_of_processes} processes")
+        with ProcessPoolExecutor(max_workers=num_of_processes) as bam_pool:
+            bam_futures = deque()
+            for dbamfile in donor_bams:
+                bam_futures.append(bam_pool.submit(self.read_donor_bam_tuples, dbamfile))
+                if len(bam_futures) > num_of_processes:
+                    yield bam_futures.popleft().result()
+            while bam_futures:
+                yield bam_futures.popleft().result()
+
+    def read_library_bam_tuples(self, library_bam, library_contexts):
+        """Yield the reads of variant contexts in a spike-in library as string tuples.
+
+        Only the BAM byte ranges of the variant contexts in the library
+        context index are read. Reads of several selected variant contexts
+        are yielded once.
+
+        Parameters
+        ----------
+        library_bam : str
+            Path to the spike-in library BAM file
+        library_contexts : list of str
+            Variant contexts to read the donor reads of
+
+        Yields
+        ------
+        tuple
+            Donor read in BAM file order
+        """
         try:
-            dbamfile = pysam.AlignmentFile(path_to_donorbam, "rb")
-            for donorread in dbamfile.fetch():
-
-                donor_read_qualities = "".join([chr(x+33) for x in donorread.query_qualities])
-
-                # Check if the read is read 1 or 2
-                donor_read_fr = "2"
-                if donorread.is_read1:
-                    donor_read_fr = "1"
-
-                # Check alignment direction.
-                if donorread.is_reverse:
-                    donor_seq = ""
-                    for nt in donorread.query_sequence[::-1]:
-                        donor_seq += rep_dict[nt]
-                    donor_read_qualities = donor_read_qualities[::-1]
-                else:
-                    donor_seq = donorread.query_sequence
-
-                # Check where to add the read to
-                if donorread.query_name not in donorreaddata:
-                    donorreaddata[donorread.query_name] = []
-                if donor_read_fr == "1":
-                    donorreaddata[donorread.query_name].insert(0, tuple([donorread.query_name,
-                                                                         donor_read_fr,
-                                                                         donor_seq,
-                                                                         donor_read_qualities]))
-                else:
-                    donorreaddata[donorread.query_name].append(tuple([donorread.query_name,
-                                                                      donor_read_fr,
-                                                                      donor_seq,
-                                                                      donor_read_qualities]))
-                readnum += 1
-            dbamfile.close()
+            library_index = SpikeInLibraryIndex.read(
+                SpikeInLibraryIndex.get_index_path(library_bam)
+                )
+            library_contexts = {x for x in library_contexts if x in library_index}
+            read_keys = set()
+            with pysam.AlignmentFile(library_bam, "rb") as lbamfile:
+                for bam_start, bam_end in library_index.get_byte_ranges(library_contexts):
+                    lbamfile.seek(bam_start)
+                    while lbamfile.tell() < bam_end:
+                        library_read = next(lbamfile)
+                        read_key = (library_read.query_name, library_read.is_read1)
+                        if (library_read.get_tag(self.LIBRARY_CONTEXT_TAG) in library_contexts
+                                and read_key not in read_keys):
+                            read_keys.add(read_key)
+                            yield self.get_donor_read_tuple(library_read)
+        except IOError:
+            self.vaselogger.warning(f"Could not read spike-in library {library_bam}")
+
+    def iter_donor_read_tuples(self, path_to_donorbam):
+        """Yield the reads of a donor BAM file as string tuples while reading it.
+
+        Parameters
+        ----------
+        path_to_donorbam : str
+            Path to BAM donor file to read
+
+        Yields
+        ------
+        tuple
+            Donor read in BAM file order
+        """
+        num_of_reads = 0
+        try:
+            with pysam.AlignmentFile(path_to_donorbam, "rb") as dbamfile:
+                for donorread in dbamfile.fetch():
+                    yield self.get_donor_read_tuple(donorread)
+                    num_of_reads += 1
         except IOError:
             self.vaselogger.warning(f"Could not read donor BAM file {path_to_donorbam}")
-        self.vaselogger.debug(f"Read {readnum} donor reads from {path_to_donorbam}")
-        return donorreaddata
+        self.vaselogger.debug(f"Read {num_of_reads} donor reads from {path_to_donorbam}")
+
+    def read_donor_bam_tuples(self, path_to_donorbam):
+        """Read and return the reads of a donor BAM file as string tuples.
+
+        Parameters
+        ----------
+        path_to_donorbam : str
+            Path to BAM donor file to read
+
+        Returns
+        -------
+        list of tuple
+            Donor reads in BAM file order
+        """
+        return list(self.iter_donor_read_tuples(path_to_donorbam))
+
+    @staticmethod
+    def add_donor_read_tuple(donor_read_tuple, donorreaddata):
+        """Add a donor read to the R1 or R2 slot of its read identifier.
+
+        Parameters
+        ----------
+        donor_read_tuple : tuple of str
+            Read identifier, pair number, sequence and qualities
+        donorreaddata : dict
+            Donor reads per read identifier as [R1, R2] lists
+        """
+        if donor_read_tuple[0] not in donorreaddata:
+            donorreaddata[donor_read_tuple[0]] = [None, None]
+        donor_read_slots = donorreaddata[donor_read_tuple[0]]
+        slot_index = 0 if donor_read_tuple[1] == "1" else 1
+        if donor_read_slots[slot_index] is None:
+            donor_read_slots[slot_index] = donor_read_tuple
+        else:
+            donor_read_slots.append(donor_read_tuple)
+
+    @classmethod
+    def get_donor_read_tuple(cls, donorread):
+        """Return a donor read as a fastq string tuple.
+
+        Reverse strand reads are reverse complemented and their qualities
+        reversed, so the tuple holds the read as it was sequenced.
+
+        Parameters
+        ----------
+        donorread : pysam.AlignedSegment
+            Donor read to convert
+
+        Returns
+        -------
+        tuple of str
+            Read identifier, pair number, sequence and qualities
+        """
+        donor_read_qualities = donorread.query_qualities.tobytes().translate(cls.PHRED33_TABLE)
+        donor_seq = donorread.query_sequence
+        if donorread.is_reverse:
+            donor_seq = donor_seq[::-1].translate(cls.COMPLEMENT_TABLE)
+            donor_read_qualities = donor_read_qualities[::-1]
+        return (donorread.query_name,
+                "1" if donorread.is_read1 else "2",
+                donor_seq,
+                donor_read_qualities.decode("ascii"))
 
     def build_fastqs_from_donors_v2(self, acceptor_fqsin, acceptor_reads_to_exclude,
                                     distributed_donor_reads, donor_reads, forward_reverse,
@@ -2000,7 +3502,7 @@ class VaSeBuilder:
         ----------
         acceptor_fqsin: list of str
             Template/Acceptor fastq files to use
-        acceptor_reads_to_exclude: list of str
+        acceptor_reads_to_exclude: AcceptorSkipSet
         distributed_donor_reads : list of list of str
         donor_reads: dict
         forward_reverse: str
@@ -2009,115 +3511,161 @@ class VaSeBuilder:
             Random seed to use for shuffling donor add positions
         outpath: str
             Path top write produced fastq file to
-        donor_read_insert_data:
+        donor_read_insert_data: InsertPositionLog
         """
+        lane_jobs = []
         for i in range(len(acceptor_fqsin)):
             fqoutname = self.set_fastq_out_path(outpath, forward_reverse, i + 1)
 
             # Add the fastq file entry to the insert positions map
-            if fqoutname.split(".")[0][:-3] not in donor_read_insert_data:
-                donor_read_insert_data[fqoutname.split(".")[0][:-3]] = {}
+            donor_read_insert_data.add_fastq(fqoutname.split(".")[0][:-3])
 
             # Filter the donor reads specific to the template file
             selected_donor_reads = [donor_reads[y] for y in distributed_donor_reads[i]]
             donor_reads_to_add = []
             for j in selected_donor_reads:
-                donor_reads_to_add.extend(j)
-            self.write_vase_fastq_v2(acceptor_fqsin[i], fqoutname, acceptor_reads_to_exclude,
-                                     donor_reads_to_add, distributed_donor_reads[i],
-                                     forward_reverse, random_seed, donor_read_insert_data)
+                donor_reads_to_add.extend([x for x in j if x is not None])
+            lane_jobs.append((self.write_vase_fastq_v2,
+                              (acceptor_fqsin[i], fqoutname, acceptor_reads_to_exclude,
+                               donor_reads_to_add, distributed_donor_reads[i], forward_reverse,
+                               random_seed)))
+        self.run_lane_jobs(lane_jobs, donor_read_insert_data)
 
     def write_donor_insert_positions_v2(self, inserted_position_data, outpath):
         """Write the insert positions for each set of reads.
 
-        Insert positions are written per read identifier.
+        Insert positions are written per read identifier. For interleaved
+        validation fastq files, both R1 and R2 positions are in the same file.
+        The log columns are also written to a compressed NumPy file next to
+        it, with the same name but an .npz extension.
 
         Parameters
         ----------
-        inserted_position_data : dict
+        inserted_position_data : InsertPositionLog
             Position data
         outpath : str
             Path and name to write the donor read insert position data to
         """
+        extension = self.get_validation_extension()
         try:
             with open(outpath, "w") as ipd_outfile:
                 ipd_outfile.write(f"#VBUUID: {self.creation_id}\n")
                 ipd_outfile.write("ReadId\tR1_InsertPos\tFastqR1Out\tR2_InsertPos\tFastqR2Out\n")
 
-                # Iterate over the donor read insert position data and write to file
-                for fastqout in inserted_position_data:
-                    readid_list = sorted(inserted_position_data[fastqout])
-
-                    # Iterate over each read identifier for the specified
-                    # output R1 and R2 fastq set.
-                    for readid in readid_list:
-                        r1_insertpos = self.get_saved_insert_position(
-                            "1",
-                            inserted_position_data[fastqout][readid]
-                            )
-                        r2_insertpos = self.get_saved_insert_position(
-                            "2",
-                            inserted_position_data[fastqout][readid]
-                            )
-
-                        ipd_outfile.write(f"{readid}\t{r1_insertpos}\t{fastqout}_R1.fastq\t"
-                                          f"{r2_insertpos}\t{fastqout}_R2.fastq\n")
+                # Iterate over the donor read insert positions per output R1
+                # and R2 fastq set, sorted by read identifier.
+                for fastqout, readid, r1_insertpos, r2_insertpos in \
+                        inserted_position_data.get_rows():
+                    r1_insertpos = "NA" if r1_insertpos is None else r1_insertpos
+                    r2_insertpos = "NA" if r2_insertpos is None else r2_insertpos
+                    if self.is_interleaved():
+                        ipd_outfile.write(f"{readid}\t{r1_insertpos}\t{fastqout}.{extension}\t"
+                                          f"{r2_insertpos}\t{fastqout}.{extension}\n")
+                        continue
+                    ipd_outfile.write(f"{readid}\t{r1_insertpos}\t{fastqout}_R1.{extension}\t"
+                                      f"{r2_insertpos}\t{fastqout}_R2.{extension}\n")
+            inserted_position_data.write_columns(f"{os.path.splitext(outpath)[0]}.npz")
         except IOError:
             self.vaselogger.warning(f"Could not write donor insert position data to {outpath}")
 
     @staticmethod
-    def get_saved_insert_position(readpn, read_insert_data):
-        """Return the insert position of a read, or 'NA' if not available.
+    def add_donor_insert_data(fqoutname, readid, forward_reverse, insertpos, donor_insert_data):
+        """Add the insert position and read id to the insertion data map.
+
+        The insertion data map saves the position at which a read for each set
+        of validation fastq output files was inserted.
 
         Parameters
         ----------
-        readpn : str
-            The readpair number ('1' or '2')
-        read_insert_data : tuple of str and int
-            The read insert data
+        fqoutname : str
+            Name of fastq file
+        readid : str
+            Read identifier for which to save the insert position
+        forward_reverse : str
+            Indicator whether the read is R1 or R2
+        insertpos : int
+            Position the donor read was inserted at in the validation fastq
+        donor_insert_data : InsertPositionLog
+            Saved donor read insertions into validation fastq
+        """
+        donor_insert_data.add_insert(fqoutname, readid, forward_reverse, insertpos)
 
-        Returns
-        -------
-        int or str
-            The insert position, 'NA' if not available
+    def record_validation_insert(self, fqoutname, readid, forward_reverse, insertpos,
+                                 donor_insert_data):
+        """Add the insert position of a donor read in a validation fastq set.
+
+        If downsampling is enabled, the insert position in each downsampled
+        set is recorded, each as a separate validation fastq set.
+
+        Parameters
+        ----------
+        fqoutname : str
+            Name of the validation fastq set
+        readid : str
+            Read identifier for which to save the insert position
+        forward_reverse : str
+            Indicator whether the read is R1 or R2
+        insertpos : int or list of int
+            Position the donor read was inserted at in the validation fastq,
+            per downsampled set if downsampling is enabled
+        donor_insert_data : InsertPositionLog
+            Saved donor read insertions into validation fastq
         """
-        if readpn in read_insert_data:
-            readpn_index = read_insert_data.index(readpn)
-            if readpn_index < len(read_insert_data)-1:
-                return read_insert_data[read_insert_data.index(readpn)+1]
-        return "NA"
+        if self.downsample_fractions is None:
+            self.record_shard_insert(fqoutname, readid, forward_reverse, insertpos,
+                                     donor_insert_data)
+            return
+        if fqoutname not in donor_insert_data:
+            return
+        for fraction, set_insertpos in zip(self.downsample_fractions, insertpos):
+            set_fqoutname = f"{fqoutname}{DownsampleWriter.get_set_suffix(fraction)}"
+            donor_insert_data.add_fastq(set_fqoutname)
+            self.record_shard_insert(set_fqoutname, readid, forward_reverse, set_insertpos,
+                                     donor_insert_data)
 
-    @staticmethod
-    def add_donor_insert_data(fqoutname, readid, forward_reverse, insertpos, donor_insert_data):
-        """Add the insert position and read id to the insertion data map.
+    def record_shard_insert(self, fqoutname, readid, forward_reverse, insertpos,
+                            donor_insert_data):
+        """Add the insert position of a donor read in a validation fastq or its shard.
 
-        The insertion data map saves the position at which a read for each set
-        of validation fastq output files was inserted.
+        If sharding is enabled, the position in the whole validation fastq
+        file is converted to the shard and the position within the shard.
+        Each shard is recorded as a separate validation fastq set.
 
         Parameters
         ----------
         fqoutname : str
-            Name of fastq file
+            Name of the validation fastq set
         readid : str
             Read identifier for which to save the insert position
         forward_reverse : str
             Indicator whether the read is R1 or R2
         insertpos : int
             Position the donor read was inserted at in the validation fastq
-        donor_insert_data: dict
+        donor_insert_data : InsertPositionLog
             Saved donor read insertions into validation fastq
         """
-        if fqoutname in donor_insert_data:
-            if readid in donor_insert_data[fqoutname]:
-                if forward_reverse not in donor_insert_data[fqoutname][readid]:
-                    donor_insert_data[fqoutname][readid] = donor_insert_data[fqoutname][readid] + \
-                                                           (forward_reverse, insertpos)
-            else:
-                donor_insert_data[fqoutname][readid] = (forward_reverse, insertpos)
+        if not self.is_sharded():
+            self.add_donor_insert_data(fqoutname, readid, forward_reverse, insertpos,
+                                       donor_insert_data)
+            return
+        if fqoutname not in donor_insert_data:
+            return
+        shard_index, shard_insertpos = FastqShardWriter.get_shard_position(
+            insertpos - 1, self.num_of_shards, self.shard_size,
+            2 if self.is_interleaved() else 1)
+        # Add the shards in order, also those without donor reads inserted so far
+        for shard_number in range(1, shard_index + 2):
+            donor_insert_data.add_fastq(f"{fqoutname}_S{shard_number:03d}")
+        self.add_donor_insert_data(f"{fqoutname}_S{shard_index + 1:03d}", readid,
+                                   forward_reverse, shard_insertpos + 1, donor_insert_data)
 
     def refetch_donor_reads(self, samples, variant_context_file, genome_reference):
         """Refetch the donor reads from a set of donor BAM files.
 
+        Reads in each context window are filtered on the donor read
+        identifiers of the variant context while fetching, so only the mates
+        and primary alignments of listed reads are looked up.
+
         Parameters
         ----------
         variant_context_file : VariantContextFile
@@ -2136,17 +3684,13 @@ class VaSeBuilder:
 
                 # Iterate over the variant contexts for the current sample
                 for varcon in varcon_per_sample_id[sample.hash_id]:
-                    donor_read_ids = set(varcon.get_donor_read_ids())
-                    fetched_reads = self.get_variant_reads(
+                    # Only fetch the donor reads listed in the variant context.
+                    varcon.variant_context_dreads = self.get_variant_reads(
                         varcon.get_variant_context_chrom(),
                         varcon.get_variant_context_start(),
-                        varcon.get_variant_context_end(), dalnfile
+                        varcon.get_variant_context_end(), dalnfile,
+                        set(varcon.get_donor_read_ids())
                         )
-
-                    # Filter out fetched reads not satisfying the donor read identifiers
-                    donor_reads = [fdread for fdread in fetched_reads
-                                   if fdread.query_name in donor_read_ids]
-                    varcon.variant_context_dreads = donor_reads
                 dalnfile.close()
             except IOError:
                 self.vaselogger.warning("Could not open donor alignment file "
@@ -2247,7 +3791,9 @@ class VaSeBuilder:
         All variants are written to the same VCF file. Header fields are merged
         from all variant objects, with minimal header information. INFO field
         descriptions and non-essential fields are removed. Variants are all
-        recorded as belonging to a single sample.
+        recorded as belonging to a single sample. If compress_vcf is set, the
+        variants are sorted and written to a BGZF compressed and indexed VCF
+        file with '.gz' appended to the output path.
 
         Parameters
         ----------
@@ -2258,19 +3804,19 @@ class VaSeBuilder:
         outpath : str
             Path to write output VCF file to.
         """
-        fields = ["fileformat", "filter", "alt", "format", "contig", "reference", "info"]
-        header_records = [str(x) for x in variants[0].header.records
-                          if str(x).lstrip("#").split("=")[0].lower() in fields]
-        for i, j in enumerate(header_records):
-            if j.startswith("##INFO"):
-                new_info_field = j.split(",Description")[0]
-                if not new_info_field.endswith(">\n"):
-                    new_info_field += ">\n"
-                header_records[i] = new_info_field
+        header_records = self.get_vcf_slice_header_records(variants)
         header_records.append(
             f"#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\t{sample_id}\n"
             )
         try:
+            if self.compress_vcf:
+                contig_order = {x: y for y, x in enumerate(variants[0].header.contigs)}
+                variants = sorted(variants,
+                                  key=lambda x: (contig_order.get(x.chrom, len(contig_order)),
+                                                 x.chrom, x.pos))
+                self.write_indexed_vcf(outpath, header_records, map(str, variants),
+                                       variants[0].header)
+                return
             with open(outpath, "w") as outfile:
                 outfile.writelines(header_records)
                 for variant in variants:
@@ -2279,12 +3825,66 @@ class VaSeBuilder:
             self.vaselogger.warning(f"Could not write VCF slice for sample {sample_id}.")
 
     @staticmethod
-    def write_spike_in_bam(out_header, reads, out_path, sort=True):
+    def write_indexed_vcf(outpath, header_records, variant_lines, vcf_header):
+        """Write sorted VCF lines to a BGZF compressed VCF file and index it.
+
+        The index is a tabix index, or a CSI index if a contig is too long
+        for tabix.
+
+        Parameters
+        ----------
+        outpath : str
+            Path of the uncompressed VCF file, '.gz' is appended
+        header_records : list of str
+            VCF header lines, including the column header
+        variant_lines : iterable of str
+            Sorted VCF record lines
+        vcf_header : pysam.VariantHeader
+            Header with the contig lengths of the variants
+        """
+        with pysam.BGZFile(f"{outpath}.gz", "wb") as outfile:
+            outfile.write("".join(header_records).encode())
+            for variant_line in variant_lines:
+                outfile.write(variant_line.encode())
+        max_contig_length = max((x.length or 0 for x in vcf_header.contigs.values()), default=0)
+        pysam.tabix_index(f"{outpath}.gz", preset="vcf", force=True,
+                          csi=max_contig_length >= 2**29)
+
+    @staticmethod
+    def get_vcf_slice_header_records(variants):
+        """Return the minimal VCF header lines of variants, without the column header.
+
+        Parameters
+        ----------
+        variants : list of pysam.VariantRecord objects
+            Variants to take the header of the first variant from
+
+        Returns
+        -------
+        header_records : list of str
+            Header lines, with INFO field descriptions removed
+        """
+        fields = ["fileformat", "filter", "alt", "format", "contig", "reference", "info"]
+        header_records = [str(x) for x in variants[0].header.records
+                          if str(x).lstrip("#").split("=")[0].lower() in fields]
+        for i, j in enumerate(header_records):
+            if j.startswith("##INFO"):
+                new_info_field = j.split(",Description")[0]
+                if not new_info_field.endswith(">\n"):
+                    new_info_field += ">\n"
+                header_records[i] = new_info_field
+        return header_records
+
+    @classmethod
+    def write_spike_in_bam(cls, out_header, reads, out_path, sort=True, threads=1,
+                           compress=True, index=True):
         """Write a BAM file with the provided header and reads.
 
         Header must be pre-made and should reflect all reads provided. If
-        sort=True, a temporary unsorted BAM file will be written, then removed
-        after sorting. Sorted BAM file will be indexed.
+        sort=True, the reads are coordinate sorted in memory and written once
+        to the sorted BAM file, which is then indexed if index=True. Above
+        IN_MEMORY_SORT_MAX_READS reads, a temporary unsorted BAM file is
+        written instead and removed after sorting with samtools.
 
         Parameters
         ----------
@@ -2295,46 +3895,161 @@ class VaSeBuilder:
             Path to write output BAM file to.
         sort : bool, optional
             Option to coordinate sort and index output BAM. The default is True.
+        threads : int, optional
+            Number of BGZF compression threads. The default is 1.
+        compress : bool, optional
+            Option to compress the output BAM. The default is True.
+        index : bool, optional
+            Option to index the sorted output BAM. The default is True.
         """
-        out_bam = pysam.AlignmentFile(out_path, "wb", header=out_header)
-        for read in reads:
-            out_bam.write(read)
-        out_bam.close()
+        write_mode = "wb" if compress else "wbu"
+        if not sort or len(reads) > cls.IN_MEMORY_SORT_MAX_READS:
+            with pysam.AlignmentFile(out_path, write_mode, header=out_header,
+                                     threads=threads) as out_bam:
+                for read in reads:
+                    out_bam.write(read)
+        if not sort:
+            return
 
-        if sort:
-            sort_out_name = f"{out_path[:-4]}.sorted.bam"
-            pysam.sort("-o", sort_out_name, out_path, catch_stdout=False)
+        sort_out_name = f"{out_path[:-4]}.sorted.bam"
+        if len(reads) > cls.IN_MEMORY_SORT_MAX_READS:
+            pysam.sort("-o", sort_out_name, "-@", str(threads), *([] if compress else ["-l", "0"]),
+                       out_path, catch_stdout=False)
             os.remove(out_path)
+        else:
+            sorted_header = pysam.AlignmentHeader.from_dict(out_header).to_dict()
+            sorted_header["HD"] = {**sorted_header.get("HD", {"VN": "1.6"}), "SO": "coordinate"}
+            with pysam.AlignmentFile(sort_out_name, write_mode, header=sorted_header,
+                                     threads=threads) as out_bam:
+                for read in sorted(reads, key=cls.get_coordinate_sort_key):
+                    out_bam.write(read)
+        if index:
             pysam.index(sort_out_name, catch_stdout=False)
 
-    @classmethod
-    def select_bam_header_fields(cls, bam_header, elements_to_keep, change_sample_name=None):
-        """Keep only a selected set of BAM header lines.
+    def write_spike_in_reads(self, out_header, reads, out_path, threads=1):
+        """Write spike-in reads as the set spike-in output type.
+
+        Spike-in type 'B' writes a sorted and indexed BAM file, 'U' the same
+        uncompressed, and 'F' gzipped R1 and R2 FastQ files.
+
+        Parameters
+        ----------
+        out_header : OrderedDict
+            Header with required fields, not used for FastQ files
+        reads : list of pysam.AlignedSegment objects
+        out_path : str
+            Path of the unsorted BAM file the output file names are based on
+        threads : int, optional
+            Number of BGZF compression threads. The default is 1.
+
+        Returns
+        -------
+        tuple of str
+            Paths to the written spike-in read files
+        """
+        if self.spike_in_type == "F":
+            return self.write_spike_in_fastqs(reads, out_path)
+        self.write_spike_in_bam(out_header, reads, out_path, threads=threads,
+                                compress=self.spike_in_type != "U")
+        return (f"{out_path[:-4]}.sorted.bam",)
+
+    @staticmethod
+    def get_spike_in_fastq_paths(out_path):
+        """Return the R1 and R2 spike-in FastQ file paths for a spike-in BAM file path.
+
+        Parameters
+        ----------
+        out_path : str
+            Path of the unsorted BAM file the FastQ file names are based on
+
+        Returns
+        -------
+        tuple of str
+            Paths to the R1 and R2 FastQ files
+        """
+        return f"{out_path[:-4]}_R1.fastq.gz", f"{out_path[:-4]}_R2.fastq.gz"
+
+    @classmethod
+    def write_spike_in_fastqs(cls, reads, out_path):
+        """Write spike-in reads to gzipped R1 and R2 FastQ files.
+
+        Reads are written as they were sequenced, with reverse strand reads
+        reverse complemented, and ordered by name so mates are on the same
+        record of both files. A read held by several variant contexts is
+        written once, and reads without their mate are left out with a
+        warning, so the R1 and R2 files stay in sync. The files can be
+        passed to AssembleValidationSet -kfq.
+
+        Parameters
+        ----------
+        reads : list of pysam.AlignedSegment objects
+        out_path : str
+            Path of the unsorted BAM file the FastQ file names are based on
+
+        Returns
+        -------
+        fastq_paths : tuple of str
+            Paths to the R1 and R2 FastQ files
+        """
+        read_pairs = {}
+        for read in reads:
+            read_tuple = cls.get_donor_read_tuple(read)
+            read_pairs.setdefault(read_tuple[0], {}).setdefault(read_tuple[1], read_tuple)
+        unpaired_ids = {x for x, y in read_pairs.items() if len(y) != 2}
+        if unpaired_ids:
+            logging.getLogger("VaSe_Logger").warning(
+                f"Left out {len(unpaired_ids)} reads without their mate from the spike-in FastQ "
+                f"files of {out_path}, such as {min(unpaired_ids)}"
+                )
+
+        fastq_paths = cls.get_spike_in_fastq_paths(out_path)
+        with pysam.BGZFile(fastq_paths[0], "wb") as fastq_r1, \
+                pysam.BGZFile(fastq_paths[1], "wb") as fastq_r2:
+            for read_id in sorted(read_pairs):
+                if read_id in unpaired_ids:
+                    continue
+                for fastq_out, pair_number in [(fastq_r1, "1"), (fastq_r2, "2")]:
+                    _, _, read_seq, read_quals = read_pairs[read_id][pair_number]
+                    fastq_out.write(f"@{read_id}\n{read_seq}\n+\n{read_quals}\n".encode())
+        return fastq_paths
+
+    def write_spike_in_fastq_list(self, fastq_pairs, outpath):
+        """Write the spike-in FastQ file pairs, as read by AssembleValidationSet -kfq.
+
+        Parameters
+        ----------
+        fastq_pairs : list of tuple of str
+            R1 and R2 FastQ file paths per spike-in
+        outpath : str
+            Path to write output file to
+        """
+        try:
+            with open(outpath, "w") as fastqlistfile:
+                for fastq_r1, fastq_r2 in fastq_pairs:
+                    fastqlistfile.write(f"{fastq_r1}\t{fastq_r2}\n")
+        except IOError:
+            self.vaselogger.warning("Could not write spike-in FastQ list file")
+
+    @staticmethod
+    def get_coordinate_sort_key(read):
+        """Return the key to coordinate sort a read with, in samtools sort order.
 
-        Optionally, samples names in the SM tags of @RG lines can also be changed if required.
+        Reads without a reference sequence are sorted last, and reverse strand
+        reads after forward strand reads at the same position.
 
         Parameters
         ----------
-        bam_header : OrderedDict
-            BAM header data to select specific fields from
-        elements_to_keep : list of str
-            Names of lines to keep (e.g. :SN, RG)
-        change_sample_names : str or None
-            Str with which to replace sample fields in header (Default: None)
+        read : pysam.AlignedSegment
+            Read to sort
 
         Returns
         -------
-        filtered_header : OrderedDict
-            Header with only the required data fields
+        tuple of int and bool
+            Reference sequence index, position and strand of the read
         """
-        filtered_header = OrderedDict()
-        for head in bam_header:
-            if head in elements_to_keep:
-                filtered_header[head] = bam_header[head]
-
-            if change_sample_name is not None:
-                cls.change_bam_header_sample_names(filtered_header, change_sample_name)
-        return filtered_header
+        if read.reference_id < 0:
+            return sys.maxsize, -1, False
+        return read.reference_id, read.reference_start, read.is_reverse
 
     @staticmethod
     def change_bam_header_sample_names(template_header, replacement_name):
@@ -2390,42 +4105,6 @@ class VaSeBuilder:
         except IOError:
             self.vaselogger.warning("Could not write P-mode link file")
 
-    def get_donor_insert_positions(self, acceptor_fq, donorreadids, donorreaddata, randomseed):
-        """Create random FastQ insertion positions for donor reads.
-
-        Parameters
-        ----------
-        acceptor_fq : str
-            Path to acceptor fastq file
-        donorreadids : list of str
-            List of donor read identifiers
-        donorreaddata : dict
-            Donor read
-        randomseed : int
-            Seed to set for semi random shuffling
-
-        Returns
-        -------
-        donor_read_to_addpos : dict
-            Read ids linked to insert position
-        """
-        num_of_template_reads = self.check_template_size(acceptor_fq)
-        self.vaselogger.debug(f"Template has {num_of_template_reads} reads")
-        donor_add_positions = self.shuffle_donor_add_positions(
-            num_of_template_reads,
-            len(donorreadids),
-            randomseed
-            )
-        donor_reads_to_addpos = self.link_donor_addpos_reads_v2(
-            donor_add_positions,
-            donorreadids,
-            donorreaddata
-            )
-        return donor_reads_to_addpos
-
-    # XXX: This will break if it find an incorrect read pair. You can't delete
-    # a dictionary entry while looping over it:
-    # RuntimeError: dictionary changed size during iteration
     def remove_incorrect_bam_donor_readpairs(self, donorreaddata):
         """Remove BAM donor reads without an R1 or R2 read and return the modified dictionary.
 
@@ -2444,16 +4123,16 @@ class VaSeBuilder:
         donorreaddata : dict
             Modified BAM donor read data with incorrect read pairs removed
         """
-        read_removal_count = 0
-        for read_id in donorreaddata:
-            if len(donorreaddata[read_id]) != 2:
-                del donorreaddata[read_id]
-                read_removal_count += 1
+        incorrect_read_ids = [x for x, y in donorreaddata.items() if len(y) != 2 or None in y]
+        for read_id in incorrect_read_ids:
+            del donorreaddata[read_id]
+        read_removal_count = len(incorrect_read_ids)
         self.vaselogger.debug(f"Removed {read_removal_count} incorrect read pairs.")
         return donorreaddata
 
     def run_ab_mode_v2(self, variant_context_file, afq1_in, afq2_in,
-                       donor_bams, random_seed, fqoutpath):
+                       donor_bams, random_seed, fqoutpath, exact_skip=False,
+                       library_contexts=None):
         """Run the alternative version of the AB-mode.
 
         This method differs that the insert positions are only determined once per fastq R1/R2 set.
@@ -2471,17 +4150,33 @@ class VaSeBuilder:
             Seed number to use for semi random reed distribution
         fqoutpath : str
             Path and name/prefix for the validation fastq files
+        exact_skip : bool
+            Confirm hashed acceptor read skips against the read IDs
+        library_contexts : list of str
+            Variant contexts to read from spike-in library BAM files, None if
+            the donor BAM files are no spike-in libraries
         """
-        # Set the list of acceptor reads to skip when making the
-        acceptor_reads_skiplist = set(
-            variant_context_file.get_all_variant_context_acceptor_read_ids()
-            )
+        # Set the acceptor reads to skip when making the validation fastq files.
+        acceptor_reads_skiplist = self.build_acceptor_skip_set(variant_context_file, exact_skip)
+
+        # Keep the donor reads on disk if the donor read memory is limited.
+        if self.max_donor_memory is not None:
+            donor_store = self.create_disk_donor_store(fqoutpath)
+            for donor_read_tuples in self.iter_donor_bam_tuples(donor_bams, library_contexts):
+                donor_store.add_donor_reads(donor_read_tuples)
+            donor_store.index_donor_reads()
+            read_removal_count = donor_store.remove_incorrect_read_pairs()
+            self.vaselogger.debug(f"Removed {read_removal_count} incorrect read pairs.")
+            donor_read_inserted_positions = InsertPositionLog()
+            self.write_fastqs_from_disk_store(donor_store, afq1_in, afq2_in,
+                                              acceptor_reads_skiplist, random_seed, fqoutpath,
+                                              donor_read_inserted_positions)
+            self.write_donor_insert_positions_v2(donor_read_inserted_positions,
+                                                 f"{fqoutpath}_donor_read_insert_positions.txt")
+            return
 
         # Read the read from all donor BAM files.
-        donor_read_data = {}
-        for dbamfile in donor_bams:
-            self.vaselogger.debug(f"Start reading BAM donor file {dbamfile}")
-            donor_read_data = self.read_donor_bam_v3(dbamfile, donor_read_data)
+        donor_read_data = self.read_donor_bams(donor_bams, library_contexts)
         donor_read_data = self.remove_incorrect_bam_donor_readpairs(donor_read_data)
 
         r1_donor_read_data = {x: y[0] for x, y in donor_read_data.items()}
@@ -2495,45 +4190,796 @@ class VaSeBuilder:
 
         # Start iterating over the template fastq files and semi-randomly
         # distribute the donor reads.
-        donor_read_inserted_positions = {}
-        distribution_index = 0
-        for r1, r2 in zip(afq1_in, afq2_in):
+        donor_read_inserted_positions = InsertPositionLog()
+        lane_jobs = []
+        for distribution_index, (r1, r2) in enumerate(zip(afq1_in, afq2_in)):
             r1_outname = self.set_fastq_out_path(fqoutpath, "1", distribution_index + 1)
             r2_outname = self.set_fastq_out_path(fqoutpath, "2", distribution_index + 1)
 
             # Add the fastq file entry to the insert positions map
             # XXX: Splitting the filename on '.' will fail if the path includes './'
-            if r1_outname.split(".")[0][:-3] not in donor_read_inserted_positions:
-                donor_read_inserted_positions[r1_outname.split(".")[0][:-3]] = {}
-
-            # Determine the required data
-            self.vaselogger.info(f"Counting sequences in {r1}...")
-            num_of_template_reads = self.check_template_size(r1)
-            donor_add_positions = self.shuffle_donor_add_positions(
-                num_of_template_reads,
-                len(distributed_donor_read_ids[distribution_index]),
-                random_seed
-                )
-            donor_reads_to_addpos = self.link_donor_addpos_reads_v3(
-                donor_add_positions,
-                distributed_donor_read_ids[distribution_index]
-                )
+            donor_read_inserted_positions.add_fastq(r1_outname.split(".")[0][:-3])
 
-            # Start writing the R1 and R2 fastq files
-            self.write_validation_fastq_file(
-                r1, "1", acceptor_reads_skiplist, donor_reads_to_addpos,
-                r1_donor_read_data, r1_outname, donor_read_inserted_positions
-                )
-            self.write_validation_fastq_file(
-                r2, "2", acceptor_reads_skiplist, donor_reads_to_addpos,
-                r2_donor_read_data, r2_outname, donor_read_inserted_positions
-                )
-            distribution_index += 1
+            # Only hand each lane the donor reads it will insert.
+            lane_donor_read_ids = distributed_donor_read_ids[distribution_index]
+            lane_jobs.append((self.write_validation_fastq_lane,
+                              (r1, r2, acceptor_reads_skiplist, lane_donor_read_ids,
+                               {x: r1_donor_read_data[x] for x in lane_donor_read_ids},
+                               {x: r2_donor_read_data[x] for x in lane_donor_read_ids},
+                               r1_outname, r2_outname, random_seed)))
+        self.run_lane_jobs(lane_jobs, donor_read_inserted_positions)
 
         # Write the donor read insert position data to a text file.
         self.write_donor_insert_positions_v2(donor_read_inserted_positions,
                                              f"{fqoutpath}_donor_read_insert_positions.txt")
 
+    def create_disk_donor_store(self, outpath):
+        """Create an on-disk donor read store next to the validation fastq files.
+
+        Parameters
+        ----------
+        outpath : str
+            Path and prefix of the validation fastq files
+
+        Returns
+        -------
+        DiskDonorStore
+            Empty donor read store
+        """
+        db_handle, db_path = tempfile.mkstemp(prefix=f"{os.path.basename(outpath)}_donor_reads_",
+                                              suffix=".sqlite",
+                                              dir=os.path.dirname(outpath) or ".")
+        os.close(db_handle)
+        self.vaselogger.debug(f"Saving donor reads on disk in {db_path} using at most "
+                              f"{self.max_donor_memory} MB of cache")
+        return DiskDonorStore(db_path, self.max_donor_memory)
+
+    def count_template_reads(self, template_fqs):
+        """Return the number of reads of each template fastq file.
+
+        Parameters
+        ----------
+        template_fqs : list of str
+            Paths to the template fastq files
+
+        Returns
+        -------
+        list of int
+            Number of reads per template fastq file
+        """
+        num_of_processes = min(self.threads, len(template_fqs))
+        if num_of_processes <= 1:
+            return [self.check_template_size(x) for x in template_fqs]
+        with ProcessPoolExecutor(max_workers=num_of_processes) as count_pool:
+            return list(count_pool.map(self.check_template_size, template_fqs))
+
+    def write_fastqs_from_disk_store(self, donor_store, afq1_in, afq2_in, acceptorreads_toskip,
+                                     random_seed, fqoutpath, donor_read_insert_data):
+        """Write the validation fastq files with donor reads from an on-disk store.
+
+        The donor reads are divided over the acceptor lanes and their insert
+        positions are saved in the store, in the same way as for donor reads
+        kept in memory. Each validation fastq file then reads its donor reads
+        back from the store sorted by insert position. The store is removed
+        afterwards.
+
+        Parameters
+        ----------
+        donor_store : DiskDonorStore
+            Donor reads to add
+        afq1_in : list of str
+            R1 template fastq files
+        afq2_in : list of str
+            R2 template fastq files
+        acceptorreads_toskip : AcceptorSkipSet
+            Acceptor reads to exclude from the validation fastq files
+        random_seed : int
+            Seed to set for semi random shuffling
+        fqoutpath : str
+            Path and prefix for the validation fastq files
+        donor_read_insert_data : InsertPositionLog
+            Saved donor read insertions into validation fastq
+        """
+        if self.split_templates:
+            self.vaselogger.warning("Templates are not split into chunks when donor reads are "
+                                    "kept on disk")
+        donor_store.index_donor_reads()
+        donor_read_ids = donor_store.get_read_ids()
+        distributed_donor_read_ids = self.divide_donorfastqs_over_acceptors(donor_read_ids,
+                                                                            len(afq1_in))
+        template_sizes = self.count_template_reads(afq1_in)
+
+        lane_jobs = []
+        for lane_index, (r1, r2) in enumerate(zip(afq1_in, afq2_in)):
+            lane_donor_read_ids = distributed_donor_read_ids[lane_index]
+            donor_add_positions = self.get_donor_add_positions(
+                template_sizes[lane_index], len(lane_donor_read_ids), random_seed,
+                self.set_fastq_out_path(fqoutpath, "1", lane_index + 1)
+                )
+            donor_store.add_insert_slots(lane_index, donor_add_positions, lane_donor_read_ids)
+            if self.is_interleaved():
+                fq_outname = self.get_interleaved_out_path(
+                    self.set_fastq_out_path(fqoutpath, "1", lane_index + 1))
+                donor_read_insert_data.add_fastq(os.path.splitext(fq_outname)[0])
+                lane_jobs.append((self.write_disk_store_interleaved_lane,
+                                  (r1, r2, fq_outname, acceptorreads_toskip, donor_store.db_path,
+                                   lane_index, template_sizes[lane_index])))
+                continue
+            for forward_reverse, template_fq in zip(["1", "2"], [r1, r2]):
+                fq_outname = self.set_fastq_out_path(fqoutpath, forward_reverse, lane_index + 1)
+                donor_read_insert_data.add_fastq(fq_outname.split(".")[0][:-3])
+                lane_jobs.append((self.write_disk_store_fastq,
+                                  (template_fq, fq_outname, acceptorreads_toskip,
+                                   donor_store.db_path, lane_index, forward_reverse,
+                                   template_sizes[lane_index])))
+        donor_store.index_insert_slots()
+        self.run_lane_jobs(lane_jobs, donor_read_insert_data)
+        donor_store.close()
+        os.remove(donor_store.db_path)
+
+    def write_disk_store_fastq(self, template_fq, fastq_outpath, acceptorreads_toskip,
+                               donor_store_path, lane_index, forward_reverse,
+                               num_of_template_reads, donor_read_insert_data):
+        """Write a single validation fastq file with donor reads from an on-disk store.
+
+        Parameters
+        ----------
+        template_fq : str
+            Template fastq gz file to use
+        fastq_outpath : str
+            Path and name to write the fastq file to
+        acceptorreads_toskip : AcceptorSkipSet
+            Acceptor reads to exclude from the validation fastq file
+        donor_store_path : str
+            Path to the on-disk donor read store
+        lane_index : int
+            Acceptor lane of the template in the donor read store
+        forward_reverse : str
+            Whether to write R1 or R2
+        num_of_template_reads : int
+            Number of reads in the template fastq file
+        donor_read_insert_data : InsertPositionLog
+            Saved donor read insertions into validation fastq
+        """
+        self.vaselogger.debug(f"Writing data to validation fastq {fastq_outpath}")
+        fastq_prefix = fastq_outpath.split(".")[0][:-3]
+        donor_read_insert_data.add_fastq(fastq_prefix)
+        donor_inserts = DiskDonorStore.read_lane_inserts(donor_store_path, lane_index,
+                                                         forward_reverse, self.max_donor_memory)
+        fastq_inserts, _ = self.write_template_chunk(template_fq, (0, num_of_template_reads, None),
+                                                     acceptorreads_toskip, donor_inserts,
+                                                     fastq_outpath, forward_reverse)
+        for donorreadid, insertpos in fastq_inserts:
+            self.record_validation_insert(fastq_prefix, donorreadid, forward_reverse, insertpos,
+                                          donor_read_insert_data)
+
+    def write_disk_store_interleaved_lane(self, template_r1, template_r2, fastq_outpath,
+                                          acceptorreads_toskip, donor_store_path, lane_index,
+                                          num_of_template_reads, donor_read_insert_data):
+        """Write an interleaved validation fastq file with donor reads from an on-disk store.
+
+        Parameters
+        ----------
+        template_r1 : str
+            R1 template fastq gz file to use
+        template_r2 : str
+            R2 template fastq gz file to use
+        fastq_outpath : str
+            Path and name to write the interleaved fastq file to
+        acceptorreads_toskip : AcceptorSkipSet
+            Acceptor reads to exclude from the validation fastq file
+        donor_store_path : str
+            Path to the on-disk donor read store
+        lane_index : int
+            Acceptor lane of the templates in the donor read store
+        num_of_template_reads : int
+            Number of reads in the template fastq files
+        donor_read_insert_data : InsertPositionLog
+            Saved donor read insertions into validation fastq
+        """
+        self.write_interleaved_fastq(
+            template_r1, template_r2, acceptorreads_toskip,
+            DiskDonorStore.read_lane_inserts(donor_store_path, lane_index, "1",
+                                             self.max_donor_memory),
+            DiskDonorStore.read_lane_inserts(donor_store_path, lane_index, "2",
+                                             self.max_donor_memory),
+            num_of_template_reads, fastq_outpath, donor_read_insert_data
+            )
+
+    def write_interleaved_lane(self, template_r1, template_r2, acceptorreads_toskip,
+                               donorbamreaddata, donor_readids, random_seed, fastq_outpath,
+                               donor_read_insert_data):
+        """Write an interleaved validation fastq file for one acceptor lane.
+
+        Parameters
+        ----------
+        template_r1 : str
+            R1 template fastq gz file to use
+        template_r2 : str
+            R2 template fastq gz file to use
+        acceptorreads_toskip : AcceptorSkipSet
+            Acceptor reads to exclude from the validation fastq file
+        donorbamreaddata : DonorReadStore or list of tuple
+            Donor reads to add to this lane
+        donor_readids : list of str
+            Identifiers of the donor reads to add to this lane
+        random_seed : int
+            Seed to set for semi random shuffling
+        fastq_outpath : str
+            Path and name to write the interleaved fastq file to
+        donor_read_insert_data : InsertPositionLog
+            Saved donor read insertions into validation fastq
+        """
+        num_of_template_reads = self.check_template_size(template_r1)
+        donor_add_positions = self.get_donor_add_positions(num_of_template_reads,
+                                                           len(donor_readids), random_seed,
+                                                           fastq_outpath)
+        donor_read_store = DonorReadStore.from_read_data(donorbamreaddata)
+        donor_insert_queue = DonorInsertQueue(donor_add_positions, donor_readids)
+        self.write_interleaved_fastq(
+            template_r1, template_r2, acceptorreads_toskip,
+            *[self.get_queue_donor_inserts(
+                donor_insert_queue,
+                {x: donor_read_store.get_pair_reads(x, y) for x in donor_readids}
+                ) for y in ["1", "2"]],
+            num_of_template_reads, fastq_outpath, donor_read_insert_data
+            )
+
+    def write_interleaved_fastq(self, template_r1, template_r2, acceptorreads_toskip,
+                                r1_donor_inserts, r2_donor_inserts, num_of_template_reads,
+                                fastq_outpath, donor_read_insert_data):
+        """Write the R1 and R2 reads of a lane alternately to one validation fastq file.
+
+        The R1 and R2 templates are read in lockstep. Template read pairs are
+        skipped on the R1 read identifier, and the R1 and R2 donor reads to
+        insert after a template read pair are written pair by pair. Insert
+        positions are recorded as positions in the interleaved file.
+
+        Parameters
+        ----------
+        template_r1 : str
+            R1 template fastq gz file to use
+        template_r2 : str
+            R2 template fastq gz file to use
+        acceptorreads_toskip : AcceptorSkipSet
+            Acceptor reads to exclude from the validation fastq file
+        r1_donor_inserts : iterable of tuple
+            Insert position and R1 donor read, sorted by insert position
+        r2_donor_inserts : iterable of tuple
+            Insert position and R2 donor read, sorted by insert position
+        num_of_template_reads : int
+            Number of reads in the template fastq files
+        fastq_outpath : str
+            Path and name to write the interleaved fastq file to
+        donor_read_insert_data : InsertPositionLog
+            Saved donor read insertions into validation fastq
+        """
+        self.vaselogger.debug(f"Writing data to interleaved validation fastq {fastq_outpath}")
+        fastq_prefix = os.path.splitext(fastq_outpath)[0]
+        donor_read_insert_data.add_fastq(fastq_prefix)
+        donor_insert_groups = [groupby(x, key=lambda y: y[0])
+                               for x in (r1_donor_inserts, r2_donor_inserts)]
+        next_insert_groups = [next(x, None) for x in donor_insert_groups]
+        cur_add_index = 0
+        try:
+            with self.open_validation_output(fastq_outpath, None) as fqil_outfile:
+                template_chunk = (0, num_of_template_reads, None)
+                for cur_read_index, ((r1_header, r1_lines), (r2_header, r2_lines)) in enumerate(
+                        zip(self.read_template_records(template_r1, template_chunk),
+                            self.read_template_records(template_r2, template_chunk))):
+                    if r1_header.split()[0][1:] not in acceptorreads_toskip:
+                        fqil_outfile.write_template(r1_header, r1_lines)
+                        fqil_outfile.write_template(r2_header, r2_lines)
+                        cur_add_index += 2
+
+                    # Collect the R1 and R2 donor reads to insert at the current position
+                    position_reads = [[], []]
+                    for fr_index, donor_insert_group in enumerate(donor_insert_groups):
+                        while (next_insert_groups[fr_index] is not None
+                               and next_insert_groups[fr_index][0] <= cur_read_index):
+                            position_reads[fr_index].extend(
+                                x[1] for x in next_insert_groups[fr_index][1])
+                            next_insert_groups[fr_index] = next(donor_insert_group, None)
+                    for donor_read_pair in zip_longest(*position_reads):
+                        if None in donor_read_pair:
+                            self.vaselogger.warning("Donor read pair is incomplete and breaks "
+                                                    f"interleaving in {fastq_outpath}")
+                        for donorread in donor_read_pair:
+                            if donorread is None:
+                                continue
+                            fqil_outfile.write_donor_read(donorread)
+                            cur_add_index += 1
+                            self.record_validation_insert(
+                                fastq_prefix, donorread[0], donorread[1],
+                                self.get_output_position(fqil_outfile, cur_add_index),
+                                donor_read_insert_data
+                                )
+        except IOError as ioe:
+            if ioe.filename in (template_r1, template_r2):
+                self.vaselogger.critical("The supplied template FastQ file "
+                                         "could not be found.")
+            else:
+                self.vaselogger.critical("A FastQ file could not be written "
+                                         "to the provided output location.")
+            sys.exit()
+
+    def build_interleaved_fastqs(self, afq1_in, afq2_in, acceptorreads_toskip,
+                                 distributed_donor_read_ids, donor_reads, random_seed, outpath,
+                                 donor_read_insert_data):
+        """Build a set of interleaved validation fastq files, one per acceptor lane.
+
+        Parameters
+        ----------
+        afq1_in : list of str
+            R1 template fastq files
+        afq2_in : list of str
+            R2 template fastq files
+        acceptorreads_toskip : AcceptorSkipSet
+            Acceptor reads to exclude from the validation fastq files
+        distributed_donor_read_ids : list of list of str
+            Donor read identifiers to add per acceptor lane
+        donor_reads : DonorReadStore or dict
+            Donor reads to add
+        random_seed : int
+            Seed to set for semi random shuffling
+        outpath : str
+            Path and prefix for the validation fastq files
+        donor_read_insert_data : InsertPositionLog
+            Saved donor read insertions into validation fastq
+        """
+        if isinstance(donor_reads, dict):
+            donor_reads = {x: [z for z in y if z is not None] for x, y in donor_reads.items()}
+        donor_read_store = DonorReadStore.from_read_data(donor_reads)
+        lane_jobs = []
+        for lane_index, (r1, r2) in enumerate(zip(afq1_in, afq2_in)):
+            fq_outname = self.get_interleaved_out_path(
+                self.set_fastq_out_path(outpath, "1", lane_index + 1))
+            donor_read_insert_data.add_fastq(os.path.splitext(fq_outname)[0])
+            lane_donor_read_ids = distributed_donor_read_ids[lane_index]
+            lane_jobs.append((self.write_interleaved_lane,
+                              (r1, r2, acceptorreads_toskip,
+                               donor_read_store.subset(lane_donor_read_ids), lane_donor_read_ids,
+                               random_seed, fq_outname)))
+        self.run_lane_jobs(lane_jobs, donor_read_insert_data)
+
+    def write_validation_fastq_lane(self, template_r1, template_r2, acceptorreads_toskip,
+                                    donorreadids, r1_donorreaddata, r2_donorreaddata,
+                                    r1_outpath, r2_outpath, random_seed, donorinsertpositions):
+        """Write the R1 and R2 validation fastq files for one acceptor lane.
+
+        Insert positions are determined once for the lane and used for both
+        the R1 and R2 validation fastq file, or for the interleaved
+        validation fastq file.
+
+        Parameters
+        ----------
+        template_r1 : str
+            R1 template fastq gz file to use
+        template_r2 : str
+            R2 template fastq gz file to use
+        acceptorreads_toskip : AcceptorSkipSet
+            Acceptor reads to exclude from the validation fastq files
+        donorreadids : list of str
+            Identifiers of the donor reads to add to this lane
+        r1_donorreaddata : dict
+            R1 donor reads to add per read identifier
+        r2_donorreaddata : dict
+            R2 donor reads to add per read identifier
+        r1_outpath : str
+            Path and name to write the R1 fastq file to
+        r2_outpath : str
+            Path and name to write the R2 fastq file to
+        random_seed : int
+            Seed to set for semi random shuffling
+        donorinsertpositions : InsertPositionLog
+            Saved donor read insertions into validation fastq
+        """
+        # Determine the required data
+        self.vaselogger.info(f"Counting sequences in {template_r1}...")
+        num_of_template_reads = self.check_template_size(template_r1)
+        donor_add_positions = self.get_donor_add_positions(
+            num_of_template_reads,
+            len(donorreadids),
+            random_seed,
+            r1_outpath
+            )
+        donor_reads_to_addpos = DonorInsertQueue(donor_add_positions, donorreadids)
+
+        # Write the R1 and R2 reads to a single fastq file in one pass
+        if self.is_interleaved():
+            self.write_interleaved_fastq(
+                template_r1, template_r2, acceptorreads_toskip,
+                self.get_queue_donor_inserts(donor_reads_to_addpos,
+                                             {x: [r1_donorreaddata[x]] for x in donorreadids}),
+                self.get_queue_donor_inserts(donor_reads_to_addpos,
+                                             {x: [r2_donorreaddata[x]] for x in donorreadids}),
+                num_of_template_reads, self.get_interleaved_out_path(r1_outpath),
+                donorinsertpositions
+                )
+            return
+
+        # Start writing the R1 and R2 fastq files
+        self.write_validation_fastq_file(
+            template_r1, "1", acceptorreads_toskip, donor_reads_to_addpos,
+            r1_donorreaddata, r1_outpath, donorinsertpositions
+            )
+        self.write_validation_fastq_file(
+            template_r2, "2", acceptorreads_toskip, donor_reads_to_addpos,
+            r2_donorreaddata, r2_outpath, donorinsertpositions
+            )
+
+    def run_lane_jobs(self, lane_jobs, donor_read_insert_data):
+        """Run validation fastq writing jobs for each acceptor lane.
+
+        Each job is a VaSeBuilder writer method with its arguments, except
+        for the donor read insert data the writer adds to. With a single
+        thread the jobs run one after another. Otherwise the jobs run in a
+        process pool, each recording insert positions separately. These are
+        merged in lane order afterwards, so the output is the same as for a
+        serial run. If template splitting is enabled, each template fastq
+        file is split into chunks instead that are written in parallel.
+
+        Parameters
+        ----------
+        lane_jobs : list of tuple
+            Writer method and its arguments per acceptor lane
+        donor_read_insert_data : InsertPositionLog
+            Saved donor read insertions into validation fastq
+        """
+        if self.threads > 1 and self.split_templates and self.max_donor_memory is None:
+            if (not self.is_interleaved() and not self.is_sharded()
+                    and self.downsample_fractions is None):
+                self.run_chunked_lane_jobs(lane_jobs, donor_read_insert_data)
+                return
+            self.vaselogger.warning("Templates are not split into chunks when writing "
+                                    "interleaved, sharded or downsampled validation fastq files")
+        if self.threads <= 1 or len(lane_jobs) <= 1:
+            self.writer_threads = self.get_writer_threads(1)
+            for lane_method, lane_args in lane_jobs:
+                lane_method(*lane_args, donor_read_insert_data)
+            return
+        num_of_processes = min(self.threads, len(lane_jobs))
+        self.writer_threads = self.get_writer_threads(num_of_processes)
+        self.vaselogger.debug(f"Writing {len(lane_jobs)} lanes using {num_of_processes} processes")
+        with ProcessPoolExecutor(max_workers=num_of_processes) as lane_pool:
+            lane_futures = [lane_pool.submit(self.run_lane_job, lane_method.__name__, lane_args)
+                            for lane_method, lane_args in lane_jobs]
+            for lane_future in lane_futures:
+                self.merge_donor_insert_data(donor_read_insert_data, lane_future.result())
+
+    def get_writer_threads(self, num_of_processes):
+        """Return the number of BGZF compression threads per unaligned BAM writer.
+
+        The threads are divided over the writers open at the same time: one
+        per lane written in parallel, times one per downsample fraction and
+        per round-robin shard of a lane.
+
+        Parameters
+        ----------
+        num_of_processes : int
+            Number of lanes written at the same time
+
+        Returns
+        -------
+        int
+            Number of compression threads, at least one
+        """
+        num_of_writers = num_of_processes
+        if self.downsample_fractions is not None:
+            num_of_writers *= len(self.downsample_fractions)
+        if self.num_of_shards is not None:
+            num_of_writers *= self.num_of_shards
+        return max(1, self.threads // num_of_writers)
+
+    def run_lane_job(self, method_name, lane_args):
+        """Run a single lane writing job and return its donor read insert data.
+
+        Parameters
+        ----------
+        method_name : str
+            Name of the VaSeBuilder writer method to run
+        lane_args : tuple
+            Arguments for the writer method
+
+        Returns
+        -------
+        lane_insert_data : InsertPositionLog
+            Donor read insertions made while writing the lane
+        """
+        lane_insert_data = InsertPositionLog()
+        getattr(self, method_name)(*lane_args, lane_insert_data)
+        return lane_insert_data
+
+    def run_chunked_lane_jobs(self, lane_jobs, donor_read_insert_data):
+        """Run validation fastq writing jobs by splitting each template into chunks.
+
+        Every template fastq file is split into record-aligned chunks. Donor
+        insert positions are determined for the whole template, as for a
+        serial run, and each chunk inserts the donor reads that fall within
+        its records. Chunks are written to separate part files in parallel.
+        These are concatenated in order, and the chunk insert positions are
+        shifted by the number of reads written by the preceding chunks.
+
+        Parameters
+        ----------
+        lane_jobs : list of tuple
+            Writer method and its arguments per acceptor lane
+        donor_read_insert_data : InsertPositionLog
+            Saved donor read insertions into validation fastq
+        """
+        fastq_tasks = []
+        for lane_method, lane_args in lane_jobs:
+            fastq_tasks.extend(self.get_lane_fastq_tasks(lane_method.__name__, lane_args))
+        self.vaselogger.debug(f"Writing {len(fastq_tasks)} validation fastq files in chunks "
+                              f"using {self.threads} processes")
+        with ProcessPoolExecutor(max_workers=self.threads) as chunk_pool:
+            plan_futures = [chunk_pool.submit(self.plan_template_chunks, x[0])
+                            for x in fastq_tasks]
+            chunk_futures = []
+            for fastq_task, plan_future in zip(fastq_tasks, plan_futures):
+                chunk_futures.append(self.submit_template_chunks(chunk_pool, fastq_task,
+                                                                 *plan_future.result()))
+
+            for fastq_task, task_futures in zip(fastq_tasks, chunk_futures):
+                fastq_outpath, forward_reverse = fastq_task[1], fastq_task[2]
+                fastq_prefix = fastq_outpath.split(".")[0][:-3]
+                donor_read_insert_data.add_fastq(fastq_prefix)
+                chunk_offset = 0
+                for chunk_future in task_futures:
+                    chunk_inserts, chunk_read_count = chunk_future.result()
+                    for donorreadid, insertpos in chunk_inserts:
+                        self.add_donor_insert_data(fastq_prefix, donorreadid, forward_reverse,
+                                                   chunk_offset + insertpos,
+                                                   donor_read_insert_data)
+                    chunk_offset += chunk_read_count
+                self.concatenate_fastq_parts(
+                    [f"{fastq_outpath}.part{x}" for x in range(len(task_futures))],
+                    fastq_outpath
+                    )
+
+    @staticmethod
+    def get_lane_fastq_tasks(method_name, lane_args):
+        """Return the validation fastq files to write for a lane writing job.
+
+        Parameters
+        ----------
+        method_name : str
+            Name of the VaSeBuilder lane writer method
+        lane_args : tuple
+            Arguments for the lane writer method
+
+        Returns
+        -------
+        fastq_tasks : list of tuple
+            Template, output path, R1/R2, acceptor reads to skip, donor read
+            identifiers, donor reads per identifier and random seed per
+            validation fastq file
+        """
+        if method_name == "write_validation_fastq_lane":
+            (template_r1, template_r2, acceptorreads_toskip, donorreadids, r1_donorreaddata,
+             r2_donorreaddata, r1_outpath, r2_outpath, random_seed) = lane_args
+            return [(template_r1, r1_outpath, "1", acceptorreads_toskip, donorreadids,
+                     {x: [r1_donorreaddata[x]] for x in donorreadids}, random_seed),
+                    (template_r2, r2_outpath, "2", acceptorreads_toskip, donorreadids,
+                     {x: [r2_donorreaddata[x]] for x in donorreadids}, random_seed)]
+        (acceptor_infq, fastq_outpath, acceptorreads_toskip, donorbamreaddata, donor_readids,
+         forward_reverse, random_seed) = lane_args
+        donor_read_store = DonorReadStore.from_read_data(donorbamreaddata)
+        return [(acceptor_infq, fastq_outpath, forward_reverse, acceptorreads_toskip,
+                 donor_readids,
+                 {x: donor_read_store.get_pair_reads(x, forward_reverse) for x in donor_readids},
+                 random_seed)]
+
+    def plan_template_chunks(self, template_fq):
+        """Count the template reads and split the template into chunks.
+
+        Templates that are not BGZF compressed can not be split and are
+        written as a single chunk. A fresh template index is used instead of
+        scanning the template.
+
+        Parameters
+        ----------
+        template_fq : str
+            Path to the template fastq file
+
+        Returns
+        -------
+        num_of_template_reads : int
+            Number of reads in the template fastq file
+        template_chunks : list of tuple
+            First record, number of records and virtual offset per chunk
+        """
+        if not BgzfTemplate.is_bgzf(template_fq):
+            self.vaselogger.warning(f"Template {template_fq} is not BGZF compressed and will "
+                                    "not be split into chunks")
+            num_of_template_reads = self.check_template_size(template_fq)
+            return num_of_template_reads, [(0, num_of_template_reads, None)]
+        template_index = TemplateIndex.read_fresh_index(template_fq)
+        if template_index is not None:
+            bgzf_template = BgzfTemplate.from_template_index(template_index)
+        else:
+            bgzf_template = BgzfTemplate(template_fq)
+        template_chunks = bgzf_template.plan_chunks(self.threads)
+        return bgzf_template.num_of_records, template_chunks
+
+    def submit_template_chunks(self, chunk_pool, fastq_task, num_of_template_reads,
+                               template_chunks):
+        """Determine the donor insert positions of a template and submit its chunks.
+
+        Parameters
+        ----------
+        chunk_pool : ProcessPoolExecutor
+            Process pool to submit the chunk writing jobs to
+        fastq_task : tuple
+            Validation fastq file to write
+        num_of_template_reads : int
+            Number of reads in the template fastq file
+        template_chunks : list of tuple
+            First record, number of records and virtual offset per chunk
+
+        Returns
+        -------
+        list of Future
+            Chunk writing jobs in template order
+        """
+        (template_fq, fastq_outpath, forward_reverse, acceptorreads_toskip, donor_readids,
+         donor_reads, random_seed) = fastq_task
+        self.vaselogger.debug(f"Template {template_fq} has {num_of_template_reads} reads in "
+                              f"{len(template_chunks)} chunks")
+        donor_add_positions = self.get_donor_add_positions(num_of_template_reads,
+                                                           len(donor_readids), random_seed,
+                                                           fastq_outpath)
+        donor_insert_queue = DonorInsertQueue(donor_add_positions, donor_readids)
+        task_futures = []
+        for chunk_index, template_chunk in enumerate(template_chunks):
+            chunk_insert_queue = donor_insert_queue.subqueue(template_chunk[0],
+                                                             template_chunk[0] + template_chunk[1])
+            task_futures.append(chunk_pool.submit(
+                self.write_template_chunk, template_fq, template_chunk, acceptorreads_toskip,
+                self.get_queue_donor_inserts(chunk_insert_queue, donor_reads),
+                f"{fastq_outpath}.part{chunk_index}", forward_reverse
+                ))
+        return task_futures
+
+    @staticmethod
+    def get_queue_donor_inserts(donor_insert_queue, donor_reads):
+        """Return the donor reads of an insert queue with their insert positions.
+
+        Parameters
+        ----------
+        donor_insert_queue : DonorInsertQueue
+            Donor read insert positions
+        donor_reads : dict
+            Donor reads to add per read identifier
+
+        Returns
+        -------
+        list of tuple
+            Insert position and donor read, sorted by insert position
+        """
+        return [(x, z) for x, y in zip(donor_insert_queue.positions.tolist(),
+                                       donor_insert_queue.donor_read_ids)
+                for z in donor_reads[y]]
+
+    def write_template_chunk(self, template_fq, template_chunk, acceptorreads_toskip,
+                             donor_inserts, part_outpath, forward_reverse):
+        """Write the validation fastq part of a single template chunk.
+
+        Parameters
+        ----------
+        template_fq : str
+            Path to the template fastq file
+        template_chunk : tuple
+            First record, number of records and virtual offset of the chunk
+        acceptorreads_toskip : AcceptorSkipSet
+            Acceptor reads to exclude from the validation fastq file
+        donor_inserts : iterable of tuple
+            Insert position and donor read, sorted by insert position
+        part_outpath : str
+            Path to write the validation fastq part to
+        forward_reverse : str
+            Whether the template is R1 ('1') or R2 ('2')
+
+        Returns
+        -------
+        chunk_inserts : list of tuple
+            Donor read identifier and insert position within the part
+        cur_add_index : int
+            Number of reads written to the part
+        """
+        chunk_inserts = []
+        cur_add_index = 0
+        donor_inserts = iter(donor_inserts)
+        next_insert = next(donor_inserts, None)
+        next_insert_index = sys.maxsize if next_insert is None else next_insert[0]
+        try:
+            with self.open_validation_output(part_outpath, forward_reverse) as fqpart_outfile:
+                for cur_read_index, (record_header, record_lines) in enumerate(
+                        self.read_template_records(template_fq, template_chunk),
+                        template_chunk[0]):
+                    if record_header.split()[0][1:] not in acceptorreads_toskip:
+                        fqpart_outfile.write_template(record_header, record_lines)
+                        cur_add_index += 1
+
+                    # Add the donor reads to insert at the current position
+                    while cur_read_index >= next_insert_index:
+                        donorread = next_insert[1]
+                        fqpart_outfile.write_donor_read(donorread)
+                        cur_add_index += 1
+                        chunk_inserts.append(
+                            (donorread[0], self.get_output_position(fqpart_outfile, cur_add_index)))
+                        next_insert = next(donor_inserts, None)
+                        next_insert_index = sys.maxsize if next_insert is None else next_insert[0]
+        except IOError as ioe:
+            if ioe.filename == template_fq:
+                self.vaselogger.critical("The supplied template FastQ file "
+                                         "could not be found.")
+            else:
+                self.vaselogger.critical("A FastQ file could not be written "
+                                         "to the provided output location.")
+            sys.exit()
+        return chunk_inserts, cur_add_index
+
+    @staticmethod
+    def read_template_records(template_fq, template_chunk):
+        """Yield the records of a template chunk.
+
+        Parameters
+        ----------
+        template_fq : str
+            Path to the template fastq file
+        template_chunk : tuple
+            First record, number of records and virtual offset of the chunk.
+            A virtual offset of None reads the whole gzipped template.
+
+        Yields
+        ------
+        tuple of bytes
+            Header line and the remaining three lines of a record
+        """
+        if template_chunk[2] is not None:
+            yield from BgzfTemplate(template_fq).read_records(template_chunk[2],
+                                                              template_chunk[1])
+            return
+        with io.BufferedReader(gzip.open(template_fq, "rb")) as templatefile:
+            for fileline in templatefile:
+                if fileline.startswith(b"@"):
+                    yield fileline, next(templatefile) + next(templatefile) + next(templatefile)
+
+    def concatenate_fastq_parts(self, part_paths, fastq_outpath):
+        """Concatenate validation fastq parts in order and remove the parts.
+
+        Parameters
+        ----------
+        part_paths : list of str
+            Paths to the validation fastq parts
+        fastq_outpath : str
+            Path to write the validation fastq file to
+        """
+        try:
+            with open(fastq_outpath, "wb") as fqoutfile:
+                for part_path in part_paths:
+                    with open(part_path, "rb") as fqpartfile:
+                        shutil.copyfileobj(fqpartfile, fqoutfile)
+                    os.remove(part_path)
+        except IOError:
+            self.vaselogger.critical("A FastQ file could not be written "
+                                     "to the provided output location.")
+            sys.exit()
+
+    @staticmethod
+    def merge_donor_insert_data(donor_insert_data, lane_insert_data):
+        """Merge the donor read insert data of a lane into the overall insert data.
+
+        Parameters
+        ----------
+        donor_insert_data : InsertPositionLog
+            Saved donor read insertions into validation fastq
+        lane_insert_data : InsertPositionLog
+            Donor read insertions of a single lane
+        """
+        donor_insert_data.merge(lane_insert_data)
+
     def write_validation_fastq_file(self, template_fq, fr, acceptorreads_toskip, donoraddpositions,
                                     donorreaddata, fastq_outpath, donorinsertpositions):
         """Write a single R1 or R2 validation set fastq file.
@@ -2544,59 +4990,59 @@ class VaSeBuilder:
             Template fastq gz file to use
         fr : str
             Whether to write R1 or R2
-        acceptorreads_toskip : list of str
+        acceptorreads_toskip : AcceptorSkipSet
             Acceptor reads to exclude from the validation fastq file
-        donoraddpositions : dict
+        donoraddpositions : DonorInsertQueue
             Positions where to insert donor reads
         donorreaddata : dict
             Donor reads to add to the fastq file
         fastq_outpath : str
             Path and name to write the fastq file to
-        donorinsertpositions : dict
+        donorinsertpositions : InsertPositionLog
 
         """
         fastq_prefix = fastq_outpath.split(".")[0][:-3]
+        donorinsertpositions.add_fastq(fastq_prefix)
         try:
-            fqgz_outfile = io.BufferedWriter(open(fastq_outpath, "wb"))
+            fqgz_outfile = self.open_validation_output(fastq_outpath, fr)
             self.vaselogger.debug(f"Writing data to validation fastq {fastq_outpath}")
 
-            cur_line_index = -1  # Current read position in the template fastq
+            cur_read_index = -1  # Current read position in the template fastq
             cur_add_index = 0  # Current read position in the validation fastq=
+            donoraddpositions.reset()
+            next_insert_index = donoraddpositions.next_position
 
             # Open the template fastq and write filtered data to a new fastq.gz file.
             fqgz_infile = io.BufferedReader(gzip.open(template_fq, "rb"))
             self.vaselogger.debug(f"Opened template FastQ: {template_fq}")
             for fileline in fqgz_infile:
-                cur_line_index += 1
-
                 # Check if we are located at a read identifier.
                 if not fileline.startswith(b"@"):
                     continue
-                if fileline.decode("utf-8").split()[0][1:] not in acceptorreads_toskip:
-                    fqgz_outfile.write(fileline)
-                    fqgz_outfile.write(next(fqgz_infile))
-                    fqgz_outfile.write(next(fqgz_infile))
-                    fqgz_outfile.write(next(fqgz_infile))
+                cur_read_index += 1
+                fqrecord_lines = next(fqgz_infile) + next(fqgz_infile) + next(fqgz_infile)
+                if fileline.split()[0][1:] not in acceptorreads_toskip:
+                    fqgz_outfile.write_template(fileline, fqrecord_lines)
                     cur_add_index += 1
 
                 # Check if we need to add a donor read at the current position
-                if cur_line_index not in donoraddpositions:
+                if cur_read_index < next_insert_index:
                     continue
-                for donorreadid in donoraddpositions[cur_line_index]:
+                for donorreadid in donoraddpositions.pop_position(cur_read_index):
                     donorread = donorreaddata[donorreadid]
                     if not donorread[1] == fr:
                         self.vaselogger.warning(f"{donorread[0]} is not the correct orientation "
                                                 "for this template.")
-                    fqlines = ("@" + str(donorread[0]) + "\n"
-                               + str(donorread[2]) + "\n"
-                               + "+\n"
-                               + str(donorread[3]) + "\n")
-                    fqgz_outfile.write(fqlines.encode("utf-8"))
+                    fqgz_outfile.write_donor_read(donorread)
                     cur_add_index += 1
                     # self.vaselogger.debug(f"Added donor read {donorread[0]}/{donorread[1]} at "
                     #                       f"{cur_add_index}")
-                    self.add_donor_insert_data(fastq_prefix, donorread[0], fr, cur_add_index,
-                                               donorinsertpositions)
+                    self.record_validation_insert(
+                        fastq_prefix, donorread[0], fr,
+                        self.get_output_position(fqgz_outfile, cur_add_index),
+                        donorinsertpositions
+                        )
+                next_insert_index = donoraddpositions.next_position
             fqgz_infile.close()
 
             fqgz_outfile.flush()